@@ -6,16 +6,13 @@ from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect, render
 from django.views.decorators.http import require_http_methods
 from saltadev.logging import get_logger
+from users.backends import get_login_user
 from users.fingerprint import attach_fingerprint_cookie
 from users.models import User
 from users.ratelimit import (
-    LOGIN_LIMIT,
-    build_keys,
-    get_client_ip,
-    get_fingerprint,
+    get_rate_limit_state,
     increment,
-    is_blocked,
-    reset,
+    rate_limited,
 )
 from users.utils import get_lockout_message
 
@@ -67,24 +64,6 @@ def _render_login_form(
     return attach_fingerprint_cookie(response, fingerprint, should_set_cookie)
 
 
-def _handle_rate_limit_block(
-    request: HttpRequest,
-    email_value: str,
-    ip_address: str,
-    fingerprint: str,
-    should_set_cookie: bool,
-) -> HttpResponse:
-    """Handle blocked request due to rate limiting."""
-    logger.warning(
-        "Login blocked by rate limit",
-        extra={"ip": ip_address, "email": email_value},
-    )
-    form = AuthenticationForm(request, data=request.POST)
-    return _render_login_blocked(
-        request, form, email_value, fingerprint, should_set_cookie
-    )
-
-
 def _handle_axes_block(
     request: HttpRequest,
     email_value: str,
@@ -127,13 +106,11 @@ def _handle_successful_login(
     request: HttpRequest,
     user: User,
     ip_address: str,
-    keys: list[str],
     fingerprint: str,
     should_set_cookie: bool,
 ) -> HttpResponse:
-    """Handle successful login."""
+    """Handle successful login (the axes handler clears the rate-limit keys)."""
     login(request, user)
-    reset(keys)
     logger.info(
         "Login success",
         extra={"ip": ip_address, "user_id": user.pk},
@@ -143,12 +120,13 @@ def _handle_successful_login(
 
 
 @require_http_methods(["GET", "POST"])
+@rate_limited("login", field="username")
 def login_view(request: HttpRequest) -> HttpResponse:
     """Handle user login with rate limiting and email verification check."""
-    ip_address = get_client_ip(request)
-    fingerprint, should_set_cookie = get_fingerprint(request)
+    state = get_rate_limit_state(request)
+    ip_address, keys = state.ip_address, state.keys
+    fingerprint, should_set_cookie = state.fingerprint, state.should_set_cookie
     email_value = request.POST.get("username", "") if request.method == "POST" else ""
-    keys = build_keys("login", ip_address, email_value, fingerprint)
 
     if request.method != "POST":
         form = AuthenticationForm()
@@ -156,26 +134,18 @@ def login_view(request: HttpRequest) -> HttpResponse:
             request, form, False, email_value, fingerprint, should_set_cookie
         )
 
-    # Check rate limiting
-    if is_blocked(keys, LOGIN_LIMIT):
-        return _handle_rate_limit_block(
-            request, email_value, ip_address, fingerprint, should_set_cookie
-        )
-
     # Check Axes lockout
     if getattr(request, "axes_locked_out", False):
         return _handle_axes_block(
             request, email_value, ip_address, fingerprint, should_set_cookie
         )
 
+    # Resolved once; EmailBackend reuses it when the form authenticates, so
+    # look it up with the username cleaned the way the form cleans it
     form = AuthenticationForm(request, data=request.POST)
-
-    # Check email verification status
-    email_not_verified = False
-    if email_value:
-        user = User.objects.filter(email=email_value).first()
-        if user and not user.email_confirmed:
-            email_not_verified = True
+    username = form.fields["username"].to_python(email_value)
+    user = get_login_user(request, username) if username else None
+    email_not_verified = bool(user and not user.email_confirmed)
 
     if form.is_valid():
         user = form.get_user()
@@ -190,11 +160,10 @@ def login_view(request: HttpRequest) -> HttpResponse:
                 should_set_cookie,
             )
         return _handle_successful_login(
-            request, user, ip_address, keys, fingerprint, should_set_cookie
+            request, user, ip_address, fingerprint, should_set_cookie
         )
 
-    # Invalid credentials
-    increment(keys)
+    # Invalid credentials: the axes handler already counted the failure
     logger.info(
         "Login failed: invalid credentials",
         extra={"ip": ip_address, "email": email_value},
@@ -7,42 +7,19 @@ from saltadev.logging import get_logger
 from users.fingerprint import attach_fingerprint_cookie
 from users.forms import RegisterForm
 from users.models import User
-from users.ratelimit import (
-    REGISTER_LIMIT,
-    build_keys,
-    get_client_ip,
-    get_fingerprint,
-    increment,
-    is_blocked,
-    reset,
-)
-from users.utils import get_lockout_message
+from users.ratelimit import get_rate_limit_state, increment, rate_limited, reset
 
 logger = get_logger()
 
 
 @require_http_methods(["GET", "POST"])
+@rate_limited("register", field="email")
 def register_view(request: HttpRequest) -> HttpResponse:
     """Handle new user registration with rate limiting and reCAPTCHA."""
-    ip_address = get_client_ip(request)
-    fingerprint, should_set_cookie = get_fingerprint(request)
+    state = get_rate_limit_state(request)
+    ip_address, keys = state.ip_address, state.keys
+    fingerprint, should_set_cookie = state.fingerprint, state.should_set_cookie
     email = str(request.POST.get("email")) if request.method == "POST" else None
-    keys = build_keys("register", ip_address, email, fingerprint)
-
-    if is_blocked(keys, REGISTER_LIMIT):
-        logger.warning(
-            "Register blocked by rate limit",
-            extra={"ip": ip_address, "email": email},
-        )
-        response = render(
-            request,
-            "auth_register/index.html",
-            {
-                "form": RegisterForm(request.POST or None),
-                "blocked_message": get_lockout_message(),
-            },
-        )
-        return attach_fingerprint_cookie(response, fingerprint, should_set_cookie)
 
     if request.method == "POST":
         form = RegisterForm(request.POST)
@@ -53,7 +30,9 @@ def register_view(request: HttpRequest) -> HttpResponse:
                 "Register success",
                 extra={"ip": ip_address, "user_id": user.pk},
             )
-            response = redirect(f"/verificar/?{urlencode({'email': user.email})}")
+            response: HttpResponse = redirect(
+                f"/verificar/?{urlencode({'email': user.email})}"
+            )
             return attach_fingerprint_cookie(response, fingerprint, should_set_cookie)
         increment(keys)
         logger.info(
@@ -77,6 +77,16 @@ class BenefitAdmin(admin.ModelAdmin):
                 "fields": ("modality", "location"),
             },
         ),
+        (
+            "Público",
+            {
+                "fields": (
+                    "audience_province",
+                    "audience_technical_role",
+                    "audience_opted_in_only",
+                ),
+            },
+        ),
         (
             "Metadatos",
             {
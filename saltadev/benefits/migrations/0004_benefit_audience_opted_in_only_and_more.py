@@ -0,0 +1,58 @@
+# Generated by Django 5.2.11 on 2026-10-17 00:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("benefits", "0003_benefit_benefits_be_is_acti_b3b3f5_idx_and_more"),
+        ("locations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benefit",
+            name="audience_opted_in_only",
+            field=models.BooleanField(
+                default=False,
+                help_text="Notificar solo a quienes activaron este tipo de aviso.",
+                verbose_name="solo miembros suscriptos",
+            ),
+        ),
+        migrations.AddField(
+            model_name="benefit",
+            name="audience_province",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="locations.province",
+                verbose_name="provincia del público",
+            ),
+        ),
+        migrations.AddField(
+            model_name="benefit",
+            name="audience_technical_role",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("backend", "Backend"),
+                    ("frontend", "Frontend"),
+                    ("fullstack", "Full Stack"),
+                    ("blockchain", "Blockchain Developer"),
+                    ("devops", "DevOps"),
+                    ("mobile", "Mobile Developer"),
+                    ("data_science", "Data Science"),
+                    ("ia_ml", "IA/ML Engineer"),
+                    ("security", "Security Engineer"),
+                    ("qa", "QA Engineer"),
+                    ("ui_ux", "UI/UX Designer"),
+                    ("otro", "Otro"),
+                ],
+                max_length=20,
+                verbose_name="rol técnico del público",
+            ),
+        ),
+    ]
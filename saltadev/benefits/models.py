@@ -2,10 +2,11 @@
 
 from django.db import models
 from django.utils import timezone
+from user_notifications.models import AudienceTargeting
 from users.models import User
 
 
-class Benefit(models.Model):
+class Benefit(AudienceTargeting):
     """
     Benefit model representing discounts, promotions, or redeemable offers.
 
@@ -1,12 +1,11 @@
 """Signals for the benefits app."""
 
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.urls import reverse
-from notifications.signals import notify
-from users.models import User
 
 from .models import Benefit
+from .tasks import notify_new_benefit_task
 
 
 @receiver(post_save, sender=Benefit)
@@ -16,21 +15,13 @@ def notify_new_benefit(
     created: bool,
     **kwargs: object,
 ) -> None:
-    """Notify verified users when a new benefit is created."""
+    """Queue the member notifications for a new benefit.
+
+    The fan-out runs in a Celery task once the transaction commits, so the
+    create view never waits on it and the worker always sees the saved row.
+    """
     if not created:
         return
 
-    url = reverse("benefit_detail", kwargs={"pk": instance.pk})
-
-    users = User.objects.filter(is_active=True, email_confirmed=True).exclude(
-        pk=instance.creator_id
-    )
-    for user in users:
-        notify.send(
-            sender=instance.creator,
-            recipient=user,
-            verb="Nuevo beneficio",
-            action_object=instance,
-            description=instance.title,
-            url=url,
-        )
+    benefit_id = instance.pk
+    transaction.on_commit(lambda: notify_new_benefit_task.delay(benefit_id))
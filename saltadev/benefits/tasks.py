@@ -0,0 +1,50 @@
+"""
+Celery tasks for the benefits app.
+
+Announces new benefits to the community once the creating transaction commits.
+"""
+
+from celery import shared_task
+from django.urls import reverse
+from saltadev.logging import get_logger
+from user_notifications.utils import announce
+
+from .models import Benefit
+
+logger = get_logger()
+
+NEW_BENEFIT_VERB = "Nuevo beneficio"
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    max_retries=3,
+)
+def notify_new_benefit_task(self, benefit_id: int) -> None:
+    """Announce a new benefit to its audience.
+
+    Untargeted benefits are a single broadcast row no matter how many members
+    there are; targeted ones notify only the matching members. Announcing is
+    idempotent per benefit, so retries never announce it twice.
+
+    Args:
+        self: Task instance (for retries).
+        benefit_id: Primary key of the newly created benefit.
+    """
+    benefit = Benefit.objects.filter(pk=benefit_id).first()
+    if benefit is None:
+        return
+
+    written = announce(
+        benefit,
+        verb=NEW_BENEFIT_VERB,
+        description=benefit.title,
+        url=reverse("benefit_detail", kwargs={"pk": benefit.pk}),
+        creator_id=benefit.creator_id,
+    )
+    logger.info(
+        "Benefit announced",
+        extra={"benefit_id": benefit_id, "notifications_written": written},
+    )
@@ -1,8 +1,10 @@
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render
 from django.views.decorators.http import require_GET
+from saltadev.page_cache import anonymous_page
 
 
+@anonymous_page()
 @require_GET
 def code_of_conduct(request: HttpRequest) -> HttpResponse:
     """Render the code of conduct page."""
@@ -3,12 +3,13 @@ from typing import TYPE_CHECKING
 from django.conf import settings
 from django.db import models
 from django.utils import timezone
+from user_notifications.models import AudienceTargeting
 
 if TYPE_CHECKING:
     from users.models import User
 
 
-class Event(models.Model):
+class Event(AudienceTargeting):
     """Community event with date, location, and registration link."""
 
     class Status(models.TextChoices):
@@ -4,7 +4,7 @@ from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.urls import reverse
 from notifications.signals import notify
-from users.models import User
+from user_notifications.utils import announce
 
 from .models import Event
 
@@ -32,9 +32,10 @@ def notify_event_approved(
     created: bool,
     **kwargs: object,
 ) -> None:
-    """Notify verified users when an event is approved.
+    """Announce an event to its audience when it is approved.
 
-    Sends notifications when:
+    Untargeted events become one broadcast; events with audience filters
+    notify only the matching members. Announces when:
     - A new event is created with approved status (by admin/moderator)
     - An existing event changes from pending to approved
     """
@@ -54,20 +55,13 @@ def notify_event_approved(
     # Use event link if available, otherwise link to events list
     url = instance.link if instance.link else reverse("events")
 
-    # Notify all verified users except the creator
-    users = User.objects.filter(is_active=True, email_confirmed=True)
-    if instance.creator:
-        users = users.exclude(pk=instance.creator.pk)
-
-    for user in users:
-        notify.send(
-            sender=instance,
-            recipient=user,
-            verb="Nuevo evento",
-            action_object=instance,
-            description=instance.title,
-            url=url,
-        )
+    announce(
+        instance,
+        verb="Nuevo evento",
+        description=instance.title,
+        url=url,
+        creator_id=instance.creator_id,
+    )
 
 
 @receiver(post_save, sender=Event)
@@ -6,3 +6,7 @@ from django.apps import AppConfig
 class EventsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "events"
+
+    def ready(self) -> None:
+        """Import signals when the app is ready."""
+        import events.signals  # noqa: F401
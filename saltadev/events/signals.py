@@ -0,0 +1,16 @@
+"""Signals for the events app."""
+
+from content.models import Event
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from saltadev.cache import invalidate
+
+from .views import EVENTS_CACHE_NAMESPACE
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_events_cache(sender: type[Event], **kwargs: object) -> None:
+    """Invalidate the events list cache once the change is committed."""
+    transaction.on_commit(lambda: invalidate(EVENTS_CACHE_NAMESPACE))
@@ -7,6 +7,8 @@ from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.views.decorators.http import require_GET, require_http_methods
+from saltadev.cache import get_two_tier
+from saltadev.page_cache import anonymous_page
 from users.image_service import ImageUploadResult, upload_event_image
 
 from .forms import EventForm, ImageSourceChoices
@@ -14,6 +16,10 @@ from .forms import EventForm, ImageSourceChoices
 # Template paths
 _TEMPLATE_FORM = "events/form.html"
 
+# Approved events list; versioned and invalidated by signals.py
+EVENTS_CACHE_NAMESPACE = "events"
+EVENTS_CACHE_TTL = 60 * 60 * 6
+
 if TYPE_CHECKING:
     from users.models import User
 
@@ -82,15 +88,22 @@ def can_approve_events(user: "User") -> bool:
     return user.role in ["administrador", "moderador"]
 
 
-@require_GET
-def events_list(request: HttpRequest) -> HttpResponse:
-    """Render the events page with all approved events sorted by date."""
-    events = (
+def _approved_events() -> list[Event]:
+    return list(
         Event.objects.filter(status=Event.Status.APPROVED)
         .select_related("creator")
         .order_by("-event_start_date")
     )
-    latest_event = events.first()
+
+
+@anonymous_page(EVENTS_CACHE_NAMESPACE)
+@require_GET
+def events_list(request: HttpRequest) -> HttpResponse:
+    """Render the events page with all approved events sorted by date."""
+    events = get_two_tier(
+        EVENTS_CACHE_NAMESPACE, "approved", _approved_events, EVENTS_CACHE_TTL
+    )
+    latest_event = events[0] if events else None
     return render(
         request, "events/index.html", {"events": events, "latest_event": latest_event}
     )
@@ -6,3 +6,7 @@ from django.apps import AppConfig
 class HomeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "home"
+
+    def ready(self) -> None:
+        """Import signals when the app is ready."""
+        import home.signals  # noqa: F401
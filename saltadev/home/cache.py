@@ -0,0 +1,61 @@
+"""Versioned cache for the homepage lists.
+
+The three lists are stored under keys that embed a version number and are
+read with a single ``get_many``. Saving or deleting an ``Event``,
+``StaffProfile`` or ``Collaborator`` bumps the version (see ``signals.py``),
+so entries can live for hours and still change as soon as an admin edits
+something; superseded versions simply expire. Misses are rebuilt through
+``saltadev.cache.resolve``, so a bump under load causes one rebuild per
+list rather than one per worker. Each process also keeps the assembled
+lists in its local LRU for a few seconds, so most hits never leave the
+process.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+from content.models import Collaborator, Event, StaffProfile
+from django.core.cache import cache
+from saltadev.cache import get_or_build_local, get_version, resolve
+
+HOME_CACHE_NAMESPACE = "home"
+HOME_CACHE_TTL = 60 * 60 * 6
+
+
+def _latest_events() -> list[Event]:
+    return list(
+        Event.objects.filter(status=Event.Status.APPROVED)
+        .select_related("creator")
+        .order_by("-event_start_date")[:3]
+    )
+
+
+def _staff_members() -> list[StaffProfile]:
+    return list(
+        StaffProfile.objects.select_related("user").order_by("order", "created_at")[:6]
+    )
+
+
+def _collaborators() -> list[Collaborator]:
+    return list(Collaborator.objects.order_by("created_at"))
+
+
+HOME_LISTS: dict[str, Callable[[], list[Any]]] = {
+    "latest_events": _latest_events,
+    "staff_members": _staff_members,
+    "collaborators": _collaborators,
+}
+
+
+def get_home_lists() -> dict[str, list[Any]]:
+    """Return the homepage lists, rebuilding only the missing ones."""
+    return get_or_build_local(f"{HOME_CACHE_NAMESPACE}:lists", _load_home_lists)
+
+
+def _load_home_lists() -> dict[str, list[Any]]:
+    prefix = f"{HOME_CACHE_NAMESPACE}:v{get_version(HOME_CACHE_NAMESPACE)}:"
+    cached = cache.get_many([prefix + name for name in HOME_LISTS])
+    return {
+        name: resolve(prefix + name, cached.get(prefix + name), build, HOME_CACHE_TTL)
+        for name, build in HOME_LISTS.items()
+    }
@@ -0,0 +1,24 @@
+"""Signals for the home app."""
+
+from content.models import Collaborator, Event, StaffProfile
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from saltadev.cache import invalidate
+
+from .cache import HOME_CACHE_NAMESPACE
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=StaffProfile)
+@receiver(post_delete, sender=StaffProfile)
+@receiver(post_save, sender=Collaborator)
+@receiver(post_delete, sender=Collaborator)
+def invalidate_home_cache(sender: type, **kwargs: object) -> None:
+    """Invalidate the homepage cache once the change is committed.
+
+    Bumping after commit keeps a concurrent request from caching the old
+    rows under the new version.
+    """
+    transaction.on_commit(lambda: invalidate(HOME_CACHE_NAMESPACE))
@@ -9,3 +9,7 @@ class LocationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "locations"
     verbose_name = "Ubicaciones"
+
+    def ready(self) -> None:
+        """Import signals when the app is ready."""
+        import locations.signals  # noqa: F401
@@ -0,0 +1,18 @@
+"""Signals for the locations app."""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from saltadev.cache import invalidate
+
+from .models import Country, Province
+from .views import LOCATIONS_CACHE_NAMESPACE
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+@receiver(post_save, sender=Province)
+@receiver(post_delete, sender=Province)
+def invalidate_locations_cache(sender: type, **kwargs: object) -> None:
+    """Invalidate the cached province lists once the change is committed."""
+    transaction.on_commit(lambda: invalidate(LOCATIONS_CACHE_NAMESPACE))
@@ -2,14 +2,27 @@
 
 from django.http import HttpRequest, JsonResponse
 from django.views.decorators.http import require_GET
+from saltadev.cache import get_two_tier
 
 from .models import Province
 
+# Provinces change a few times a decade; signals.py invalidates on edits
+LOCATIONS_CACHE_NAMESPACE = "locations"
+LOCATIONS_CACHE_TTL = 60 * 60 * 24
+
 
 @require_GET
 def provinces_by_country(_request: HttpRequest, country_code: str) -> JsonResponse:
     """Return provinces for a given country code as JSON."""
-    provinces = Province.objects.filter(country_id=country_code.upper()).values(
-        "id", "code", "name"
+    country_code = country_code.upper()
+    provinces = get_two_tier(
+        LOCATIONS_CACHE_NAMESPACE,
+        f"provinces:{country_code}",
+        lambda: list(
+            Province.objects.filter(country_id=country_code).values(
+                "id", "code", "name"
+            )
+        ),
+        LOCATIONS_CACHE_TTL,
     )
-    return JsonResponse(list(provinces), safe=False)
+    return JsonResponse(provinces, safe=False)
@@ -1,5 +1,3 @@
-from typing import Optional
-
 from django.contrib import messages
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect, render
@@ -8,52 +6,27 @@ from django.views.decorators.http import require_http_methods
 from saltadev.logging import get_logger
 from users.fingerprint import attach_fingerprint_cookie
 from users.models import User
-from users.ratelimit import (
-    PASSWORD_RESET_CONFIRM_LIMIT,
-    PASSWORD_RESET_REQUEST_LIMIT,
-    build_keys,
-    get_client_ip,
-    get_fingerprint,
-    increment,
-    is_blocked,
-    reset,
-)
+from users.ratelimit import get_rate_limit_state, increment, rate_limited, reset
 from users.utils import (
     create_password_reset_token,
-    get_lockout_message,
-    hash_token,
+    get_password_reset_user,
+    reset_password_with_token,
     send_password_reset,
 )
 
 from .forms import PasswordResetConfirmForm, PasswordResetRequestForm
-from .models import PasswordResetToken
 
 logger = get_logger()
 
 
 @require_http_methods(["GET", "POST"])
+@rate_limited("password_reset_request", field="email")
 def request_reset_view(request: HttpRequest) -> HttpResponse:
     """Handle the password reset request form and send the reset email."""
-    ip_address = get_client_ip(request)
-    fingerprint, should_set_cookie = get_fingerprint(request)
+    state = get_rate_limit_state(request)
+    ip_address, keys = state.ip_address, state.keys
+    fingerprint, should_set_cookie = state.fingerprint, state.should_set_cookie
     email_value = request.POST.get("email") if request.method == "POST" else None
-    keys = build_keys("password_reset_request", ip_address, email_value, fingerprint)
-
-    if is_blocked(keys, PASSWORD_RESET_REQUEST_LIMIT):
-        logger.warning(
-            "Password reset request blocked by rate limit",
-            extra={"ip": ip_address, "email": email_value},
-        )
-        form = PasswordResetRequestForm(request.POST or None)
-        response = render(
-            request,
-            "password_reset/request.html",
-            {
-                "form": form,
-                "blocked_message": get_lockout_message(),
-            },
-        )
-        return attach_fingerprint_cookie(response, fingerprint, should_set_cookie)
 
     if request.method == "POST":
         form = PasswordResetRequestForm(request.POST)
@@ -75,7 +48,7 @@ def request_reset_view(request: HttpRequest) -> HttpResponse:
                 request,
                 "Te enviamos un correo con las instrucciones para restablecer tu contraseña.",
             )
-            response = redirect("password_reset_request")
+            response: HttpResponse = redirect("password_reset_request")
             return attach_fingerprint_cookie(response, fingerprint, should_set_cookie)
         increment(keys)
         logger.info(
@@ -97,19 +70,20 @@ def request_reset_view(request: HttpRequest) -> HttpResponse:
 
 
 @require_http_methods(["GET", "POST"])
+@rate_limited("password_reset_confirm", field="token")
 def confirm_reset_view(request: HttpRequest) -> HttpResponse:
     """Validate the reset token and allow the user to set a new password."""
-    ip_address = get_client_ip(request)
-    fingerprint, should_set_cookie = get_fingerprint(request)
+    state = get_rate_limit_state(request)
+    ip_address, keys = state.ip_address, state.keys
+    fingerprint, should_set_cookie = state.fingerprint, state.should_set_cookie
     token_value = (
         request.GET.get("token", "")
         if request.method == "GET"
         else request.POST.get("token", "")
     )
-    keys = build_keys("password_reset_confirm", ip_address, token_value, fingerprint)
 
-    token_record = _get_token_record(str(token_value))
-    if not token_record:
+    user = get_password_reset_user(str(token_value))
+    if user is None:
         logger.info(
             "Password reset failed: invalid token",
             extra={"ip": ip_address},
@@ -117,31 +91,16 @@ def confirm_reset_view(request: HttpRequest) -> HttpResponse:
         response = render(request, "password_reset/invalid.html")
         return attach_fingerprint_cookie(response, fingerprint, should_set_cookie)
 
-    if is_blocked(keys, PASSWORD_RESET_CONFIRM_LIMIT):
-        logger.warning(
-            "Password reset confirm blocked by rate limit",
-            extra={"ip": ip_address},
-        )
-        user = token_record.user
-        form = PasswordResetConfirmForm(request.POST or None, user=user)
-        response = render(
-            request,
-            "password_reset/confirm.html",
-            {
-                "form": form,
-                "token": token_value,
-                "blocked_message": get_lockout_message(),
-            },
-        )
-        return attach_fingerprint_cookie(response, fingerprint, should_set_cookie)
-
     if request.method == "POST":
-        user = token_record.user
         form = PasswordResetConfirmForm(request.POST, user=user)
         if form.is_valid():
-            user.set_password(form.cleaned_data["new_password"])
-            user.save()
-            PasswordResetToken.objects.filter(pk=token_record.pk).update(used=True)
+            if not reset_password_with_token(
+                user, str(token_value), form.cleaned_data["new_password"]
+            ):
+                response = render(request, "password_reset/invalid.html")
+                return attach_fingerprint_cookie(
+                    response, fingerprint, should_set_cookie
+                )
             reset(keys)
             logger.info(
                 "Password reset success",
@@ -159,7 +118,6 @@ def confirm_reset_view(request: HttpRequest) -> HttpResponse:
             extra={"ip": ip_address},
         )
     else:
-        user = token_record.user
         form = PasswordResetConfirmForm(user=user)
 
     response = render(
@@ -171,18 +129,3 @@ def confirm_reset_view(request: HttpRequest) -> HttpResponse:
         },
     )
     return attach_fingerprint_cookie(response, fingerprint, should_set_cookie)
-
-
-def _get_token_record(token_value: str) -> Optional["PasswordResetToken"]:
-    """Look up an active, unused password reset token by its raw value."""
-    if not token_value:
-        return None
-    token_hash = hash_token(token_value)
-    token_record = (
-        PasswordResetToken.objects.filter(token_hash=token_hash, used=False)
-        .order_by("-created_at")
-        .first()
-    )
-    if not token_record or not token_record.is_active():
-        return None
-    return token_record
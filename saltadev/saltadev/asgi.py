@@ -3,6 +3,10 @@ ASGI config for saltadev project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serving through ASGI (e.g. gunicorn with a uvicorn worker) is required for the
+live notification stream (``user_notifications.views.notification_stream``),
+which holds one idle connection per open tab without tying up a worker.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -14,3 +18,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "saltadev.settings.local")
 
 application = get_asgi_application()
+
+# Each worker process imports this module, so every worker gets its own
+# subscription to cross-process cache invalidations (as in wsgi.py).
+from saltadev.cache import start_invalidation_listener  # noqa: E402
+
+start_invalidation_listener()
@@ -0,0 +1,387 @@
+"""Stampede-safe cache helpers shared by the apps.
+
+``get_or_build`` wraps an expensive rebuild so a key expiring under load
+costs one rebuild instead of one per worker:
+
+- Entries carry a soft expiry and stay stored for a grace period after it.
+  The first caller past the soft expiry takes a short lock (``cache.add``,
+  i.e. SET NX on Redis) and rebuilds; everyone else keeps serving the stale
+  value meanwhile (stale-while-revalidate).
+- Callers refresh probabilistically ahead of the soft expiry, more eagerly
+  the longer the last rebuild took (XFetch), so hot keys are usually
+  rebuilt before anybody sees them expire.
+- When nothing is stored at all, callers that lose the lock wait briefly
+  for the winner's result instead of all hitting the database.
+
+``get_version`` / ``bump_version`` keep per-namespace version numbers for
+keys that signal handlers invalidate by moving to a new version.
+
+``get_two_tier`` puts a bounded per-process LRU (``local_cache``) with a
+short TTL in front of all that, for hot data that rarely changes: a local
+hit is a dict lookup with no network hop. ``invalidate`` is the hook to
+call when a namespace's data changes; it drops the local entries, bumps
+the shared version and announces the namespace on a Redis pub/sub channel.
+Every web worker, WSGI or ASGI, runs ``start_invalidation_listener`` at
+startup and drops its own copies on each message, so other processes and
+nodes do not wait for the local TTL. Code that memoizes in-process by other means can join
+in with ``on_invalidate``.
+"""
+
+import math
+import os
+import random
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Iterable
+from threading import Lock, Thread
+from typing import Any
+
+import redis
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+
+from .logging import get_logger
+
+logger = get_logger()
+
+LOCK_TIMEOUT = 10  # seconds a rebuild may hold the lock
+WAIT_TIMEOUT = 2.0  # seconds to wait for another caller's rebuild
+POLL_INTERVAL = 0.05
+DEFAULT_BETA = 1.0
+
+LOCAL_CACHE_SIZE = 1024
+LOCAL_CACHE_TTL = 30
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+LISTENER_MAX_BACKOFF = 30
+
+
+def redis_client() -> Any | None:
+    """Return the raw redis-py client behind the default cache, if any."""
+    backend = caches["default"]
+    if isinstance(backend, RedisCache):
+        return backend._cache.get_client(write=True)  # type: ignore[attr-defined]
+    return None
+
+
+def _should_refresh(expires_at: float, delta: float, beta: float) -> bool:
+    # 1 - random() is in (0, 1], so the log is defined and <= 0
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires_at
+
+
+def _rebuild(key: str, build: Callable[[], Any], ttl: int, grace: int) -> Any:
+    started = time.monotonic()
+    value = build()
+    delta = time.monotonic() - started
+    cache.set(key, (value, time.time() + ttl, delta), ttl + grace)
+    return value
+
+
+def resolve(
+    key: str,
+    entry: Any,
+    build: Callable[[], Any],
+    ttl: int,
+    *,
+    grace: int | None = None,
+    beta: float = DEFAULT_BETA,
+) -> Any:
+    """Return the value of an already fetched entry, rebuilding if due.
+
+    Use this after a ``cache.get_many`` of several keys; ``get_or_build``
+    covers the single-key case.
+
+    Args:
+        key: Cache key the entry was read from.
+        entry: What the cache returned for ``key`` (None on a miss).
+        build: Computes a fresh value.
+        ttl: Seconds until the value is considered stale.
+        grace: Seconds a stale value may still be served while another
+            caller rebuilds (default ``ttl``).
+        beta: Early-refresh eagerness; 0 disables early refresh.
+
+    Returns:
+        The cached value, or a freshly built one.
+    """
+    if entry is not None:
+        value, expires_at, delta = entry
+        if not _should_refresh(expires_at, delta, beta):
+            return value
+
+    grace = ttl if grace is None else grace
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            return _rebuild(key, build, ttl, grace)
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        return entry[0]
+
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    # The lock holder is slow or died; do not fail the request over it
+    return _rebuild(key, build, ttl, grace)
+
+
+def get_or_build(
+    key: str,
+    build: Callable[[], Any],
+    ttl: int,
+    *,
+    grace: int | None = None,
+    beta: float = DEFAULT_BETA,
+) -> Any:
+    """Return the cached value for ``key``, rebuilding it at most once at a time.
+
+    See ``resolve`` for the arguments.
+    """
+    return resolve(key, cache.get(key), build, ttl, grace=grace, beta=beta)
+
+
+def _version_key(namespace: str) -> str:
+    return f"{namespace}:version"
+
+
+def get_version(namespace: str) -> int:
+    """Return the namespace's cache version, starting one if missing.
+
+    A fresh version is seeded from the clock rather than 1, so an evicted
+    version key can never resurrect entries cached under an old number.
+    """
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(namespaces: Iterable[str]) -> list[int]:
+    """Return the versions of several namespaces with a single ``get_many``."""
+    namespaces = list(namespaces)
+    keys = [_version_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    return [
+        found[key] if key in found else get_version(namespace)
+        for namespace, key in zip(namespaces, keys, strict=True)
+    ]
+
+
+def bump_version(namespace: str) -> None:
+    """Move the namespace to a new version, orphaning its cached entries."""
+    key = _version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+class LocalCache:
+    """Per-process TTL cache with LRU eviction.
+
+    At most ``maxsize`` entries are kept, so the memory it can take is
+    bounded no matter how many distinct keys are read.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Return ``(found, value)``; drops the entry if it has expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store ``value`` for ``ttl`` seconds, evicting the oldest entries."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Drop every entry whose key starts with ``prefix``."""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalCache(LOCAL_CACHE_SIZE)
+
+
+def get_or_build_local(
+    key: str, build: Callable[[], Any], ttl: float = LOCAL_CACHE_TTL
+) -> Any:
+    """Return ``key`` from the per-process cache, calling ``build`` on a miss.
+
+    Keys should start with their namespace and a colon so ``invalidate``
+    can find them.
+    """
+    found, value = local_cache.get(key)
+    if not found:
+        value = build()
+        local_cache.set(key, value, ttl)
+    return value
+
+
+def get_two_tier(
+    namespace: str,
+    name: str,
+    build: Callable[[], Any],
+    ttl: int,
+    *,
+    local_ttl: float = LOCAL_CACHE_TTL,
+) -> Any:
+    """Return a value from the local LRU, then the shared cache, then ``build``.
+
+    The shared tier is versioned per namespace and rebuilt through
+    ``get_or_build``, so a local miss on many workers still costs a single
+    rebuild.
+
+    Args:
+        namespace: Invalidation namespace (see ``invalidate``).
+        name: Key within the namespace.
+        build: Computes a fresh value.
+        ttl: Seconds the shared entry stays fresh.
+        local_ttl: Seconds each process keeps its own copy.
+    """
+    return get_or_build_local(
+        f"{namespace}:{name}",
+        lambda: get_or_build(
+            f"{namespace}:v{get_version(namespace)}:{name}", build, ttl
+        ),
+        local_ttl,
+    )
+
+
+_handlers: defaultdict[str, list[Callable[[], object]]] = defaultdict(list)
+
+
+def on_invalidate(namespace: str, handler: Callable[[], object]) -> None:
+    """Run ``handler`` in every process whenever ``namespace`` is invalidated.
+
+    For in-process memoization outside ``local_cache``, e.g. an
+    ``lru_cache``'d function's ``cache_clear``.
+    """
+    _handlers[namespace].append(handler)
+
+
+def apply_invalidation(namespace: str) -> None:
+    """Drop this process's cached data for ``namespace``."""
+    local_cache.delete_prefix(f"{namespace}:")
+    for handler in _handlers[namespace]:
+        handler()
+
+
+def _channel() -> str:
+    # Prefixed like cache keys, so environments sharing a Redis stay apart
+    return cache.make_and_validate_key(INVALIDATION_CHANNEL)
+
+
+def invalidate(namespace: str) -> None:
+    """Invalidation hook for data cached under ``namespace``.
+
+    Drops this process's copies, bumps the shared version and tells every
+    other process to drop theirs. Call it from the models' save/delete
+    signal handlers, after commit.
+    """
+    apply_invalidation(namespace)
+    bump_version(namespace)
+    client = redis_client()
+    if client is None:
+        return
+    try:
+        client.publish(_channel(), namespace)
+    except redis.RedisError as exc:
+        # Other processes still catch up when their local TTL runs out
+        logger.warning(
+            "Cache invalidation publish failed",
+            extra={"namespace": namespace, "error": str(exc)},
+        )
+
+
+def _listen(client: Any) -> None:
+    backoff = 1
+    while True:
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(_channel())
+            # Anything published while we were not subscribed is lost
+            local_cache.clear()
+            backoff = 1
+            for message in pubsub.listen():
+                namespace = message["data"]
+                if isinstance(namespace, bytes):
+                    namespace = namespace.decode()
+                apply_invalidation(namespace)
+        except redis.RedisError as exc:
+            logger.warning(
+                "Cache invalidation listener disconnected",
+                extra={"error": str(exc), "retry_in": backoff},
+            )
+        finally:
+            # Release the dead subscription's connection before resubscribing
+            pubsub.close()
+        time.sleep(backoff)
+        backoff = min(backoff * 2, LISTENER_MAX_BACKOFF)
+
+
+_listener: Thread | None = None
+
+
+def start_invalidation_listener() -> Thread | None:
+    """Subscribe this process to the invalidation channel.
+
+    Call once per worker process at startup; both the WSGI and the ASGI
+    module do. Safe to call again: a running listener is reused. If the
+    process forks after starting it (e.g. gunicorn ``--preload``), the
+    child starts its own, since threads do not survive a fork. Does
+    nothing without a Redis cache.
+
+    Returns:
+        The daemon thread running the subscription, or None.
+    """
+    global _listener
+    client = redis_client()
+    if client is None:
+        return None
+    if _listener is None or not _listener.is_alive():
+        _listener = Thread(
+            target=_listen, args=(client,), name="cache-invalidation", daemon=True
+        )
+        _listener.start()
+    return _listener
+
+
+def _restart_listener_after_fork() -> None:
+    global _listener
+    if _listener is not None:
+        _listener = None
+        start_invalidation_listener()
+
+
+os.register_at_fork(after_in_child=_restart_listener_after_fork)
@@ -0,0 +1,177 @@
+"""Full-page cache for anonymous visitors.
+
+``PageCacheMiddleware`` sits right after ``SecurityMiddleware``, so a hit
+skips the session, auth and message middleware, context processors and
+template rendering altogether. Only views marked with ``anonymous_page``
+are cached, and only for requests that cannot be personalised: GET/HEAD
+without a session or messages cookie. A response is stored only if it is
+a plain 200 that sets no cookies, did not ask for a CSRF token, queued no
+messages and is not marked private.
+
+Keys cover the scheme, host and path plus the query parameters the view
+declared (any other parameter bypasses the cache, so ``?utm=...``
+variations cannot fill it). Host and scheme stay in the key because pages
+embed absolute URLs (``og:url``) and several hosts are allowed. Keys also
+cover the request headers named in the response's ``Vary`` (learned per
+URL, like Django's cache middleware) and the current version of each of
+the view's tags. Tags are ``saltadev.cache`` namespaces, so the signal
+handlers that invalidate ``home`` and ``events`` purge the matching pages
+as well.
+"""
+
+import hashlib
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import cc_delim_re
+from django.utils.http import urlencode
+
+from .cache import get_versions, local_cache
+
+PAGE_CACHE_TTL = 60 * 10
+PAGE_VARY_TTL = 60 * 60 * 24
+PAGE_CACHE_ATTR = "page_cache_tags"
+PAGE_PARAMS_ATTR = "page_cache_params"
+
+
+def anonymous_page(
+    *tags: str, params: tuple[str, ...] = ()
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Mark a view as cacheable for anonymous visitors.
+
+    Args:
+        tags: Cache namespaces whose invalidation must purge this page.
+        params: Query parameters the view reads; they are part of the key.
+            Requests with any other parameter are not cached.
+    """
+
+    def decorator(view: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(view)
+        def wrapped(*args: Any, **kwargs: Any) -> Any:
+            return view(*args, **kwargs)
+
+        setattr(wrapped, PAGE_CACHE_ATTR, tags)
+        setattr(wrapped, PAGE_PARAMS_ATTR, params)
+        return wrapped
+
+    return decorator
+
+
+def _is_anonymous_read(request: HttpRequest) -> bool:
+    return (
+        request.method in ("GET", "HEAD")
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and CookieStorage.cookie_name not in request.COOKIES
+    )
+
+
+def _page_spec(
+    request: HttpRequest,
+) -> tuple[tuple[str, ...], tuple[str, ...]] | None:
+    """Return the view's ``(tags, params)``, or None if it is not cacheable."""
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    tags = getattr(match.func, PAGE_CACHE_ATTR, None)
+    if tags is None:
+        return None
+    return tags, getattr(match.func, PAGE_PARAMS_ATTR, ())
+
+
+def _is_storable(request: HttpRequest, response: HttpResponse) -> bool:
+    messages = getattr(request, "_messages", None)
+    return (
+        request.method == "GET"
+        and response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        and not (messages is not None and messages.added_new)
+        and "private" not in response.get("Cache-Control", "")
+        and "no-store" not in response.get("Cache-Control", "")
+    )
+
+
+def _digest(value: str) -> str:
+    return hashlib.md5(value.encode(), usedforsecurity=False).hexdigest()
+
+
+def _page_url(request: HttpRequest, params: tuple[str, ...] = ()) -> str:
+    """Return the absolute URL with only the allowed parameters, sorted."""
+    url = f"{request.scheme}://{request.get_host()}{request.path}"
+    query = [(name, request.GET.getlist(name)) for name in sorted(params)]
+    query = [(name, values) for name, values in query if values]
+    if not query:
+        return url
+    return f"{url}?{urlencode(query, doseq=True)}"
+
+
+def _vary_key(request: HttpRequest, params: tuple[str, ...] = ()) -> str:
+    return f"page:vary:{_digest(_page_url(request, params))}"
+
+
+def _page_key(
+    request: HttpRequest,
+    tags: tuple[str, ...],
+    vary: list[str],
+    params: tuple[str, ...] = (),
+) -> str:
+    parts = [_page_url(request, params)]
+    for header in vary:
+        # Cookie: only cookie-less (session and messages) requests get here
+        if header.lower() != "cookie":
+            meta_key = "HTTP_" + header.upper().replace("-", "_")
+            parts.append(f"{header}={request.META.get(meta_key, '')}")
+    versions = ".".join(str(version) for version in get_versions(tags))
+    return f"page:{'.'.join(tags)}:{versions}:{_digest('|'.join(parts))}"
+
+
+def _get_vary(request: HttpRequest, params: tuple[str, ...]) -> list[str] | None:
+    key = _vary_key(request, params)
+    found, vary = local_cache.get(key)
+    if not found:
+        vary = cache.get(key)
+        if vary is not None:
+            local_cache.set(key, vary, PAGE_CACHE_TTL)
+    return vary
+
+
+class PageCacheMiddleware:
+    """Serve and store whole responses of ``anonymous_page`` views."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        """Initialize middleware with the next handler in chain."""
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Return a cached page when possible, otherwise render and store it."""
+        if not _is_anonymous_read(request):
+            return self.get_response(request)
+        spec = _page_spec(request)
+        if spec is None:
+            return self.get_response(request)
+        tags, params = spec
+        if not set(request.GET).issubset(params):
+            return self.get_response(request)
+
+        vary = _get_vary(request, params)
+        if vary is not None:
+            cached = cache.get(_page_key(request, tags, vary, params))
+            if cached is not None:
+                return cached
+
+        response = self.get_response(request)
+        if _is_storable(request, response):
+            vary = [h for h in cc_delim_re.split(response.get("Vary", "")) if h]
+            vary_key = _vary_key(request, params)
+            cache.set(vary_key, vary, PAGE_VARY_TTL)
+            local_cache.set(vary_key, vary, PAGE_CACHE_TTL)
+            cache.set(_page_key(request, tags, vary, params), response, PAGE_CACHE_TTL)
+        return response
@@ -8,6 +8,8 @@ Environment-specific settings are in local.py, development.py, staging.py, produ
 import os
 from pathlib import Path
 
+from celery.schedules import crontab
+
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 SECRET_KEY = os.getenv("SECRET_KEY", "")
@@ -57,8 +59,32 @@ DJANGO_NOTIFICATIONS_CONFIG = {
     "SOFT_DELETE": False,
 }
 
+# Same-verb notifications within this window are merged into one digest row
+NOTIFICATION_COALESCE_MINUTES = 10
+
+# Redis pub/sub used to push live notification badges (disabled when unset).
+# The stream needs the ASGI app (saltadev.asgi); set this only where the site
+# is served through ASGI, never under gunicorn's WSGI workers.
+NOTIFICATIONS_LIVE_REDIS_URL = os.getenv("NOTIFICATIONS_LIVE_REDIS_URL")
+
+# Retention for read notifications (see user_notifications/retention.py)
+NOTIFICATION_RETENTION_DAYS = 180
+NOTIFICATION_RETENTION_BATCH_SIZE = 1000
+NOTIFICATION_RETENTION_SLEEP_SECONDS = 0.5
+NOTIFICATION_RETENTION_ARCHIVE = False
+
+# Retention for auth tables: tokens, codes, axes logs and database sessions
+# (see users/retention.py)
+AUTH_RETENTION_BATCH_SIZE = 1000
+AUTH_RETENTION_SLEEP_SECONDS = 0.1
+# Days before never-confirmed accounts are deleted; None keeps them
+AUTH_RETENTION_UNVERIFIED_USER_DAYS = None
+AUTH_RETENTION_AXES_LOG_DAYS = 90
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Before sessions: cached anonymous pages skip the rest of the stack
+    "saltadev.page_cache.PageCacheMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -111,6 +137,8 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTHENTICATION_BACKENDS = [
     "axes.backends.AxesBackend",
+    "users.backends.EmailBackend",
+    # Never reached for email/password logins; keeps older sessions valid
     "django.contrib.auth.backends.ModelBackend",
     "allauth.account.auth_backends.AuthenticationBackend",
 ]
@@ -123,8 +151,10 @@ AXES_LOCKOUT_PARAMETERS = [
     "ip_address",
 ]
 AXES_USERNAME_FORM_FIELD = "username"
-AXES_LOCKOUT_MESSAGE = "Demasiados intentos fallidos. Fuiste bloqueado por 1 hora después de 5 intentos. Intentá nuevamente más tarde."
 AXES_LOCKOUT_TEMPLATE = "registration/axes_lockout.html"
+# Lockouts share the rl:login:* keys; audit rows are written in batches
+AXES_HANDLER = "users.axes_handler.RateLimitAxesHandler"
+AXES_ENABLE_ACCESS_FAILURE_LOG = True
 
 
 # Internationalization
@@ -201,6 +231,28 @@ SILENCED_SYSTEM_CHECKS = ["django_recaptcha.recaptcha_test_key_error"]
 TAILWIND_CLI_SRC_CSS = "tailwind/source.css"
 TAILWIND_CLI_DIST_CSS = "static/css/tailwind.css"
 
+# Rate limits for auth flows: attempts allowed per window (seconds) and scope.
+# On Redis the GCRA engine gives one attempt back every window / limit.
+RATE_LIMITS = {
+    "login": {"limit": 5, "window": 60 * 60},
+    "register": {"limit": 3, "window": 60 * 60},
+    "verify": {"limit": 5, "window": 60 * 60},
+    "password_reset_request": {"limit": 5, "window": 60 * 60},
+    "password_reset_confirm": {"limit": 5, "window": 60 * 60},
+}
+# Lockouts recover gradually, one attempt every window / limit (see above)
+AXES_LOCKOUT_MESSAGE = (
+    "Demasiados intentos fallidos. Recuperás un intento cada "
+    f"{RATE_LIMITS['login']['window'] // RATE_LIMITS['login']['limit'] // 60} "
+    "minutos; intentá nuevamente más tarde."
+)
+# Dotted path to a users.ratelimit engine; None picks GCRA on Redis
+RATE_LIMIT_ENGINE = None
+# Dotted path to a users.token_store store; None picks Redis TTL keys on Redis.
+# Under an allkeys-lru Redis (Render) pending codes/tokens can be evicted;
+# use "users.token_store.DatabaseTokenStore" if that is not acceptable.
+TOKEN_STORE = None
+
 # Celery configuration (base settings, broker/result backend set per environment)
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
@@ -209,6 +261,24 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TIME_LIMIT = 300  # 5 minutes max per task
 CELERY_RESULT_EXPIRES = 3600  # Results expire after 1 hour
 CELERY_TASK_ACKS_LATE = True  # Re-execute task if worker dies
+CELERY_BEAT_SCHEDULE = {
+    "purge-read-notifications": {
+        "task": "user_notifications.tasks.purge_read_notifications_task",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    "send-weekly-digest": {
+        "task": "user_notifications.tasks.send_weekly_digest_task",
+        "schedule": crontab(day_of_week="mon", hour=9, minute=0),
+    },
+    "flush-axes-audit": {
+        "task": "users.tasks.flush_axes_audit_task",
+        "schedule": 60.0,
+    },
+    "purge-auth-data": {
+        "task": "users.tasks.purge_auth_data_task",
+        "schedule": crontab(hour=4, minute=30),
+    },
+}
 
 # django-allauth configuration
 # We use allauth only for social login; traditional auth uses our custom views
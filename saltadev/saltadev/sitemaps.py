@@ -13,7 +13,7 @@ class StaticViewSitemap(Sitemap):
 
     def items(self) -> list[str]:
         """Return list of URL names for static pages."""
-        return ["home", "events_list", "code_of_conduct", "benefits_list"]
+        return ["home", "events", "code_of_conduct", "benefits_list"]
 
     def location(self, item: str) -> str:
         """Return the URL for the given item."""
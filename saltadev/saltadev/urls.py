@@ -27,6 +27,7 @@ from django.shortcuts import render
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from .page_cache import anonymous_page
 from .sitemaps import sitemaps
 from .views import health_check
 
@@ -48,7 +49,12 @@ urlpatterns = [
         TemplateView.as_view(template_name="robots.txt", content_type="text/plain"),
         name="robots_txt",
     ),
-    path("sitemap.xml", sitemap, {"sitemaps": sitemaps}, name="sitemap"),
+    path(
+        "sitemap.xml",
+        anonymous_page(params=("p",))(sitemap),
+        {"sitemaps": sitemaps},
+        name="sitemap",
+    ),
     path("", include("home.urls")),
     path("eventos/", include("events.urls")),
     path("reglamento/", include("code_of_conduct.urls")),
@@ -69,9 +75,6 @@ urlpatterns = [
     path(
         "credencial/<str:public_id>/", public_credential_view, name="public_credential"
     ),
-    path(
-        "inbox/notifications/", include("notifications.urls", namespace="notifications")
-    ),
     path("notificaciones/", include("user_notifications.urls")),
     path("accounts/", include("allauth.urls")),
 ]
@@ -1,11 +1,15 @@
 """Project-level views for the saltadev project."""
 
+from typing import Any
+
 from django.core.cache import cache
 from django.db import connection
 from django.http import HttpRequest, JsonResponse
 from django.views.decorators.http import require_http_methods
 from loguru import logger
 
+from .cache import get_or_build
+
 HEALTH_CACHE_KEY = "health_check_result"
 HEALTH_CACHE_TTL = 30  # seconds
 
@@ -19,14 +23,16 @@ def health_check(_request: HttpRequest) -> JsonResponse:
     - PostgreSQL connection
     - Redis connection
 
-    Result is cached for 30 seconds to prevent DB/Redis flood attacks.
+    Result is cached for 30 seconds to prevent DB/Redis flood attacks, and
+    only one worker at a time re-runs the checks when it expires.
     Errors are logged but not exposed in the API response.
     """
-    # Return cached result if available (protects DB/Redis from flood)
-    cached = cache.get(HEALTH_CACHE_KEY)
-    if cached is not None:
-        return JsonResponse(cached["data"], status=cached["status_code"])
+    cached = get_or_build(HEALTH_CACHE_KEY, _run_checks, HEALTH_CACHE_TTL)
+    return JsonResponse(cached["data"], status=cached["status_code"])
+
 
+def _run_checks() -> dict[str, Any]:
+    """Check every service and return the response payload and status."""
     services: dict[str, str] = {
         "django": "ok",
         "postgres": "unknown",
@@ -62,7 +68,4 @@ def health_check(_request: HttpRequest) -> JsonResponse:
         health["status"] = "unhealthy"
 
     status_code = 200 if health["status"] == "healthy" else 503
-    cache.set(
-        HEALTH_CACHE_KEY, {"data": health, "status_code": status_code}, HEALTH_CACHE_TTL
-    )
-    return JsonResponse(health, status=status_code)
+    return {"data": health, "status_code": status_code}
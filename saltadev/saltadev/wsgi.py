@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "saltadev.settings.local")
 
 application = get_wsgi_application()
+
+# Each gunicorn worker imports this module after forking, so every worker
+# gets its own subscription to cross-process cache invalidations.
+from saltadev.cache import start_invalidation_listener  # noqa: E402
+
+start_invalidation_listener()
@@ -0,0 +1,9 @@
+(() => {
+  var badge = document.querySelector('[data-notification-badge]');
+  if (!badge || !window.EventSource) return;
+  var source = new EventSource(badge.dataset.streamUrl);
+  source.addEventListener('badge', (event) => {
+    var data = JSON.parse(event.data);
+    badge.classList.toggle('hidden', !(data.unread > 0));
+  });
+})();
@@ -0,0 +1,34 @@
+"""Admin configuration for user notifications."""
+
+from django.contrib import admin
+from django.http import HttpRequest
+
+from .models import ArchivedNotification, Broadcast
+
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    """Admin configuration for Broadcast model."""
+
+    list_display = ("verb", "description", "creator", "timestamp")
+    list_filter = ("verb",)
+    search_fields = ("verb", "description")
+    readonly_fields = ("timestamp",)
+    date_hierarchy = "timestamp"
+
+
+@admin.register(ArchivedNotification)
+class ArchivedNotificationAdmin(admin.ModelAdmin):
+    """Read-only admin for notifications archived by the retention job."""
+
+    list_display = ("verb", "recipient_id", "timestamp", "archived_at")
+    search_fields = ("verb", "description")
+    date_hierarchy = "archived_at"
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(
+        self, request: HttpRequest, obj: ArchivedNotification | None = None
+    ) -> bool:
+        return False
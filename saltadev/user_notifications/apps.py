@@ -9,3 +9,7 @@ class UserNotificationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "user_notifications"
     verbose_name = "Notificaciones de Usuario"
+
+    def ready(self) -> None:
+        """Import signals when the app is ready."""
+        import user_notifications.signals  # noqa: F401
@@ -0,0 +1,45 @@
+"""Resolve the members targeted by an announcement.
+
+The audience is a single query over ``users_user`` joined to the profile and
+notification preference tables; every filter hits an index (province FK,
+``email_confirmed``, ``Profile.technical_role``, preference primary key).
+"""
+
+from django.db import models
+from users.models import User
+
+from .models import ANNOUNCEMENT_PREFERENCES, AudienceTargeting
+
+
+def resolve_audience(target: AudienceTargeting) -> models.QuerySet[User]:
+    """Return the verified members an announcement about ``target`` reaches.
+
+    Args:
+        target: Event or benefit carrying the audience filters.
+
+    Returns:
+        QuerySet of active, verified users matching every filter set on
+        ``target``, excluding its creator and members who muted its kind.
+    """
+    preference = ANNOUNCEMENT_PREFERENCES[target._meta.label_lower]
+    flag = f"notification_preference__{preference}"
+
+    audience = User.objects.filter(is_active=True, email_confirmed=True)
+    if target.audience_province_id:
+        audience = audience.filter(province_id=target.audience_province_id)
+    if target.audience_technical_role:
+        audience = audience.filter(
+            profile__technical_role=target.audience_technical_role
+        )
+    if target.audience_opted_in_only:
+        audience = audience.filter(**{flag: True})
+    else:
+        # Members without a preference row get the default (enabled)
+        audience = audience.filter(
+            models.Q(notification_preference__isnull=True) | models.Q(**{flag: True})
+        )
+
+    creator_id = getattr(target, "creator_id", None)
+    if creator_id:
+        audience = audience.exclude(pk=creator_id)
+    return audience
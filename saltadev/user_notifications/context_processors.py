@@ -1,16 +1,28 @@
 """Context processors for user notifications."""
 
 from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
 
+from .counters import get_unread_count
+from .live import get_live_redis_url
 
-def unread_notifications_count(request: HttpRequest) -> dict[str, int]:
+
+def unread_notifications_count(request: HttpRequest) -> dict[str, object]:
     """Add unread notifications count to the template context.
 
+    The count is lazy: templates that never show the badge never hit the
+    cache or the database.
+
     Returns:
-        Dictionary with 'unread_notifications_count' key.
+        Dictionary with 'unread_notifications_count' and
+        'live_notifications' (whether to load the live badge script) keys.
     """
     if request.user.is_authenticated:
+        user = request.user
         return {
-            "unread_notifications_count": request.user.notifications.unread().count()  # type: ignore[attr-defined]
+            "unread_notifications_count": SimpleLazyObject(
+                lambda: get_unread_count(user)
+            ),
+            "live_notifications": bool(get_live_redis_url()),
         }
-    return {"unread_notifications_count": 0}
+    return {"unread_notifications_count": 0, "live_notifications": False}
@@ -0,0 +1,137 @@
+"""Cached per-user unread notification counters.
+
+The badge count is read on every authenticated render, so it is kept in the
+cache and only recomputed from the database on a miss. Personal notifications
+and broadcasts are cached separately: a new broadcast cannot touch every
+member's key, so the broadcast part is stamped with the newest broadcast id
+and recounted only when that id changes.
+
+Every write path goes through the helpers below, which also notify open live
+streams (see ``live.py``) that the badge changed. Bulk ``.update()`` calls send
+no signal, so views that use them must call ``invalidate_unread_counts``
+themselves (django-notifications' own mark-all URLs are not mounted for that
+reason).
+
+A refill races with writes: a read may count the rows just before a new
+notification commits, while the increment finds no key to bump. Refills use
+``cache.add`` so they never overwrite a value someone else stored, and the
+short TTL bounds how long such a miscount can last.
+"""
+
+from collections.abc import Iterable
+from contextlib import suppress
+from typing import TYPE_CHECKING
+
+from django.core.cache import cache
+from django.db.models import Max
+
+from .live import BadgeState, publish_badge_update, publish_broadcast_update
+from .models import (
+    ANNOUNCEMENT_PREFERENCES,
+    Broadcast,
+    BroadcastReadMark,
+    NotificationPreference,
+)
+
+if TYPE_CHECKING:
+    from users.models import User
+
+UNREAD_CACHE_TTL = 60 * 5
+LATEST_BROADCAST_KEY = "notif:broadcast:latest"
+
+
+def _personal_key(user_id: int) -> str:
+    return f"notif:unread:{user_id}"
+
+
+def _broadcast_key(user_id: int) -> str:
+    return f"notif:unread_broadcasts:{user_id}"
+
+
+def _latest_broadcast_id() -> int:
+    """Return the newest broadcast id, refilling the cache on a miss."""
+    latest = Broadcast.objects.aggregate(latest=Max("pk"))["latest"] or 0
+    cache.add(LATEST_BROADCAST_KEY, latest, UNREAD_CACHE_TTL)
+    return latest
+
+
+def get_unread_count(user: "User") -> int:
+    """Return unread personal notifications plus unread broadcasts.
+
+    Costs a single cache round trip on a hit; each stale part is recounted
+    from the database and written back.
+    """
+    personal_key = _personal_key(user.pk)
+    broadcast_key = _broadcast_key(user.pk)
+    cached = cache.get_many([personal_key, broadcast_key, LATEST_BROADCAST_KEY])
+
+    personal = cached.get(personal_key)
+    if personal is None:
+        personal = user.notifications.unread().count()  # type: ignore[attr-defined]
+        cache.add(personal_key, personal, UNREAD_CACHE_TTL)
+
+    latest = cached.get(LATEST_BROADCAST_KEY)
+    if latest is None:
+        latest = _latest_broadcast_id()
+
+    stamped = cached.get(broadcast_key)
+    if stamped is not None and stamped[0] == latest:
+        broadcasts = stamped[1]
+    else:
+        broadcasts = Broadcast.objects.unread_for(user).count()
+        cache.set(broadcast_key, (latest, broadcasts), UNREAD_CACHE_TTL)
+
+    return personal + broadcasts
+
+
+def increment_unread_count(user_id: int) -> None:
+    """Add one to a cached personal count; a missing key is refilled lazily."""
+    with suppress(ValueError):
+        cache.incr(_personal_key(user_id))
+    publish_badge_update([user_id])
+
+
+def invalidate_unread_counts(user_ids: Iterable[int]) -> None:
+    """Drop the cached counts so the next read recounts from the database."""
+    user_ids = list(user_ids)
+    keys = []
+    for user_id in user_ids:
+        keys.extend([_personal_key(user_id), _broadcast_key(user_id)])
+    if keys:
+        cache.delete_many(keys)
+        publish_badge_update(user_ids)
+
+
+def invalidate_latest_broadcast(broadcast: Broadcast, delta: int = 0) -> None:
+    """Force every member's broadcast count to be recounted on next read.
+
+    Args:
+        broadcast: The broadcast that changed.
+        delta: +1 for a new broadcast, -1 for a deleted one, 0 for an edit
+            (live streams are only told about the first two).
+    """
+    cache.delete(LATEST_BROADCAST_KEY)
+    if delta:
+        publish_broadcast_update(broadcast, delta)
+
+
+def get_badge_state(user: "User") -> BadgeState:
+    """Return the user's unread count and what a live stream needs to keep it.
+
+    Loaded once per stream and again whenever the member's own channel
+    reports a change (read marks, preferences).
+    """
+    preference = NotificationPreference.for_user(user)
+    visible = user.is_active and user.email_confirmed
+    return BadgeState(
+        unread=get_unread_count(user),
+        user_id=user.pk,
+        joined_at=user.registered_at if visible else None,
+        watermark=BroadcastReadMark.last_read_id_for(user),
+        latest_broadcast_id=_latest_broadcast_id(),
+        muted=frozenset(
+            label
+            for label, field in ANNOUNCEMENT_PREFERENCES.items()
+            if not getattr(preference, field)
+        ),
+    )
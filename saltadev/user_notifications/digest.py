@@ -0,0 +1,163 @@
+"""Weekly email digest of new events and benefits.
+
+The list of events and benefits is the same for every member, so it is
+queried and serialized once per run. Each chunk of recipients then renders
+the compiled template per member and goes out over a single connection
+(one SMTP handshake or one Anymail HTTP session per chunk).
+
+Every accepted email is recorded as a ``DigestDelivery`` for its ISO week,
+and members who already have one are skipped, so retrying a chunk or
+re-running the whole job never emails anyone twice.
+"""
+
+from datetime import datetime
+from typing import Any
+
+from benefits.models import Benefit
+from content.models import Event
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils.html import strip_tags
+from saltadev.logging import get_logger
+from users.models import User
+
+from .models import DigestDelivery
+
+logger = get_logger()
+
+DIGEST_TEMPLATE = "emails/weekly_digest.html"
+DIGEST_SUBJECT = "Novedades de la semana - SaltaDev"
+# Matches the Resend batch limit and keeps each SMTP session short
+DIGEST_CHUNK_SIZE = 100
+
+
+def build_digest_context(since: datetime, until: datetime) -> dict[str, Any] | None:
+    """Collect the events and benefits published between ``since`` and ``until``.
+
+    Returns:
+        A JSON-serializable template context shared by every recipient, or
+        None if there is nothing new to send.
+    """
+    # Events approved in the window, or created already approved by staff
+    published = Q(approved_at__gte=since, approved_at__lt=until) | Q(
+        approved_at__isnull=True, created_at__gte=since, created_at__lt=until
+    )
+    events = [
+        {
+            "title": event.title,
+            "date": event.event_date_display,
+            "location": event.location,
+            "url": event.link or f"{settings.SITE_URL}{reverse('events')}",
+        }
+        for event in Event.objects.filter(
+            published, status=Event.Status.APPROVED
+        ).order_by("event_start_date")
+    ]
+    benefits = [
+        {
+            "title": benefit.title,
+            "url": settings.SITE_URL
+            + reverse("benefit_detail", kwargs={"pk": benefit.pk}),
+        }
+        for benefit in Benefit.objects.filter(
+            is_active=True, created_at__gte=since, created_at__lt=until
+        ).order_by("-created_at")
+    ]
+    if not events and not benefits:
+        return None
+
+    return {
+        "events": events,
+        "benefits": benefits,
+        "site_url": settings.SITE_URL,
+        "site_whatsapp": settings.SITE_WHATSAPP,
+        "site_discord": settings.SITE_DISCORD,
+        "site_github": settings.SITE_GITHUB,
+        "site_linkedin": settings.SITE_LINKEDIN,
+        "site_twitter": settings.SITE_TWITTER,
+        "site_instagram": settings.SITE_INSTAGRAM,
+    }
+
+
+def digest_week(moment: datetime) -> str:
+    """Return the ISO week a digest run belongs to, e.g. ``2026-W42``."""
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def digest_recipients(week: str | None = None) -> QuerySet[User]:
+    """Return verified members who did not turn the weekly digest off.
+
+    Args:
+        week: If given, also leave out members already sent that week's digest.
+    """
+    recipients = User.objects.filter(is_active=True, email_confirmed=True).filter(
+        Q(notification_preference__isnull=True)
+        | Q(notification_preference__weekly_digest=True)
+    )
+    if week is not None:
+        recipients = recipients.exclude(
+            Exists(DigestDelivery.objects.filter(user=OuterRef("pk"), week=week))
+        )
+    return recipients
+
+
+def send_digest_chunk(
+    user_ids: list[int], context: dict[str, Any], week: str
+) -> tuple[int, list[int]]:
+    """Render and send the digest to the members of a chunk who lack it.
+
+    Messages go out one at a time over a shared connection, so a failure
+    only affects its own recipient.
+
+    Args:
+        user_ids: Primary keys of the recipients in this chunk.
+        context: Shared context from ``build_digest_context``.
+        week: ISO week of the run (see ``digest_week``).
+
+    Returns:
+        Number of emails accepted by the backend, and the ids of the members
+        whose email failed.
+    """
+    template = get_template(DIGEST_TEMPLATE)
+    recipients = digest_recipients(week).filter(pk__in=user_ids)
+    messages = []
+    for user in recipients.only("email", "first_name"):
+        html_message = template.render(
+            {**context, "user": {"first_name": user.first_name}}
+        )
+        message = EmailMultiAlternatives(
+            subject=DIGEST_SUBJECT,
+            body=strip_tags(html_message),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[user.email],
+        )
+        message.attach_alternative(html_message, "text/html")
+        messages.append((user.pk, message))
+
+    delivered: list[DigestDelivery] = []
+    failed: list[int] = []
+    if not messages:
+        return 0, failed
+    try:
+        with get_connection() as connection:
+            for user_id, message in messages:
+                try:
+                    sent = connection.send_messages([message])
+                except Exception as exc:
+                    logger.warning(
+                        "Weekly digest email failed",
+                        extra={"user_id": user_id, "error": str(exc)},
+                    )
+                    sent = 0
+                if sent:
+                    delivered.append(DigestDelivery(user_id=user_id, week=week))
+                else:
+                    failed.append(user_id)
+    finally:
+        # Recorded even if the connection breaks midway
+        DigestDelivery.objects.bulk_create(delivered, ignore_conflicts=True)
+    return len(delivered), failed
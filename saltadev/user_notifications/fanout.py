@@ -0,0 +1,205 @@
+"""Bulk fan-out of a single notification to many recipients.
+
+``notify.send`` saves one row per recipient, which turns community-wide
+announcements into thousands of INSERTs inside the request. The helpers here
+build ``Notification`` rows in memory and write them in fixed-size chunks.
+
+Bursts are coalesced on the way in: if a recipient still has an unread
+notification with the same verb from the last few minutes, the new action
+object is merged into that row as a digest ("3 nuevos eventos") instead of
+adding another row and another badge bump. The digest row keeps its first
+action object and timestamp, so it never moves within the inbox's keyset
+pagination and the merge window closes a fixed time after the first item.
+Which objects were announced is tracked by ``SentAnnouncement``, not by the
+rows.
+"""
+
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.utils import timezone
+from notifications.models import Notification
+
+from .counters import invalidate_unread_counts
+
+FANOUT_CHUNK_SIZE = 500
+DEFAULT_COALESCE_MINUTES = 10
+# Digest rows keep the newest items only; ``count`` still reflects the total
+DIGEST_MAX_ITEMS = 20
+
+# Plural labels used in digest descriptions, keyed by notification verb
+DIGEST_LABELS = {
+    "Nuevo evento": "nuevos eventos",
+    "Nuevo beneficio": "nuevos beneficios",
+}
+
+
+def chunked(values: Iterable[int], size: int) -> Iterator[list[int]]:
+    """Yield successive lists of at most ``size`` items from ``values``."""
+    iterator = iter(values)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def stream_recipient_ids(
+    recipients: models.QuerySet[Any], chunk_size: int = FANOUT_CHUNK_SIZE
+) -> Iterator[int]:
+    """Stream recipient primary keys without loading full model instances."""
+    return (
+        recipients.order_by("pk")
+        .values_list("pk", flat=True)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def fan_out(
+    recipient_ids: Iterable[int],
+    *,
+    actor: models.Model,
+    verb: str,
+    action_object: models.Model | None = None,
+    description: str = "",
+    data: dict[str, Any] | None = None,
+    chunk_size: int = FANOUT_CHUNK_SIZE,
+    coalesce_minutes: int | None = None,
+) -> int:
+    """Create one notification per recipient using chunked bulk inserts.
+
+    When ``action_object`` is given, recipients with an unread notification
+    of the same verb newer than ``coalesce_minutes`` get that row updated
+    into a digest instead of a new row.
+
+    Args:
+        recipient_ids: Primary keys of the users to notify (may be a stream).
+        actor: Object that performed the action.
+        verb: Short notification title (e.g. "Nuevo evento").
+        action_object: Optional object the notification refers to.
+        description: Longer notification text.
+        data: Extra payload stored in the notification JSON field.
+        chunk_size: Number of rows written per INSERT.
+        coalesce_minutes: Merge window (default NOTIFICATION_COALESCE_MINUTES;
+            0 disables coalescing).
+
+    Returns:
+        Number of notification rows written (inserted or merged).
+    """
+    if coalesce_minutes is None:
+        coalesce_minutes = getattr(
+            settings, "NOTIFICATION_COALESCE_MINUTES", DEFAULT_COALESCE_MINUTES
+        )
+    actor_content_type = ContentType.objects.get_for_model(actor)
+    action_content_type = (
+        ContentType.objects.get_for_model(action_object) if action_object else None
+    )
+    timestamp = timezone.now()
+    item = None
+    if action_object is not None and coalesce_minutes:
+        item = {"id": action_object.pk, "description": description, **(data or {})}
+    written = 0
+
+    for chunk in chunked(recipient_ids, chunk_size):
+        if item is not None:
+            merged = _merge_into_digests(
+                chunk,
+                verb=verb,
+                item=item,
+                since=timestamp - timedelta(minutes=coalesce_minutes),
+                action_content_type=action_content_type,
+            )
+            merged_ids = {row.recipient_id for row in merged}
+            chunk = [pk for pk in chunk if pk not in merged_ids]
+            written += len(merged)
+
+        rows = [
+            Notification(
+                recipient_id=recipient_id,
+                actor_content_type=actor_content_type,
+                actor_object_id=actor.pk,
+                verb=verb,
+                description=description,
+                action_object_content_type=action_content_type,
+                action_object_object_id=action_object.pk if action_object else None,
+                timestamp=timestamp,
+                data=data,
+            )
+            for recipient_id in chunk
+        ]
+        if rows:
+            Notification.objects.bulk_create(rows)
+            # bulk_create skips post_save, so refresh the recipients' badges here
+            invalidate_unread_counts(chunk)
+        written += len(rows)
+
+    return written
+
+
+def _digest_item(row: Notification) -> dict[str, Any]:
+    """Describe a not-yet-merged notification as a digest item."""
+    return {
+        "id": row.action_object_object_id,
+        "description": row.description,
+        **(row.data or {}),
+    }
+
+
+def _merge_into_digests(
+    recipient_ids: list[int],
+    *,
+    verb: str,
+    item: dict[str, Any],
+    since: datetime,
+    action_content_type: ContentType | None,
+) -> list[Notification]:
+    """Fold ``item`` into each recipient's recent unread row of ``verb``.
+
+    One SELECT finds the candidate rows for the whole chunk and one
+    ``bulk_update`` writes them back. The rows stay locked in between, so a
+    concurrent fan-out merging into the same digest waits instead of
+    overwriting this item. Unread counts are unchanged, so the cached badges
+    are left alone.
+
+    Returns:
+        The rows that absorbed the item, including rows that already listed
+        it (a retried announcement), which are not written again.
+    """
+    # savepoint=False: no extra queries when called inside announce()
+    with transaction.atomic(savepoint=False):
+        # Locked in recipient order, so concurrent fan-outs cannot deadlock
+        candidates = (
+            Notification.objects.select_for_update()
+            .filter(
+                recipient_id__in=recipient_ids,
+                verb=verb,
+                unread=True,
+                timestamp__gte=since,
+                action_object_content_type=action_content_type,
+            )
+            .order_by("recipient_id", "-timestamp", "-pk")
+        )
+
+        latest: dict[int, Notification] = {}
+        for row in candidates:
+            latest.setdefault(row.recipient_id, row)
+
+        label = DIGEST_LABELS.get(verb, verb.lower())
+        changed = []
+        for row in latest.values():
+            data = dict(row.data or {})
+            digest = data.get("digest") or [_digest_item(row)]
+            if str(item["id"]) in {str(entry["id"]) for entry in digest}:
+                continue
+            data["digest"] = [*digest, item][-DIGEST_MAX_ITEMS:]
+            data["count"] = data.get("count", 1) + 1
+            data["url"] = item.get("url", data.get("url"))
+            row.data = data
+            row.description = f"{data['count']} {label}"
+            changed.append(row)
+
+        if changed:
+            Notification.objects.bulk_update(changed, ["data", "description"])
+    return list(latest.values())
@@ -0,0 +1,22 @@
+"""Forms for user notifications."""
+
+from django import forms
+
+from .models import NotificationPreference
+
+CHECKBOX_CLASS = (
+    "size-4 rounded border-[#3d2f2f] bg-[#1d1919] text-primary focus:ring-primary"
+)
+
+
+class NotificationPreferenceForm(forms.ModelForm):
+    """Form for choosing which community announcements to receive."""
+
+    class Meta:
+        model = NotificationPreference
+        fields = ["events", "benefits", "weekly_digest"]
+        widgets = {
+            "events": forms.CheckboxInput(attrs={"class": CHECKBOX_CLASS}),
+            "benefits": forms.CheckboxInput(attrs={"class": CHECKBOX_CLASS}),
+            "weekly_digest": forms.CheckboxInput(attrs={"class": CHECKBOX_CLASS}),
+        }
@@ -0,0 +1,132 @@
+"""Live badge updates over Redis pub/sub.
+
+Whenever a member's unread count may have changed, a one-byte message is
+published on their channel and their open streams recount. Broadcasts go to
+every member at once, so they are published on the shared broadcast channel
+with a description of the broadcast instead: each stream decides from its
+``BadgeState`` whether the broadcast counts for its member and adjusts the
+count in memory, without touching the cache or the database.
+
+The SSE stream in ``views.notification_stream`` needs the ASGI application.
+``NOTIFICATIONS_LIVE_REDIS_URL`` is only set where the site is served through
+ASGI; without it every publish is a no-op and the badge script is not loaded.
+"""
+
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import redis
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from saltadev.logging import get_logger
+
+if TYPE_CHECKING:
+    from .models import Broadcast
+
+logger = get_logger()
+
+LIVE_CHANNEL_PREFIX = "notif:live:"
+BROADCAST_CHANNEL = f"{LIVE_CHANNEL_PREFIX}broadcast"
+
+
+def get_live_redis_url() -> str | None:
+    """Return the Redis URL used for live updates, or None if disabled."""
+    return getattr(settings, "NOTIFICATIONS_LIVE_REDIS_URL", None) or None
+
+
+def user_channel(user_id: int) -> str:
+    """Return the pub/sub channel carrying badge updates for one member."""
+    return f"{LIVE_CHANNEL_PREFIX}{user_id}"
+
+
+@lru_cache(maxsize=1)
+def _get_client(url: str) -> redis.Redis:
+    return redis.Redis.from_url(url)
+
+
+def _publish(channels: list[str], message: str = "1") -> None:
+    """Publish ``message`` on every channel in a single round trip."""
+    url = get_live_redis_url()
+    if not url:
+        return
+    try:
+        with _get_client(url).pipeline(transaction=False) as pipe:
+            for channel in channels:
+                pipe.publish(channel, message)
+            pipe.execute()
+    except redis.RedisError as exc:
+        # Badges fall back to the next page load; never fail the write path
+        logger.warning("Live badge publish failed", extra={"error": str(exc)})
+
+
+def publish_badge_update(user_ids: Iterable[int]) -> None:
+    """Ask the open streams of ``user_ids`` to refresh once the data commits."""
+    if not get_live_redis_url():
+        return
+    channels = [user_channel(user_id) for user_id in user_ids]
+    if channels:
+        transaction.on_commit(lambda: _publish(channels))
+
+
+def publish_broadcast_update(broadcast: "Broadcast", delta: int) -> None:
+    """Tell every open stream a broadcast was added (+1) or removed (-1)."""
+    if not get_live_redis_url():
+        return
+    content_type_id = broadcast.action_object_content_type_id
+    kind = ""
+    if content_type_id:
+        content_type = ContentType.objects.get_for_id(content_type_id)
+        kind = f"{content_type.app_label}.{content_type.model}"
+    message = json.dumps(
+        {
+            "id": broadcast.pk,
+            "delta": delta,
+            "kind": kind,
+            "creator": broadcast.creator_id,
+            "timestamp": broadcast.timestamp.isoformat(),
+        }
+    )
+    transaction.on_commit(lambda: _publish([BROADCAST_CHANNEL], message))
+
+
+@dataclass
+class BadgeState:
+    """A member's unread count plus what is needed to apply broadcast messages.
+
+    Mirrors ``BroadcastQuerySet.unread_for`` in memory. ``joined_at`` is None
+    for members who see no broadcasts at all.
+    """
+
+    unread: int
+    user_id: int
+    joined_at: datetime | None
+    watermark: int
+    latest_broadcast_id: int
+    muted: frozenset[str]
+
+    def apply_broadcast(self, message: bytes | str) -> bool:
+        """Apply a broadcast channel message; return whether the count changed."""
+        payload = json.loads(message)
+        broadcast_id = payload["id"]
+        if payload["delta"] > 0:
+            # Already counted if it existed when the state was loaded
+            if broadcast_id <= self.latest_broadcast_id:
+                return False
+            self.latest_broadcast_id = broadcast_id
+        elif broadcast_id > self.latest_broadcast_id:
+            return False
+        if (
+            self.joined_at is None
+            or broadcast_id <= self.watermark
+            or payload["creator"] == self.user_id
+            or payload["kind"] in self.muted
+            or datetime.fromisoformat(payload["timestamp"]) < self.joined_at
+        ):
+            return False
+        self.unread = max(self.unread + payload["delta"], 0)
+        return True
@@ -0,0 +1,52 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from ...retention import get_high_water_mark, purge_read_notifications
+
+
+class Command(BaseCommand):
+    help = "Delete or archive read notifications older than the retention age."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--days", type=int, help="Minimum age in days.")
+        parser.add_argument("--batch-size", type=int, help="Rows per batch.")
+        parser.add_argument(
+            "--sleep", type=float, help="Seconds to pause between batches."
+        )
+        parser.add_argument(
+            "--archive",
+            action="store_true",
+            default=None,
+            help="Copy rows to the archive table before deleting them.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many rows would be processed.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        high_water_mark = get_high_water_mark()
+        if high_water_mark and not options["dry_run"]:
+            self.stdout.write(f"Resuming after notification id {high_water_mark}.")
+
+        result = purge_read_notifications(
+            older_than_days=options["days"],
+            batch_size=options["batch_size"],
+            sleep_seconds=options["sleep"],
+            archive=options["archive"],
+            dry_run=options["dry_run"],
+            log=self.stdout.write,
+        )
+
+        if result.dry_run:
+            self.stdout.write(
+                f"Dry run: {result.processed} notifications would be processed "
+                f"in {result.batches} batches."
+            )
+            return
+        action = "archived" if result.archived else "deleted"
+        self.stdout.write(
+            f"Notifications {action}: {result.processed} in {result.batches} batches."
+        )
@@ -0,0 +1,18 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from ...tasks import send_weekly_digest_task
+
+
+class Command(BaseCommand):
+    help = "Send the weekly digest email (for hosts without Celery beat)."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--days", type=int, default=7, help="Size of the window to summarize."
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        chunks = send_weekly_digest_task.apply(kwargs={"days": options["days"]}).get()
+        self.stdout.write(f"Weekly digest queued in {chunks} chunks.")
@@ -0,0 +1,111 @@
+# Generated by Django 5.2.11 on 2026-10-17 00:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("users", "0011_add_social_login_fields"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BroadcastReadMark",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="broadcast_read_mark",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("last_read_id", models.PositiveBigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "lectura de difusiones",
+                "verbose_name_plural": "lecturas de difusiones",
+            },
+        ),
+        migrations.CreateModel(
+            name="Broadcast",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("verb", models.CharField(max_length=255, verbose_name="título")),
+                (
+                    "description",
+                    models.TextField(blank=True, verbose_name="descripción"),
+                ),
+                (
+                    "url",
+                    models.CharField(blank=True, max_length=500, verbose_name="enlace"),
+                ),
+                (
+                    "action_object_object_id",
+                    models.CharField(blank=True, max_length=255),
+                ),
+                (
+                    "timestamp",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="fecha"
+                    ),
+                ),
+                (
+                    "action_object_content_type",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+                (
+                    "creator",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="creador",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "difusión",
+                "verbose_name_plural": "difusiones",
+                "ordering": ("-timestamp", "-pk"),
+                "indexes": [
+                    models.Index(
+                        fields=["timestamp"], name="user_notifi_timesta_a2ee35_idx"
+                    ),
+                    models.Index(
+                        fields=[
+                            "action_object_content_type",
+                            "action_object_object_id",
+                        ],
+                        name="user_notifi_action__1a3d68_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
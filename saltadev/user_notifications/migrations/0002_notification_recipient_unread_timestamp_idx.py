@@ -0,0 +1,25 @@
+# Generated by Django 5.2.11 on 2026-10-17 01:12
+
+from django.db import migrations
+
+# notifications.Notification belongs to a third-party app, so the index is
+# created with raw SQL instead of editing that app's model state.
+INDEX_NAME = "notif_recipient_unread_ts_idx"
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_notifications", "0001_initial"),
+        ("notifications", "0009_alter_notification_options_and_more"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} "
+                "ON notifications_notification "
+                "(recipient_id, unread, timestamp DESC, id DESC)"
+            ),
+            reverse_sql=f"DROP INDEX IF EXISTS {INDEX_NAME}",
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.11 on 2026-10-17 00:44
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_notifications", "0002_notification_recipient_unread_timestamp_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedNotification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("original_id", models.BigIntegerField(unique=True)),
+                ("recipient_id", models.BigIntegerField(db_index=True)),
+                ("verb", models.CharField(max_length=255)),
+                ("description", models.TextField(blank=True, null=True)),
+                ("data", models.JSONField(blank=True, null=True)),
+                ("timestamp", models.DateTimeField()),
+                (
+                    "archived_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "verbose_name": "notificación archivada",
+                "verbose_name_plural": "notificaciones archivadas",
+            },
+        ),
+    ]
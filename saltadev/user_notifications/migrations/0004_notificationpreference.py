@@ -0,0 +1,43 @@
+# Generated by Django 5.2.11 on 2026-10-17 00:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_notifications", "0003_archivednotification"),
+        ("users", "0012_profile_users_profi_technic_070094_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationPreference",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="notification_preference",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "events",
+                    models.BooleanField(default=True, verbose_name="nuevos eventos"),
+                ),
+                (
+                    "benefits",
+                    models.BooleanField(default=True, verbose_name="nuevos beneficios"),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "preferencia de notificaciones",
+                "verbose_name_plural": "preferencias de notificaciones",
+            },
+        ),
+    ]
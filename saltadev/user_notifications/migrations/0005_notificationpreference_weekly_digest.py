@@ -0,0 +1,19 @@
+# Generated by Django 5.2.11 on 2026-10-17 01:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_notifications", "0004_notificationpreference"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationpreference",
+            name="weekly_digest",
+            field=models.BooleanField(
+                default=True, verbose_name="resumen semanal por email"
+            ),
+        ),
+    ]
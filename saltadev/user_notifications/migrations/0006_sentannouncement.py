@@ -0,0 +1,89 @@
+# Generated by Django 5.2.11 on 2026-10-17 03:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+# Verbs ``announce`` fans out to targeted audiences
+ANNOUNCEMENT_VERBS = ("Nuevo evento", "Nuevo beneficio")
+
+
+def backfill_sent_announcements(apps, schema_editor):
+    """Record a marker for every object already announced, digests included."""
+    Notification = apps.get_model("notifications", "Notification")
+    SentAnnouncement = apps.get_model("user_notifications", "SentAnnouncement")
+
+    sent = set()
+    rows = Notification.objects.filter(
+        verb__in=ANNOUNCEMENT_VERBS, action_object_content_type__isnull=False
+    ).values_list(
+        "verb", "action_object_content_type_id", "action_object_object_id", "data"
+    )
+    for verb, content_type_id, object_id, data in rows.iterator():
+        sent.add((verb, content_type_id, str(object_id)))
+        for item in (data or {}).get("digest") or []:
+            sent.add((verb, content_type_id, str(item["id"])))
+
+    SentAnnouncement.objects.bulk_create(
+        [
+            SentAnnouncement(
+                verb=verb,
+                action_object_content_type_id=content_type_id,
+                action_object_object_id=object_id,
+            )
+            for verb, content_type_id, object_id in sent
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("notifications", "0009_alter_notification_options_and_more"),
+        ("user_notifications", "0005_notificationpreference_weekly_digest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SentAnnouncement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("verb", models.CharField(max_length=255)),
+                ("action_object_object_id", models.CharField(max_length=255)),
+                ("sent_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "action_object_content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "anuncio enviado",
+                "verbose_name_plural": "anuncios enviados",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=(
+                            "verb",
+                            "action_object_content_type",
+                            "action_object_object_id",
+                        ),
+                        name="unique_sent_announcement",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_sent_announcements, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.11 on 2026-10-17 03:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_notifications", "0006_sentannouncement"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DigestDelivery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("week", models.CharField(max_length=8)),
+                ("sent_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "resumen semanal enviado",
+                "verbose_name_plural": "resúmenes semanales enviados",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "week"), name="unique_digest_delivery"
+                    )
+                ],
+            },
+        ),
+    ]
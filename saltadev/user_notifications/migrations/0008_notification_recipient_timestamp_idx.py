@@ -0,0 +1,27 @@
+# Generated by Django 5.2.11 on 2026-10-17 05:40
+
+from django.db import migrations
+
+# Serves the keyset inbox query (inbox.get_inbox_page): recipient only,
+# ordered by -timestamp, -id. The (recipient, unread, ...) index from 0002
+# keeps serving the unread counts but cannot return this order without a
+# sort. Raw SQL for the same reason as 0002: the model is third-party.
+INDEX_NAME = "notif_recipient_ts_id_idx"
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_notifications", "0007_digestdelivery"),
+        ("notifications", "0009_alter_notification_options_and_more"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} "
+                "ON notifications_notification "
+                "(recipient_id, timestamp DESC, id DESC)"
+            ),
+            reverse_sql=f"DROP INDEX IF EXISTS {INDEX_NAME}",
+        ),
+    ]
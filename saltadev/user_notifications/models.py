@@ -0,0 +1,312 @@
+"""Models for broadcasts, audience targeting and notification preferences."""
+
+from typing import TYPE_CHECKING, Any
+
+from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils import timezone
+from users.models import Profile
+
+if TYPE_CHECKING:
+    from users.models import User
+
+# Preference flag that controls announcements about each model
+ANNOUNCEMENT_PREFERENCES = {
+    "content.event": "events",
+    "benefits.benefit": "benefits",
+}
+
+
+class BroadcastQuerySet(models.QuerySet["Broadcast"]):
+    """QuerySet helpers to resolve broadcasts for a single member."""
+
+    def visible_to(self, user: "User") -> "BroadcastQuerySet":
+        """Return broadcasts the user is part of the audience for.
+
+        Matches the old per-member fan-out: only verified members, only
+        announcements published after they joined, and never their own.
+        Announcement kinds the user switched off in ``NotificationPreference``
+        are excluded in the same query.
+        """
+        if not user.is_active or not user.email_confirmed:
+            return self.none()
+        visible = self.filter(timestamp__gte=user.registered_at).exclude(creator=user)
+        for label, field in ANNOUNCEMENT_PREFERENCES.items():
+            app_label, model = label.split(".")
+            muted = NotificationPreference.objects.filter(user=user, **{field: False})
+            visible = visible.exclude(
+                models.Q(
+                    action_object_content_type=ContentType.objects.get_by_natural_key(
+                        app_label, model
+                    )
+                )
+                & models.Q(models.Exists(muted))
+            )
+        return visible
+
+    def unread_for(self, user: "User") -> "BroadcastQuerySet":
+        """Return visible broadcasts newer than the user's read watermark."""
+        return self.visible_to(user).filter(
+            pk__gt=BroadcastReadMark.last_read_id_for(user)
+        )
+
+    def inbox_for(self, user: "User") -> "BroadcastQuerySet":
+        """Return visible broadcasts annotated with a per-user ``unread`` flag."""
+        watermark = BroadcastReadMark.last_read_id_for(user)
+        return self.visible_to(user).annotate(
+            unread=models.Case(
+                models.When(pk__gt=watermark, then=models.Value(True)),
+                default=models.Value(False),
+                output_field=models.BooleanField(),
+            )
+        )
+
+
+class AudienceTargeting(models.Model):
+    """Optional audience filters for announced content (events, benefits).
+
+    With no filter set the announcement goes to every verified member as a
+    single ``Broadcast``; otherwise only the matching members are notified.
+    """
+
+    audience_province = models.ForeignKey(
+        "locations.Province",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="provincia del público",
+    )
+    audience_technical_role = models.CharField(
+        max_length=20,
+        choices=Profile.TechnicalRole.choices,
+        blank=True,
+        verbose_name="rol técnico del público",
+    )
+    audience_opted_in_only = models.BooleanField(
+        default=False,
+        verbose_name="solo miembros suscriptos",
+        help_text="Notificar solo a quienes activaron este tipo de aviso.",
+    )
+
+    class Meta:
+        abstract = True
+
+    @property
+    def has_audience_filters(self) -> bool:
+        """Return True if the announcement targets a subset of members."""
+        return bool(
+            self.audience_province_id
+            or self.audience_technical_role
+            or self.audience_opted_in_only
+        )
+
+
+class Broadcast(models.Model):
+    """Announcement addressed to every member, stored once.
+
+    Replaces writing one identical ``Notification`` row per member for
+    community-wide news such as new events or benefits. Read state lives in
+    ``BroadcastReadMark`` as a per-user watermark.
+    """
+
+    is_broadcast = True
+
+    verb = models.CharField(max_length=255, verbose_name="título")
+    description = models.TextField(blank=True, verbose_name="descripción")
+    url = models.CharField(max_length=500, blank=True, verbose_name="enlace")
+    creator = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="creador",
+    )
+    action_object_content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    action_object_object_id = models.CharField(max_length=255, blank=True)
+    action_object = GenericForeignKey(
+        "action_object_content_type", "action_object_object_id"
+    )
+    timestamp = models.DateTimeField(default=timezone.now, verbose_name="fecha")
+
+    objects = BroadcastQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "difusión"
+        verbose_name_plural = "difusiones"
+        ordering = ("-timestamp", "-pk")
+        indexes = [
+            models.Index(fields=["timestamp"]),
+            models.Index(
+                fields=["action_object_content_type", "action_object_object_id"]
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.verb}: {self.description}"
+
+    @property
+    def data(self) -> dict[str, Any]:
+        """Return the payload in the same shape as ``Notification.data``."""
+        return {"url": self.url} if self.url else {}
+
+
+class BroadcastReadMark(models.Model):
+    """Per-user watermark: broadcasts with ``pk <= last_read_id`` are read."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="broadcast_read_mark",
+    )
+    last_read_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "lectura de difusiones"
+        verbose_name_plural = "lecturas de difusiones"
+
+    def __str__(self) -> str:
+        return f"Broadcasts read by {self.user_id} up to {self.last_read_id}"
+
+    @classmethod
+    def last_read_id_for(cls, user: "User") -> int:
+        """Return the user's watermark, or 0 if they never read a broadcast."""
+        return (
+            cls.objects.filter(user=user).values_list("last_read_id", flat=True).first()
+            or 0
+        )
+
+    @classmethod
+    def mark_read(cls, user: "User", up_to_id: int) -> None:
+        """Advance the user's watermark to ``up_to_id``; it never moves back."""
+        updated = cls.objects.filter(user=user, last_read_id__lt=up_to_id).update(
+            last_read_id=up_to_id, updated_at=timezone.now()
+        )
+        if not updated:
+            cls.objects.get_or_create(user=user, defaults={"last_read_id": up_to_id})
+
+
+class NotificationPreference(models.Model):
+    """Per-user choice of which community announcements to receive.
+
+    Members without a row get the defaults; announcements restricted to
+    opted-in members only reach users who saved the matching flag as True.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_preference",
+    )
+    events = models.BooleanField(default=True, verbose_name="nuevos eventos")
+    benefits = models.BooleanField(default=True, verbose_name="nuevos beneficios")
+    weekly_digest = models.BooleanField(
+        default=True, verbose_name="resumen semanal por email"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "preferencia de notificaciones"
+        verbose_name_plural = "preferencias de notificaciones"
+
+    def __str__(self) -> str:
+        return f"Notification preferences of {self.user_id}"
+
+    @classmethod
+    def for_user(cls, user: "User") -> "NotificationPreference":
+        """Return the user's preferences, unsaved defaults if they have none."""
+        return cls.objects.filter(user=user).first() or cls(user=user)
+
+
+class SentAnnouncement(models.Model):
+    """Marker recording that a targeted announcement was already fanned out.
+
+    ``announce`` checks this instead of looking for a notification pointing at
+    the object: coalescing folds several objects into one digest row, so the
+    rows alone cannot tell which objects were announced.
+    """
+
+    verb = models.CharField(max_length=255)
+    action_object_content_type = models.ForeignKey(
+        ContentType, on_delete=models.CASCADE, related_name="+"
+    )
+    action_object_object_id = models.CharField(max_length=255)
+    sent_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "anuncio enviado"
+        verbose_name_plural = "anuncios enviados"
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    "verb",
+                    "action_object_content_type",
+                    "action_object_object_id",
+                ],
+                name="unique_sent_announcement",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.verb} ({self.action_object_object_id})"
+
+
+class DigestDelivery(models.Model):
+    """Record that a member was sent the weekly digest for an ISO week.
+
+    Written as each email is accepted, so a retried or re-run digest only
+    reaches the members who did not get that week's email yet.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    week = models.CharField(max_length=8)
+    sent_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "resumen semanal enviado"
+        verbose_name_plural = "resúmenes semanales enviados"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "week"], name="unique_digest_delivery"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"Weekly digest {self.week} to {self.user_id}"
+
+
+class ArchivedNotification(models.Model):
+    """Read notification moved out of the live table by the retention job.
+
+    Keeps only what is needed to audit what a member was told; foreign keys
+    are stored as plain ids so archiving never blocks deleting users.
+    """
+
+    original_id = models.BigIntegerField(unique=True)
+    recipient_id = models.BigIntegerField(db_index=True)
+    verb = models.CharField(max_length=255)
+    description = models.TextField(blank=True, null=True)
+    data = models.JSONField(blank=True, null=True)
+    timestamp = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "notificación archivada"
+        verbose_name_plural = "notificaciones archivadas"
+
+    def __str__(self) -> str:
+        return f"{self.verb} ({self.original_id})"
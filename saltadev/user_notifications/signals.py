@@ -0,0 +1,67 @@
+"""Signals that keep the cached unread counters in sync."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from notifications.models import Notification
+
+from .counters import (
+    increment_unread_count,
+    invalidate_latest_broadcast,
+    invalidate_unread_counts,
+)
+from .models import Broadcast
+
+
+@receiver(post_save, sender=Notification)
+def update_unread_count_on_save(
+    sender: type[Notification],
+    instance: Notification,
+    created: bool,
+    **kwargs: object,
+) -> None:
+    """Bump the counter for new notifications, reset it when one changes.
+
+    ``mark_as_read`` saves the row without exposing its previous state, so any
+    update drops the cached count instead of guessing the delta.
+    """
+    if created:
+        if instance.unread:
+            increment_unread_count(instance.recipient_id)
+        return
+    invalidate_unread_counts([instance.recipient_id])
+
+
+@receiver(post_delete, sender=Notification)
+def update_unread_count_on_delete(
+    sender: type[Notification],
+    instance: Notification,
+    **kwargs: object,
+) -> None:
+    """Drop the cached count when an unread notification is deleted.
+
+    Deleting a read notification cannot change the count, so retention
+    purges of read rows cost no cache or pub/sub traffic.
+    """
+    if instance.unread:
+        invalidate_unread_counts([instance.recipient_id])
+
+
+@receiver(post_save, sender=Broadcast)
+def update_latest_broadcast_on_save(
+    sender: type[Broadcast],
+    instance: Broadcast,
+    created: bool,
+    **kwargs: object,
+) -> None:
+    """Invalidate every member's broadcast count when broadcasts change."""
+    invalidate_latest_broadcast(instance, 1 if created else 0)
+
+
+@receiver(post_delete, sender=Broadcast)
+def update_latest_broadcast_on_delete(
+    sender: type[Broadcast],
+    instance: Broadcast,
+    **kwargs: object,
+) -> None:
+    """Invalidate every member's broadcast count when a broadcast is deleted."""
+    invalidate_latest_broadcast(instance, -1)
@@ -0,0 +1,113 @@
+"""
+Celery tasks for user notifications.
+
+Periodic maintenance of the notifications table and the weekly email digest.
+"""
+
+from datetime import timedelta
+from typing import Any
+
+from celery import shared_task
+from django.utils import timezone
+from saltadev.logging import get_logger
+
+from .digest import (
+    DIGEST_CHUNK_SIZE,
+    build_digest_context,
+    digest_recipients,
+    digest_week,
+    send_digest_chunk,
+)
+from .fanout import chunked, stream_recipient_ids
+from .retention import purge_read_notifications
+
+logger = get_logger()
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    max_retries=3,
+)
+def purge_read_notifications_task(self) -> int:
+    """Run the notification retention job from Celery beat.
+
+    Args:
+        self: Task instance (for retries).
+
+    Returns:
+        Number of notifications deleted or archived.
+    """
+    result = purge_read_notifications()
+    logger.info(
+        "Notification retention finished",
+        extra={"processed": result.processed, "batches": result.batches},
+    )
+    return result.processed
+
+
+@shared_task
+def send_weekly_digest_task(days: int = 7) -> int:
+    """Queue the weekly digest email for every subscribed member.
+
+    The shared context is built once here and handed to each chunk task.
+    Not retried automatically: a retry would queue every chunk again. Running
+    it again by hand is safe, since members already sent this week's digest
+    are skipped.
+
+    Args:
+        days: Size of the window to summarize, ending now.
+
+    Returns:
+        Number of chunk tasks queued.
+    """
+    until = timezone.now()
+    context = build_digest_context(until - timedelta(days=days), until)
+    if context is None:
+        logger.info("Weekly digest skipped, nothing new")
+        return 0
+
+    week = digest_week(until)
+    chunks = 0
+    for user_ids in chunked(
+        stream_recipient_ids(digest_recipients(week), DIGEST_CHUNK_SIZE),
+        DIGEST_CHUNK_SIZE,
+    ):
+        send_digest_chunk_task.delay(user_ids, context, week)
+        chunks += 1
+    logger.info("Weekly digest queued", extra={"chunks": chunks})
+    return chunks
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    max_retries=3,
+)
+def send_digest_chunk_task(
+    self, user_ids: list[int], context: dict[str, Any], week: str
+) -> int:
+    """Send the weekly digest to one chunk of members over one connection.
+
+    Members who already got this week's digest are skipped, so retries only
+    reach the recipients whose email failed.
+
+    Args:
+        self: Task instance (for retries).
+        user_ids: Primary keys of the recipients.
+        context: Shared template context built by the parent task.
+        week: ISO week of the run.
+
+    Returns:
+        Number of emails sent.
+    """
+    sent, failed = send_digest_chunk(user_ids, context, week)
+    logger.info("Weekly digest chunk sent", extra={"sent": sent, "failed": len(failed)})
+    if failed:
+        raise self.retry(
+            args=[failed, context, week],
+            countdown=60 * 2**self.request.retries,
+        )
+    return sent
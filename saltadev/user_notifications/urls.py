@@ -9,5 +9,12 @@ app_name = "user_notifications"
 urlpatterns = [
     path("", views.notification_list, name="list"),
     path("<int:notification_id>/leer/", views.mark_as_read, name="mark_as_read"),
+    path(
+        "difusiones/<int:broadcast_id>/leer/",
+        views.mark_broadcast_as_read,
+        name="mark_broadcast_as_read",
+    ),
     path("leer-todas/", views.mark_all_as_read, name="mark_all_as_read"),
+    path("stream/", views.notification_stream, name="stream"),
+    path("preferencias/", views.update_preferences, name="update_preferences"),
 ]
@@ -0,0 +1,83 @@
+"""Helpers for publishing community-wide notifications."""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+
+from .audience import resolve_audience
+from .fanout import fan_out, stream_recipient_ids
+from .models import AudienceTargeting, Broadcast, SentAnnouncement
+
+
+def publish_broadcast(
+    *,
+    verb: str,
+    action_object: models.Model,
+    description: str = "",
+    url: str = "",
+    creator_id: int | None = None,
+) -> Broadcast:
+    """Publish a community-wide announcement as a single row.
+
+    Publishing is idempotent per (verb, action object), so retried tasks or
+    repeated signals never announce the same object twice.
+    """
+    broadcast, _ = Broadcast.objects.get_or_create(
+        verb=verb,
+        action_object_content_type=ContentType.objects.get_for_model(action_object),
+        action_object_object_id=str(action_object.pk),
+        defaults={
+            "description": description,
+            "url": url,
+            "creator_id": creator_id,
+        },
+    )
+    return broadcast
+
+
+def announce(
+    target: AudienceTargeting,
+    *,
+    verb: str,
+    description: str = "",
+    url: str = "",
+    creator_id: int | None = None,
+) -> int:
+    """Announce an event or benefit to its audience.
+
+    Untargeted announcements become a single ``Broadcast``. When ``target``
+    has audience filters, the matching members are resolved with one query
+    and notified through the chunked fan-out. Both paths are idempotent per
+    (verb, target): targeted announcements record a ``SentAnnouncement`` in
+    the same transaction as the fan-out, so a retry after a failure starts
+    over and a retry after success is a no-op.
+
+    Returns:
+        Number of notification rows written; 0 for broadcasts and for
+        targeted announcements that were already sent.
+    """
+    if not target.has_audience_filters:
+        publish_broadcast(
+            verb=verb,
+            action_object=target,
+            description=description,
+            url=url,
+            creator_id=creator_id,
+        )
+        return 0
+
+    with transaction.atomic():
+        _, created = SentAnnouncement.objects.get_or_create(
+            verb=verb,
+            action_object_content_type=ContentType.objects.get_for_model(target),
+            action_object_object_id=str(target.pk),
+        )
+        if not created:
+            return 0
+        return fan_out(
+            stream_recipient_ids(resolve_audience(target)),
+            actor=target,
+            verb=verb,
+            action_object=target,
+            description=description,
+            data={"url": url} if url else None,
+        )
@@ -1,33 +1,81 @@
 """Views for user notifications."""
 
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING
+
+import redis.asyncio
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.decorators.http import require_GET, require_POST
 from notifications.models import Notification
 
+from .counters import get_badge_state, get_unread_count, invalidate_unread_counts
+from .forms import NotificationPreferenceForm
+from .inbox import get_inbox_page
+from .live import BROADCAST_CHANNEL, get_live_redis_url, user_channel
+from .models import Broadcast, BroadcastReadMark, NotificationPreference
+
+if TYPE_CHECKING:
+    from users.models import User
+
+# Comment frames keep proxies from closing an idle stream
+STREAM_KEEPALIVE_SECONDS = 15
+# Streams are recycled so a tab never pins a connection forever
+STREAM_MAX_SECONDS = 300
+STREAM_RETRY_MILLISECONDS = 5000
+
 
 @login_required
 @require_GET
 def notification_list(request: HttpRequest) -> HttpResponse:
     """Display list of user notifications.
 
-    Shows all notifications for the current user, grouped by read status.
+    Personal notifications and community broadcasts are merged at read time,
+    newest first, and paginated with an opaque ``cursor`` query parameter.
     """
-    notifications = request.user.notifications.all()[:50]  # type: ignore[union-attr]
-    unread_count = request.user.notifications.unread().count()  # type: ignore[union-attr]
+    page = get_inbox_page(request.user, request.GET.get("cursor"))  # type: ignore[arg-type]
+    unread_count = get_unread_count(request.user)  # type: ignore[arg-type]
 
     return render(
         request,
         "dashboard/notifications.html",
         {
-            "notifications": notifications,
+            "notifications": page.items,
+            "next_cursor": page.next_cursor,
             "unread_count": unread_count,
+            "preference_form": NotificationPreferenceForm(
+                instance=NotificationPreference.for_user(request.user)  # type: ignore[arg-type]
+            ),
         },
     )
 
 
+@login_required
+@require_POST
+def update_preferences(request: HttpRequest) -> HttpResponseRedirect:
+    """Save which community announcements the user wants to receive."""
+    form = NotificationPreferenceForm(
+        request.POST,
+        instance=NotificationPreference.for_user(request.user),  # type: ignore[arg-type]
+    )
+    if form.is_valid():
+        form.save()
+        # Muting a kind changes which broadcasts count as unread
+        invalidate_unread_counts([request.user.pk])  # type: ignore[list-item]
+    return redirect(reverse("user_notifications:list"))
+
+
 @login_required
 @require_POST
 def mark_as_read(request: HttpRequest, notification_id: int) -> HttpResponseRedirect:
@@ -43,9 +91,101 @@ def mark_as_read(request: HttpRequest, notification_id: int) -> HttpResponseRedi
     return redirect(reverse("user_notifications:list"))
 
 
+@login_required
+@require_POST
+def mark_broadcast_as_read(
+    request: HttpRequest, broadcast_id: int
+) -> HttpResponseRedirect:
+    """Mark a broadcast, and every older broadcast, as read.
+
+    Args:
+        broadcast_id: ID of the broadcast to mark as read.
+    """
+    broadcast = get_object_or_404(
+        Broadcast.objects.visible_to(request.user),  # type: ignore[arg-type]
+        pk=broadcast_id,
+    )
+    BroadcastReadMark.mark_read(request.user, broadcast.pk)  # type: ignore[arg-type]
+    invalidate_unread_counts([request.user.pk])  # type: ignore[list-item]
+    return redirect(reverse("user_notifications:list"))
+
+
 @login_required
 @require_POST
 def mark_all_as_read(request: HttpRequest) -> HttpResponseRedirect:
-    """Mark all notifications as read for the current user."""
+    """Mark all notifications and broadcasts as read for the current user."""
     request.user.notifications.mark_all_as_read()  # type: ignore[union-attr]
+    latest = Broadcast.objects.visible_to(request.user).order_by("-pk").first()  # type: ignore[arg-type]
+    if latest:
+        BroadcastReadMark.mark_read(request.user, latest.pk)  # type: ignore[arg-type]
+    invalidate_unread_counts([request.user.pk])  # type: ignore[list-item]
     return redirect(reverse("user_notifications:list"))
+
+
+def _badge_event(unread: int) -> str:
+    return f"event: badge\ndata: {json.dumps({'unread': unread})}\n\n"
+
+
+async def _badge_events(user: "User", url: str) -> AsyncIterator[str]:
+    """Yield SSE frames with the user's unread count whenever it changes.
+
+    Broadcast messages are applied to the in-memory ``BadgeState``; only a
+    message on the member's own channel reloads it from the cache/database.
+    """
+    client = redis.asyncio.Redis.from_url(url)
+    pubsub = client.pubsub()
+    load_state = sync_to_async(get_badge_state)
+    broadcast_channel = BROADCAST_CHANNEL.encode()
+    try:
+        await pubsub.subscribe(user_channel(user.pk), BROADCAST_CHANNEL)
+        yield f"retry: {STREAM_RETRY_MILLISECONDS}\n\n"
+        state = await load_state(user)
+        yield _badge_event(state.unread)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + STREAM_MAX_SECONDS
+        while loop.time() < deadline:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=STREAM_KEEPALIVE_SECONDS
+            )
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            changed = reload = False
+            # A fan-out can publish many times; one reload covers the burst
+            while message is not None:
+                if message["channel"] == broadcast_channel:
+                    changed = state.apply_broadcast(message["data"]) or changed
+                else:
+                    reload = True
+                message = await pubsub.get_message(ignore_subscribe_messages=True)
+            if reload:
+                state = await load_state(user)
+            if changed or reload:
+                yield _badge_event(state.unread)
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
+
+
+@require_GET
+async def notification_stream(
+    request: HttpRequest,
+) -> HttpResponse | StreamingHttpResponse:
+    """Stream unread badge updates as Server-Sent Events.
+
+    Holds one idle connection per tab and only touches the cache or database
+    when Redis reports a change. Needs the ASGI application
+    (``saltadev.asgi``); under WSGI, or with live updates disabled, it answers
+    204 so ``EventSource`` stops reconnecting and the badge stays static.
+    """
+    user = await request.auser()
+    url = get_live_redis_url()
+    if not user.is_authenticated or not url or not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    return StreamingHttpResponse(
+        _badge_events(user, url),
+        content_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -6,3 +6,8 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self) -> None:
+        """Import signals, and the auth backend so its dummy hash is ready."""
+        import users.backends
+        import users.signals  # noqa: F401
@@ -0,0 +1,177 @@
+"""Batched writer for django-axes audit logs.
+
+The lockout handler only queues one small JSON entry per login, failure or
+logout (one pipelined RPUSH on Redis). ``flush_audit_queue`` drains the
+queue in batches and writes each batch's ``AccessLog`` / ``AccessFailureLog``
+rows in one transaction with a ``bulk_create`` per table, so a brute-force
+storm costs Redis operations instead of one Postgres INSERT per attempt.
+
+Beat flushes the queue every minute, but hosts without a worker (Render
+runs tasks eagerly) have no beat. So ``enqueue`` also drains the queue
+while it holds at least ``AUDIT_FLUSH_THRESHOLD`` entries (at most once
+per ``AUDIT_FLUSH_DEBOUNCE`` seconds) or ``AUDIT_FLUSH_INTERVAL`` seconds
+have passed since the last drain. The
+list is capped at ``AUDIT_QUEUE_MAX_LENGTH`` entries (oldest dropped) and
+expires ``AUDIT_QUEUE_TTL`` seconds after the last push, so a stuck
+writer cannot fill Redis.
+"""
+
+import json
+from datetime import datetime
+from typing import Any
+
+from axes.conf import settings as axes_settings
+from axes.helpers import get_client_session_hash
+from axes.models import AccessFailureLog, AccessLog
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Model
+from django.http import HttpRequest
+from django.utils import timezone
+from saltadev.cache import redis_client as _redis_client
+from saltadev.logging import get_logger
+
+from .tasks import flush_axes_audit_task
+
+logger = get_logger()
+
+AUDIT_QUEUE_KEY = "axes:audit"
+AUDIT_FLUSH_MARKER_KEY = "axes:audit:flushed"
+AUDIT_FLUSH_PENDING_KEY = "axes:audit:pending"
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_THRESHOLD = 100
+AUDIT_FLUSH_DEBOUNCE = 10
+AUDIT_FLUSH_INTERVAL = 5 * 60
+AUDIT_QUEUE_MAX_LENGTH = 20 * AUDIT_BATCH_SIZE
+AUDIT_QUEUE_TTL = 7 * 24 * 60 * 60
+
+LOGIN = "login"
+FAILURE = "failure"
+LOGOUT = "logout"
+
+
+def build_entry(
+    kind: str,
+    request: HttpRequest,
+    username: str | None,
+    *,
+    locked_out: bool = False,
+) -> dict[str, Any]:
+    """Describe one axes-tracked request as a queue entry."""
+    attempt_time = getattr(request, "axes_attempt_time", None) or timezone.now()
+    return {
+        "kind": kind,
+        "username": username,
+        "ip_address": getattr(request, "axes_ip_address", None),
+        "user_agent": getattr(request, "axes_user_agent", ""),
+        "http_accept": getattr(request, "axes_http_accept", ""),
+        "path_info": getattr(request, "axes_path_info", ""),
+        "attempt_time": attempt_time.isoformat(),
+        "session_hash": get_client_session_hash(request) if kind != FAILURE else "",
+        "locked_out": locked_out,
+    }
+
+
+def enqueue(entry: dict[str, Any]) -> None:
+    """Queue an audit entry, or write it right away without Redis.
+
+    Schedules a flush while the queue holds ``AUDIT_FLUSH_THRESHOLD`` or
+    more entries, debounced so a storm schedules one flush per
+    ``AUDIT_FLUSH_DEBOUNCE`` seconds, or when no flush was scheduled for
+    ``AUDIT_FLUSH_INTERVAL`` seconds. The length check keeps firing once
+    LTRIM pins the list at its cap.
+    """
+    client = _redis_client()
+    if client is None:
+        write_entries([entry])
+        return
+    key = cache.make_and_validate_key(AUDIT_QUEUE_KEY)
+    with client.pipeline(transaction=False) as pipe:
+        pipe.rpush(key, json.dumps(entry))
+        pipe.ltrim(key, -AUDIT_QUEUE_MAX_LENGTH, -1)
+        pipe.expire(key, AUDIT_QUEUE_TTL)
+        length = pipe.execute()[0]
+    full = length >= AUDIT_FLUSH_THRESHOLD and cache.add(
+        AUDIT_FLUSH_PENDING_KEY, 1, AUDIT_FLUSH_DEBOUNCE
+    )
+    if full or cache.add(AUDIT_FLUSH_MARKER_KEY, 1, AUDIT_FLUSH_INTERVAL):
+        flush_axes_audit_task.delay()
+
+
+def _insert_rows(model: type[Model], rows: list[Any]) -> None:
+    """Bulk insert rows, keeping the time each attempt really happened.
+
+    ``attempt_time`` is auto_now_add, so ``bulk_create`` stamps the flush
+    time; one ``bulk_update`` puts the queued times back.
+    """
+    attempt_times = [row.attempt_time for row in rows]
+    model._default_manager.bulk_create(rows)
+    for row, attempt_time in zip(rows, attempt_times, strict=True):
+        row.attempt_time = attempt_time
+    model._default_manager.bulk_update(rows, ["attempt_time"])
+
+
+def write_entries(entries: list[dict[str, Any]]) -> int:
+    """Persist a batch of entries atomically, honouring the axes log settings.
+
+    Returns:
+        Number of entries processed.
+    """
+    logins: list[AccessLog] = []
+    failures: list[AccessFailureLog] = []
+    logouts: list[dict[str, Any]] = []
+    for entry in entries:
+        kind = entry.pop("kind")
+        locked_out = entry.pop("locked_out")
+        entry["attempt_time"] = datetime.fromisoformat(entry["attempt_time"])
+        if kind == LOGIN and not axes_settings.AXES_DISABLE_ACCESS_LOG:
+            logins.append(AccessLog(**entry))
+        elif kind == FAILURE and axes_settings.AXES_ENABLE_ACCESS_FAILURE_LOG:
+            entry.pop("session_hash")
+            failures.append(AccessFailureLog(locked_out=locked_out, **entry))
+        elif kind == LOGOUT and entry["username"]:
+            logouts.append(entry)
+
+    # All or nothing: a failed batch is requeued, so a partial write would
+    # be replayed as duplicate rows
+    with transaction.atomic():
+        if logins:
+            _insert_rows(AccessLog, logins)
+        if failures:
+            _insert_rows(AccessFailureLog, failures)
+
+        # Logouts are rare; close the login row of the same session
+        for entry in logouts:
+            AccessLog.objects.filter(
+                username=entry["username"],
+                session_hash=entry["session_hash"],
+                logout_time__isnull=True,
+            ).update(logout_time=entry["attempt_time"])
+    return len(entries)
+
+
+def flush_audit_queue(batch_size: int = AUDIT_BATCH_SIZE) -> int:
+    """Drain the Redis audit queue in batches.
+
+    Each batch is popped atomically (LPOP with a count), so several workers
+    can flush concurrently without writing an entry twice. A batch that
+    fails to write is pushed back to the head of the queue, in order,
+    before the error propagates, so the task's retry writes it again.
+
+    Returns:
+        Number of entries written.
+    """
+    client = _redis_client()
+    if client is None:
+        return 0
+    key = cache.make_and_validate_key(AUDIT_QUEUE_KEY)
+    written = 0
+    while batch := client.lpop(key, batch_size):
+        try:
+            written += write_entries([json.loads(raw) for raw in batch])
+        except Exception:
+            client.lpush(key, *reversed(batch))
+            raise
+    if written:
+        logger.info("Axes audit queue flushed", extra={"entries": written})
+    return written
@@ -0,0 +1,166 @@
+"""django-axes handler backed by the ``users.ratelimit`` login keys.
+
+Axes and the login view used to count the same failures twice: once in the
+``rl:login:*`` cache keys and once as ``AccessAttempt`` rows. This handler
+makes the rate-limit keys the single source of truth, so a failed login
+costs cache operations only, and hands audit rows to the batched writer in
+``users.audit``.
+"""
+
+from datetime import timedelta
+from typing import Any
+
+from axes.conf import settings as axes_settings
+from axes.handlers.base import AbstractAxesHandler, AxesBaseHandler
+from axes.helpers import get_client_username
+from axes.models import AccessFailureLog, AccessLog
+from axes.signals import user_locked_out
+from django.http import HttpRequest
+from django.utils import timezone
+from saltadev.logging import get_logger
+
+from . import audit
+from .ratelimit import (
+    RateLimitState,
+    build_keys,
+    clear_limits,
+    get_client_ip,
+    get_fingerprint,
+    get_rate_limit,
+    increment,
+    is_blocked,
+    reset,
+)
+
+logger = get_logger()
+
+SCOPE = "login"
+
+
+def _view_state(request: HttpRequest) -> RateLimitState | None:
+    """Return the state ``rate_limited("login")`` left on the request, if any."""
+    state = getattr(request, "rate_limit", None)
+    if state is not None and state.keys[0].startswith(f"rl:{SCOPE}:"):
+        return state
+    return None
+
+
+def login_keys(request: HttpRequest, credentials: dict[str, Any] | None) -> list[str]:
+    """Return the login rate-limit keys for an axes-tracked request.
+
+    Reuses the keys resolved by ``rate_limited`` on the login view, so the
+    view and axes always agree; other entry points (admin, allauth) build
+    them from the request.
+    """
+    state = _view_state(request)
+    if state is not None:
+        return state.keys
+    fingerprint, _ = get_fingerprint(request)
+    username = get_client_username(request, credentials)
+    return build_keys(SCOPE, get_client_ip(request), username, fingerprint)
+
+
+class RateLimitAxesHandler(AbstractAxesHandler, AxesBaseHandler):
+    """Axes handler that locks out through the login rate-limit engine."""
+
+    def is_locked(
+        self, request: HttpRequest, credentials: dict[str, Any] | None = None
+    ) -> bool:
+        """Return True while any login key of the client is blocked.
+
+        Requests through the login view were already checked by
+        ``rate_limited`` on the same keys, so they skip a second lookup.
+        """
+        if not axes_settings.AXES_LOCK_OUT_AT_FAILURE or _view_state(request):
+            return False
+        return is_blocked(login_keys(request, credentials))
+
+    def get_failures(
+        self, request: HttpRequest, credentials: dict[str, Any] | None = None
+    ) -> int:
+        """Report the failure limit while blocked and 0 otherwise.
+
+        The engines track blocks rather than raw counts (GCRA keeps a single
+        timestamp), so this is the closest honest answer for axes tooling.
+        """
+        if is_blocked(login_keys(request, credentials)):
+            return get_rate_limit(SCOPE)[0]
+        return 0
+
+    def user_login_failed(
+        self,
+        sender: Any,
+        credentials: dict[str, Any],
+        request: HttpRequest | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Count the failure on the login keys and lock out at the limit."""
+        if request is None:
+            logger.error("Axes login failure without a request")
+            return
+        if self.is_whitelisted(request, credentials):
+            return
+
+        username = get_client_username(request, credentials)
+        locked_out = increment(login_keys(request, credentials)) > 0
+        audit.enqueue(
+            audit.build_entry(audit.FAILURE, request, username, locked_out=locked_out)
+        )
+
+        if locked_out and axes_settings.AXES_LOCK_OUT_AT_FAILURE:
+            logger.warning(
+                "Login locked out by axes",
+                extra={"ip": request.axes_ip_address, "email": username},  # type: ignore[attr-defined]
+            )
+            request.axes_locked_out = True  # type: ignore[attr-defined]
+            request.axes_credentials = credentials  # type: ignore[attr-defined]
+            user_locked_out.send(
+                "axes",
+                request=request,
+                username=username,
+                ip_address=request.axes_ip_address,  # type: ignore[attr-defined]
+            )
+
+    def user_logged_in(
+        self, sender: Any, request: HttpRequest, user: Any, **kwargs: Any
+    ) -> None:
+        """Clear the login keys and queue the access log entry."""
+        username = user.get_username()
+        if axes_settings.AXES_RESET_ON_SUCCESS:
+            reset(login_keys(request, {"username": username}))
+        audit.enqueue(audit.build_entry(audit.LOGIN, request, username))
+
+    def user_logged_out(
+        self, sender: Any, request: HttpRequest, user: Any, **kwargs: Any
+    ) -> None:
+        """Queue the logout time for the session's access log entry."""
+        username = user.get_username() if user else None
+        audit.enqueue(audit.build_entry(audit.LOGOUT, request, username))
+
+    def reset_attempts(
+        self,
+        *,
+        ip_address: str | None = None,
+        username: str | None = None,
+        ip_or_username: bool = False,
+    ) -> int:
+        """Clear login blocks for an IP (and IP + email pair)."""
+        return len(clear_limits((SCOPE,), ip_address=ip_address, email=username))
+
+    def reset_logs(self, *, age_days: int | None = None) -> int:
+        """Delete access logs older than ``age_days`` (all when None)."""
+        return _delete_older_than(AccessLog, age_days)
+
+    def reset_failure_logs(self, *, age_days: int | None = None) -> int:
+        """Delete failure logs older than ``age_days`` (all when None)."""
+        return _delete_older_than(AccessFailureLog, age_days)
+
+
+def _delete_older_than(model: Any, age_days: int | None) -> int:
+    queryset = model.objects.all()
+    if age_days is not None:
+        queryset = queryset.filter(
+            attempt_time__lte=timezone.now() - timedelta(days=age_days)
+        )
+    count, _ = queryset.delete()
+    return count
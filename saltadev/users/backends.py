@@ -0,0 +1,62 @@
+"""Email/password authentication backend.
+
+The login view needs the user before authenticating (to tell unverified
+accounts apart) and the backend needs it again to check the password.
+``get_login_user`` resolves it once per request and both share the result.
+Unknown emails are checked against a dummy hash, so a miss costs the same
+PBKDF2 work as a wrong password and timing does not reveal which accounts
+exist. The dummy hash is computed when the module is imported at startup
+(``UsersConfig.ready``), so a process's first miss is not slower than the
+rest. Lockouts are enforced earlier (``rate_limited`` on the view, or
+``AxesBackend`` on other entry points), so blocked clients never reach the
+hashing step.
+"""
+
+from typing import Any
+
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.exceptions import PermissionDenied
+from django.http import HttpRequest
+from django.utils.crypto import get_random_string
+
+from .models import User
+
+_LOGIN_USER_ATTR = "_login_user"
+_DUMMY_PASSWORD_HASH = make_password(get_random_string(32))
+
+
+def get_login_user(request: HttpRequest | None, email: str) -> User | None:
+    """Return the user for a login email, looked up at most once per request."""
+    cached = getattr(request, _LOGIN_USER_ATTR, None)
+    if cached is not None and cached[0] == email:
+        return cached[1]
+    user = User.objects.filter(email=email).first()
+    if request is not None:
+        setattr(request, _LOGIN_USER_ATTR, (email, user))
+    return user
+
+
+class EmailBackend(ModelBackend):
+    """ModelBackend that authenticates with a single lookup and one hash."""
+
+    def authenticate(
+        self,
+        request: HttpRequest | None,
+        username: str | None = None,
+        password: str | None = None,
+        **kwargs: Any,
+    ) -> User | None:
+        """Check an email/password pair.
+
+        A failed check raises PermissionDenied so later backends (allauth)
+        do not look the user up and hash the password a second time.
+        """
+        if not username or password is None:
+            return None
+        user = get_login_user(request, username)
+        if user is None:
+            check_password(password, _DUMMY_PASSWORD_HASH)
+        elif user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        raise PermissionDenied
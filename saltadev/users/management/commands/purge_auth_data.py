@@ -0,0 +1,44 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from ...retention import POLICIES, run_retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired tokens, old axes logs and sessions (and never-confirmed "
+        "accounts when enabled)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--policy",
+            action="append",
+            choices=[policy.name for policy in POLICIES],
+            help="Only run this policy (repeatable).",
+        )
+        parser.add_argument("--batch-size", type=int, help="Rows per batch.")
+        parser.add_argument(
+            "--sleep", type=float, help="Seconds to pause between batches."
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many rows would be deleted.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        result = run_retention(
+            policies=options["policy"],
+            batch_size=options["batch_size"],
+            sleep_seconds=options["sleep"],
+            dry_run=options["dry_run"],
+        )
+
+        verb = "would be deleted" if result.dry_run else "deleted"
+        for name, outcome in result.policies.items():
+            self.stdout.write(
+                f"{name}: {outcome.purged} rows {verb} in {outcome.batches} "
+                f"batches ({outcome.seconds:.2f}s)."
+            )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-17 00:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0011_add_social_login_fields"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                fields=["technical_role"], name="users_profi_technic_070094_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.11 on 2026-10-17 01:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0012_profile_users_profi_technic_070094_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="emailverificationcode",
+            index=models.Index(
+                fields=["user", "used", "created_at"],
+                name="users_email_user_id_b4cbc8_idx",
+            ),
+        ),
+    ]
@@ -155,6 +155,7 @@ class Profile(models.Model):
     class Meta:
         verbose_name = "perfil"
         verbose_name_plural = "perfiles"
+        indexes = [models.Index(fields=["technical_role"])]
 
     class TechnicalRole(models.TextChoices):
         BACKEND = "backend", "Backend"
@@ -276,6 +277,7 @@ class EmailVerificationCode(models.Model):
     class Meta:
         verbose_name = "codigo de verificacion"
         verbose_name_plural = "codigos de verificacion"
+        indexes = [models.Index(fields=["user", "used", "created_at"])]
 
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="verification_codes"
@@ -1,11 +1,26 @@
 """Rate limiting utilities for authentication views."""
 
+import time
 import uuid
-from collections.abc import Iterable
-from datetime import timedelta
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache, wraps
+from threading import Lock
+from typing import Any, Protocol
 
-from django.core.cache import cache
-from django.http import HttpRequest
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpRequest, HttpResponse
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+from saltadev.cache import redis_client as _redis_client
+from saltadev.logging import get_logger
+
+logger = get_logger()
 
 VERIFY_LIMIT = 5
 LOGIN_LIMIT = 5
@@ -20,9 +35,24 @@ SCOPES = (
     "password_reset_confirm",
 )
 COOLDOWN_SECONDS = 60 * 60
+DEFAULT_LIMITS = {
+    "verify": VERIFY_LIMIT,
+    "login": LOGIN_LIMIT,
+    "register": REGISTER_LIMIT,
+    "password_reset_request": PASSWORD_RESET_REQUEST_LIMIT,
+    "password_reset_confirm": PASSWORD_RESET_CONFIRM_LIMIT,
+}
+# Per-worker memory of blocked keys (see DenyCache)
+DENY_CACHE_SIZE = 10_000
+DENY_CACHE_MAX_TTL = 60
+# Per-scope sorted sets listing blocked keys for staff
+BLOCK_REGISTRY_PREFIX = "rl:blocked:"
+BLOCK_REGISTRY_PAGE_SIZE = 50
+BLOCK_REGISTRY_PRUNE_BATCH = 500
 FINGERPRINT_COOKIE = "sd_fp"
 FINGERPRINT_HEADER = "HTTP_X_CLIENT_FP"
 FINGERPRINT_MAX_AGE = int(timedelta(days=30).total_seconds())
+LOCKOUT_TEMPLATE = "auth/lockout.html"
 
 
 def get_client_ip(request: HttpRequest) -> str:
@@ -61,48 +91,554 @@ def build_keys(
     return keys
 
 
-def is_blocked(keys: Iterable[str], limit: int) -> bool:
-    """Return True if any cache key has reached or exceeded the limit."""
-    return any(cache.get(key, 0) >= limit for key in keys)
+def get_rate_limit(scope: str) -> tuple[int, int]:
+    """Return ``(limit, window_seconds)`` for a scope.
 
+    Values come from ``settings.RATE_LIMITS[scope]``, falling back to the
+    module defaults.
+    """
+    config = getattr(settings, "RATE_LIMITS", {}).get(scope, {})
+    limit = config.get("limit", DEFAULT_LIMITS.get(scope, LOGIN_LIMIT))
+    return limit, config.get("window", COOLDOWN_SECONDS)
 
-def increment(keys: Iterable[str]) -> None:
-    """Increment the attempt counter for each cache key."""
-    for key in keys:
-        if cache.add(key, 1, COOLDOWN_SECONDS):
-            continue
-        try:
-            cache.incr(key)
-        except ValueError:
-            cache.set(key, 1, COOLDOWN_SECONDS)
+
+def _scope_of(keys: list[str]) -> str:
+    """Return the scope encoded in ``rl:{scope}:...`` keys."""
+    return keys[0].split(":", 2)[1] if keys else ""
+
+
+class RateLimitEngine(Protocol):
+    """Storage strategy behind ``is_blocked`` and ``increment``.
+
+    Both methods return, for each key in order, how many seconds it stays
+    blocked (0 while attempts remain).
+    """
+
+    def blocked_for(self, keys: list[str], limit: int, window: int) -> list[int]:
+        """Return the remaining block per key without recording an attempt."""
+        ...
+
+    def hit(self, keys: list[str], limit: int, window: int) -> list[int]:
+        """Record one attempt per key and return the resulting block per key."""
+        ...
+
+
+class CounterEngine:
+    """Fixed-window counters stored through the Django cache API.
+
+    Works on any cache backend. The window starts on the first attempt and
+    the key is blocked until it expires once the count reaches the limit.
+    The cache API cannot report a key's TTL, so a block is reported as the
+    full window (an upper bound).
+    """
+
+    def blocked_for(self, keys: list[str], limit: int, window: int) -> list[int]:
+        """Read every counter in a single ``get_many`` round trip."""
+        counts = cache.get_many(keys)
+        return [window if counts.get(key, 0) >= limit else 0 for key in keys]
+
+    def hit(self, keys: list[str], limit: int, window: int) -> list[int]:
+        """Bump every counter, in one pipeline when the cache is Redis."""
+        client = _redis_client()
+        if client is None:
+            counts = []
+            for key in keys:
+                if cache.add(key, 1, window):
+                    counts.append(1)
+                    continue
+                try:
+                    counts.append(cache.incr(key))
+                except ValueError:
+                    cache.set(key, 1, window)
+                    counts.append(1)
+        else:
+            with client.pipeline() as pipe:
+                for key in keys:
+                    # Django stores ints unpickled, so raw INCR stays readable
+                    cache_key = cache.make_and_validate_key(key)
+                    pipe.set(cache_key, 0, ex=window, nx=True)
+                    pipe.incr(cache_key)
+                counts = pipe.execute()[1::2]
+        return [window if count >= limit else 0 for count in counts]
+
+
+# GCRA state is one "theoretical arrival time" (ms) per key. Both scripts
+# read the clock from Redis so every web node agrees on "now", and return
+# the milliseconds each key stays blocked.
+_GCRA_NOW = """
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local blocked = {}
+"""
+
+GCRA_CHECK_SCRIPT = (
+    _GCRA_NOW
+    + """
+for i, key in ipairs(KEYS) do
+  local tat = tonumber(redis.call('GET', key)) or now
+  blocked[i] = math.max(tat - now - tolerance, 0)
+end
+return blocked
+"""
+)
+
+GCRA_HIT_SCRIPT = (
+    _GCRA_NOW
+    + """
+for i, key in ipairs(KEYS) do
+  local tat = math.max(tonumber(redis.call('GET', key)) or now, now) + interval
+  -- Never queue more than one full window of debt
+  tat = math.min(tat, now + interval + tolerance)
+  redis.call('SET', key, tat, 'PX', tat - now)
+  blocked[i] = math.max(tat - now - tolerance, 0)
+end
+return blocked
+"""
+)
+
+
+class GCRAEngine:
+    """Generic cell rate algorithm evaluated atomically in Redis.
+
+    A scope allowing ``limit`` attempts per ``window`` lets a full burst
+    through, then gives back one attempt every ``window / limit`` seconds
+    instead of locking the client out for the whole window. Each check or
+    hit is a single Lua script over all keys, so concurrent workers on any
+    number of nodes cannot race, and each key costs one small string.
+    """
+
+    def __init__(self) -> None:
+        self._scripts: dict[str, Any] = {}
+
+    def _run(self, source: str, keys: list[str], limit: int, window: int) -> list[int]:
+        client = _redis_client()
+        if client is None:
+            raise ImproperlyConfigured("GCRAEngine requires the Redis cache backend")
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = client.register_script(source)
+        interval = window * 1000 // limit
+        cache_keys = [cache.make_and_validate_key(key) for key in keys]
+        blocked_ms = script(keys=cache_keys, args=[interval, window * 1000 - interval])
+        return [-(-int(ms) // 1000) for ms in blocked_ms]
+
+    def blocked_for(self, keys: list[str], limit: int, window: int) -> list[int]:
+        """Return seconds until each key gets an attempt back."""
+        return self._run(GCRA_CHECK_SCRIPT, keys, limit, window)
+
+    def hit(self, keys: list[str], limit: int, window: int) -> list[int]:
+        """Spend one attempt per key; return seconds until the next one."""
+        return self._run(GCRA_HIT_SCRIPT, keys, limit, window)
+
+
+class DenyCache:
+    """Per-process TTL cache of blocked keys with LRU eviction.
+
+    Lets a worker reject an already-blocked IP, fingerprint or email without
+    a Redis round trip. Entries live at most ``max_ttl`` seconds so a staff
+    unblock on another worker takes effect quickly, and at most ``maxsize``
+    keys are kept so a flood of distinct keys cannot grow memory.
+    """
+
+    def __init__(self, maxsize: int, max_ttl: int) -> None:
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self._entries: OrderedDict[str, float] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def deny(self, keys: Iterable[str], seconds: int) -> None:
+        """Remember ``keys`` as blocked for ``seconds`` (capped at max_ttl)."""
+        expires_at = time.monotonic() + min(seconds, self.max_ttl)
+        with self._lock:
+            for key in keys:
+                self._entries[key] = expires_at
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def is_denied(self, keys: Iterable[str]) -> bool:
+        """Return True if any key is currently denied; drops expired entries."""
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                expires_at = self._entries.get(key)
+                if expires_at is None:
+                    continue
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                return True
+        return False
+
+    def forget(self, keys: Iterable[str]) -> None:
+        """Drop ``keys`` (used when limits are reset or cleared)."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+deny_cache = DenyCache(DENY_CACHE_SIZE, DENY_CACHE_MAX_TTL)
+
+
+@lru_cache(maxsize=4)
+def _load_engine(path: str | None, redis_backend: bool) -> RateLimitEngine:
+    if path:
+        return import_string(path)()
+    return GCRAEngine() if redis_backend else CounterEngine()
+
+
+def get_engine() -> RateLimitEngine:
+    """Return the configured engine (``settings.RATE_LIMIT_ENGINE``).
+
+    Defaults to GCRA when the cache is Redis and to plain counters otherwise.
+    """
+    return _load_engine(
+        getattr(settings, "RATE_LIMIT_ENGINE", None),
+        isinstance(caches["default"], RedisCache),
+    )
+
+
+def is_blocked(keys: Iterable[str], limit: int | None = None) -> bool:
+    """Return True if any key has used up its scope's attempts.
+
+    Args:
+        keys: Keys from ``build_keys`` (all of one scope).
+        limit: Override for the scope's configured limit.
+    """
+    keys = list(keys)
+    if not keys:
+        return False
+    if deny_cache.is_denied(keys):
+        return True
+    scope_limit, window = get_rate_limit(_scope_of(keys))
+    return _remember_blocks(
+        keys, get_engine().blocked_for(keys, limit or scope_limit, window)
+    )
+
+
+def increment(keys: Iterable[str]) -> int:
+    """Record a failed attempt for each key.
+
+    Returns:
+        Seconds the keys are now blocked for, or 0 if attempts remain.
+    """
+    keys = list(keys)
+    if not keys:
+        return 0
+    limit, window = get_rate_limit(_scope_of(keys))
+    blocked = get_engine().hit(keys, limit, window)
+    _remember_blocks(keys, blocked)
+    record_blocks(keys, blocked)
+    return max(blocked)
+
+
+def _remember_blocks(keys: list[str], blocked: list[int]) -> bool:
+    """Add blocked keys to this worker's deny cache; return True if any."""
+    for key, seconds in zip(keys, blocked, strict=True):
+        if seconds > 0:
+            deny_cache.deny([key], seconds)
+    return any(blocked)
 
 
 def reset(keys: Iterable[str]) -> None:
     """Delete all cache keys, resetting their rate limit counters."""
+    keys = list(keys)
+    deny_cache.forget(keys)
+    forget_blocks(keys)
     for key in keys:
         cache.delete(key)
 
 
-def clear_limits(
+def _identity_keys(
     scopes: Iterable[str],
     ip_address: str | None = None,
     email: str | None = None,
     fingerprint: str | None = None,
 ) -> list[str]:
-    """Clear rate limit counters across all given scopes for the specified identifiers."""
-    cleared = []
+    """Return every ``rl:*`` key the given identifiers map to in ``scopes``."""
+    keys = []
     email_key = (email or "").strip().lower()
     ip_key = (ip_address or "").strip()
     fp_key = (fingerprint or "").strip()
 
     for scope in scopes:
         if ip_key:
-            cleared.append(f"rl:{scope}:ip:{ip_key}")
+            keys.append(f"rl:{scope}:ip:{ip_key}")
         if fp_key:
-            cleared.append(f"rl:{scope}:fp:{fp_key}")
+            keys.append(f"rl:{scope}:fp:{fp_key}")
         if ip_key and email_key:
-            cleared.append(f"rl:{scope}:ip_email:{ip_key}:{email_key}")
+            keys.append(f"rl:{scope}:ip_email:{ip_key}:{email_key}")
+    return keys
+
 
+def clear_limits(
+    scopes: Iterable[str],
+    ip_address: str | None = None,
+    email: str | None = None,
+    fingerprint: str | None = None,
+) -> list[str]:
+    """Clear rate limit counters across all given scopes for the specified identifiers."""
+    cleared = _identity_keys(scopes, ip_address, email, fingerprint)
     if cleared:
+        deny_cache.forget(cleared)
+        forget_blocks(cleared)
         cache.delete_many(cleared)
     return cleared
+
+
+@dataclass(frozen=True)
+class BlockEntry:
+    """One blocked rate-limit key as shown to staff."""
+
+    key: str
+    scope: str
+    kind: str
+    identifier: str
+    offences: int
+    expires_at: datetime
+
+
+def _registry_keys(scope: str) -> tuple[str, str]:
+    """Return the (expiry, offences) sorted-set names for a scope."""
+    base = f"{BLOCK_REGISTRY_PREFIX}{scope}"
+    return (
+        cache.make_and_validate_key(base),
+        cache.make_and_validate_key(f"{base}:offences"),
+    )
+
+
+def record_blocks(keys: list[str], blocked: list[int]) -> None:
+    """Add blocked keys to their scope's block registry.
+
+    Each scope keeps two sorted sets: one scored by block expiry (epoch
+    seconds) and one by how many over-limit attempts the key made. Both
+    are O(log n) per key, so staff can list who is blocked without
+    scanning the ``rl:*`` keyspace. Only kept on Redis; a no-op elsewhere.
+    """
+    client = _redis_client()
+    entries = [(k, s) for k, s in zip(keys, blocked, strict=True) if s > 0]
+    if client is None or not entries:
+        return
+    now = time.time()
+    with client.pipeline(transaction=False) as pipe:
+        for key, seconds in entries:
+            expiry_set, offences_set = _registry_keys(_scope_of([key]))
+            pipe.zadd(expiry_set, {key: now + seconds}, gt=True)
+            pipe.zincrby(offences_set, 1, key)
+            # An idle registry vanishes with its last block
+            for registry in (expiry_set, offences_set):
+                pipe.expire(registry, seconds, nx=True)
+                pipe.expire(registry, seconds, gt=True)
+        pipe.execute()
+
+
+def forget_blocks(keys: Iterable[str]) -> None:
+    """Remove keys from the block registry (after a reset or an unblock)."""
+    client = _redis_client()
+    keys = list(keys)
+    if client is None or not keys:
+        return
+    with client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            for registry in _registry_keys(_scope_of([key])):
+                pipe.zrem(registry, key)
+        pipe.execute()
+
+
+def prune_blocks(scope: str, batch: int = BLOCK_REGISTRY_PRUNE_BATCH) -> int:
+    """Drop up to ``batch`` expired entries from a scope's registry.
+
+    Expired keys sort first in the expiry set, so one bounded range read
+    finds them. Exactly the keys read are removed from both sets (a score
+    range could take tied keys past the batch and orphan their offences),
+    which keeps each call O(log n + batch) however many blocks have
+    lapsed; the rest go on the next read. Returns how many keys were pruned.
+    """
+    client = _redis_client()
+    if client is None:
+        return 0
+    expiry_set, offences_set = _registry_keys(scope)
+    expired = client.zrangebyscore(expiry_set, "-inf", time.time(), start=0, num=batch)
+    if not expired:
+        return 0
+    with client.pipeline(transaction=False) as pipe:
+        pipe.zrem(expiry_set, *expired)
+        pipe.zrem(offences_set, *expired)
+        pipe.execute()
+    return len(expired)
+
+
+def _block_entry(key: str, offences: float, expires_at: float) -> BlockEntry:
+    _, scope, kind, identifier = key.split(":", 3)
+    return BlockEntry(
+        key=key,
+        scope=scope,
+        kind=kind,
+        identifier=identifier,
+        offences=int(offences),
+        expires_at=datetime.fromtimestamp(expires_at, tz=UTC),
+    )
+
+
+def list_blocks(
+    scope: str, limit: int = BLOCK_REGISTRY_PAGE_SIZE
+) -> tuple[list[BlockEntry], int]:
+    """Return the scope's top offenders and the total number of blocked keys.
+
+    Expired entries are pruned first. The page costs O(log n + limit): one
+    ranged read of the offences set plus one ZMSCORE for their expiries.
+    """
+    client = _redis_client()
+    if client is None:
+        return [], 0
+    prune_blocks(scope)
+    expiry_set, offences_set = _registry_keys(scope)
+    with client.pipeline(transaction=False) as pipe:
+        pipe.zrevrange(offences_set, 0, limit - 1, withscores=True)
+        pipe.zcard(expiry_set)
+        top, total = pipe.execute()
+    if not top:
+        return [], total
+    members = [member.decode() for member, _ in top]
+    expiries = client.zmscore(expiry_set, members)
+    entries = [
+        _block_entry(key, offences, expires_at)
+        for key, (_, offences), expires_at in zip(members, top, expiries, strict=True)
+        if expires_at is not None
+    ]
+    return entries, total
+
+
+def find_blocks(
+    ip_address: str | None = None,
+    email: str | None = None,
+    fingerprint: str | None = None,
+) -> list[BlockEntry]:
+    """Return the active blocks for an IP, email or fingerprint in every scope.
+
+    Builds the candidate keys like ``clear_limits`` and reads their scores
+    with one ZMSCORE per registry set, so a lookup is O(scopes * log n)
+    and never scans the registry. The email only matches together with
+    the IP, as that is how it is keyed.
+    """
+    client = _redis_client()
+    keys = _identity_keys(SCOPES, ip_address, email, fingerprint)
+    if client is None or not keys:
+        return []
+    by_scope: dict[str, list[str]] = {}
+    for key in keys:
+        by_scope.setdefault(_scope_of([key]), []).append(key)
+    with client.pipeline(transaction=False) as pipe:
+        for scope, scope_keys in by_scope.items():
+            expiry_set, offences_set = _registry_keys(scope)
+            pipe.zmscore(expiry_set, scope_keys)
+            pipe.zmscore(offences_set, scope_keys)
+        scores = pipe.execute()
+    now = time.time()
+    entries = []
+    for index, scope_keys in enumerate(by_scope.values()):
+        expiries, offences = scores[2 * index], scores[2 * index + 1]
+        for key, expires_at, count in zip(scope_keys, expiries, offences, strict=True):
+            if expires_at is not None and expires_at > now:
+                entries.append(_block_entry(key, count or 0, expires_at))
+    return entries
+
+
+def unblock(keys: Iterable[str]) -> list[str]:
+    """Reset the given ``rl:{scope}:...`` keys and return the ones cleared.
+
+    Keys outside the known scopes are ignored, so form input can be passed
+    straight through.
+    """
+    valid = [
+        key
+        for key in keys
+        if key.startswith("rl:") and key.count(":") >= 3 and _scope_of([key]) in SCOPES
+    ]
+    if valid:
+        reset(valid)
+    return valid
+
+
+@dataclass(frozen=True)
+class RateLimitState:
+    """Client identity resolved by ``rate_limited`` for the wrapped view."""
+
+    ip_address: str
+    fingerprint: str
+    should_set_cookie: bool
+    keys: list[str]
+
+
+def get_rate_limit_state(request: HttpRequest) -> RateLimitState:
+    """Return the state ``rate_limited`` attached to the request."""
+    return request.rate_limit  # type: ignore[attr-defined]
+
+
+@lru_cache(maxsize=8)
+def _render_lockout(message: str) -> str:
+    """Render the lockout page once per process and message.
+
+    Rendered without a request, so the page holds no CSRF token or user
+    data and is safe to share between clients.
+    """
+    return render_to_string(LOCKOUT_TEMPLATE, {"blocked_message": message})
+
+
+def lockout_response() -> HttpResponse:
+    """Return a 429 response with the pre-rendered lockout page."""
+    from .utils import get_lockout_message
+
+    return HttpResponse(_render_lockout(get_lockout_message()), status=429)
+
+
+def rate_limited(
+    scope: str, field: str | None = None
+) -> Callable[[Callable[..., HttpResponse]], Callable[..., HttpResponse]]:
+    """Reject blocked clients before the view builds forms or renders pages.
+
+    Resolves IP and fingerprint, builds the scope's keys (using ``field``
+    from POST, or GET for other methods, as the email/token part) and
+    answers blocked clients with ``lockout_response``. Otherwise the view
+    runs with the result available through ``get_rate_limit_state``.
+    """
+
+    def decorator(view: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+            from .fingerprint import attach_fingerprint_cookie
+
+            ip_address = get_client_ip(request)
+            fingerprint, should_set_cookie = get_fingerprint(request)
+            params = request.POST if request.method == "POST" else request.GET
+            value = params.get(field, "") if field else None
+            keys = build_keys(scope, ip_address, value, fingerprint)
+
+            if is_blocked(keys):
+                logger.warning(
+                    "Request blocked by rate limit",
+                    extra={"scope": scope, "ip": ip_address},
+                )
+                return attach_fingerprint_cookie(
+                    lockout_response(), fingerprint, should_set_cookie
+                )
+
+            request.rate_limit = RateLimitState(  # type: ignore[attr-defined]
+                ip_address, fingerprint, should_set_cookie, keys
+            )
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
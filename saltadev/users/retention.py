@@ -0,0 +1,260 @@
+"""Batched retention for authentication data.
+
+One engine runs a list of per-model policies: used or expired reset tokens
+and verification codes, old django-axes logs and expired database
+sessions. Deleting accounts that never confirmed their email is opt-in
+(``AUTH_RETENTION_UNVERIFIED_USER_DAYS``), and the sessions policy only
+runs when sessions are stored in the database. Each policy deletes its
+eligible rows in small primary-key-ordered batches, one short transaction
+per batch, so no statement locks a large range of the table. Deleted rows
+drop out of the eligible set, so an interrupted run simply resumes.
+
+Every run records rows purged and seconds taken per policy; the latest
+figures are kept in the cache (``get_retention_metrics``) and logged.
+"""
+
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from axes.models import AccessFailureLog, AccessLog
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from saltadev.logging import get_logger
+
+from .models import EmailVerificationCode, User
+from .utils import VERIFICATION_CODE_TTL
+
+logger = get_logger()
+
+METRICS_CACHE_KEY = "retention:auth:metrics"
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_SLEEP_SECONDS = 0.1
+DEFAULT_AXES_LOG_DAYS = 90
+DATABASE_SESSION_ENGINES = (
+    "django.contrib.sessions.backends.db",
+    "django.contrib.sessions.backends.cached_db",
+)
+
+
+def _always() -> bool:
+    return True
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Which rows of one model may be deleted.
+
+    Attributes:
+        name: Identifier used in metrics, logs and ``--policy``.
+        eligible: Returns the deletable rows given the current time.
+        enabled: Whether the policy applies to this deployment; disabled
+            policies are skipped and left out of results and metrics.
+    """
+
+    name: str
+    eligible: Callable[[datetime], QuerySet[Any]]
+    enabled: Callable[[], bool] = _always
+
+
+@dataclass
+class PolicyResult:
+    """Outcome of one policy in a retention run."""
+
+    purged: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class RetentionResult:
+    """Summary of a retention run, keyed by policy name."""
+
+    policies: dict[str, PolicyResult] = field(default_factory=dict)
+    dry_run: bool = False
+
+    @property
+    def purged(self) -> int:
+        """Total rows purged (or eligible, for dry runs)."""
+        return sum(result.purged for result in self.policies.values())
+
+
+def _days(name: str, default: int) -> timedelta:
+    return timedelta(days=getattr(settings, name, default))
+
+
+def _reset_tokens(now: datetime) -> QuerySet[Any]:
+    from password_reset.models import PasswordResetToken
+
+    return PasswordResetToken.objects.filter(Q(used=True) | Q(expires_at__lt=now))
+
+
+def _verification_codes(now: datetime) -> QuerySet[Any]:
+    return EmailVerificationCode.objects.filter(
+        Q(used=True) | Q(created_at__lt=now - VERIFICATION_CODE_TTL)
+    )
+
+
+def _unverified_user_days() -> int | None:
+    return getattr(settings, "AUTH_RETENTION_UNVERIFIED_USER_DAYS", None)
+
+
+def _unverified_users_enabled() -> bool:
+    return _unverified_user_days() is not None
+
+
+def _unverified_users(now: datetime) -> QuerySet[Any]:
+    cutoff = now - timedelta(days=_unverified_user_days() or 0)
+    return User.objects.filter(
+        email_confirmed=False,
+        last_login__isnull=True,
+        is_staff=False,
+        is_superuser=False,
+        registered_at__lt=cutoff,
+    )
+
+
+def _axes_access_logs(now: datetime) -> QuerySet[Any]:
+    cutoff = now - _days("AUTH_RETENTION_AXES_LOG_DAYS", DEFAULT_AXES_LOG_DAYS)
+    return AccessLog.objects.filter(attempt_time__lt=cutoff)
+
+
+def _axes_failure_logs(now: datetime) -> QuerySet[Any]:
+    cutoff = now - _days("AUTH_RETENTION_AXES_LOG_DAYS", DEFAULT_AXES_LOG_DAYS)
+    return AccessFailureLog.objects.filter(attempt_time__lt=cutoff)
+
+
+def _database_sessions() -> bool:
+    return settings.SESSION_ENGINE in DATABASE_SESSION_ENGINES
+
+
+def _expired_sessions(now: datetime) -> QuerySet[Any]:
+    return Session.objects.filter(expire_date__lt=now)
+
+
+POLICIES: tuple[RetentionPolicy, ...] = (
+    RetentionPolicy("password_reset_tokens", _reset_tokens),
+    RetentionPolicy("verification_codes", _verification_codes),
+    RetentionPolicy("unverified_users", _unverified_users, _unverified_users_enabled),
+    RetentionPolicy("axes_access_logs", _axes_access_logs),
+    RetentionPolicy("axes_failure_logs", _axes_failure_logs),
+    RetentionPolicy("sessions", _expired_sessions, _database_sessions),
+)
+
+
+def get_policies(names: Iterable[str] | None = None) -> list[RetentionPolicy]:
+    """Return the enabled policies to run, all of them when ``names`` is None.
+
+    Disabled policies are skipped even when named.
+
+    Raises:
+        ValueError: If a name does not match any policy.
+    """
+    if names is None:
+        return [policy for policy in POLICIES if policy.enabled()]
+    by_name = {policy.name: policy for policy in POLICIES}
+    unknown = set(names) - by_name.keys()
+    if unknown:
+        raise ValueError(f"Unknown retention policies: {', '.join(sorted(unknown))}")
+    return [by_name[name] for name in names if by_name[name].enabled()]
+
+
+def _purge(
+    policy: RetentionPolicy,
+    now: datetime,
+    batch_size: int,
+    sleep_seconds: float,
+    max_batches: int | None,
+) -> PolicyResult:
+    result = PolicyResult()
+    eligible = policy.eligible(now)
+    while max_batches is None or result.batches < max_batches:
+        ids = list(eligible.order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            # Model.delete() semantics, so cascades and signals still apply
+            eligible.model.objects.filter(pk__in=ids).delete()
+        result.purged += len(ids)
+        result.batches += 1
+        if len(ids) < batch_size:
+            break
+        if sleep_seconds:
+            time.sleep(sleep_seconds)
+    return result
+
+
+def run_retention(
+    *,
+    policies: Iterable[str] | None = None,
+    batch_size: int | None = None,
+    sleep_seconds: float | None = None,
+    max_batches: int | None = None,
+    dry_run: bool = False,
+) -> RetentionResult:
+    """Apply the retention policies in bounded batches.
+
+    Args:
+        policies: Policy names to run (default all).
+        batch_size: Rows per batch (default AUTH_RETENTION_BATCH_SIZE).
+        sleep_seconds: Pause between batches (default
+            AUTH_RETENTION_SLEEP_SECONDS).
+        max_batches: Stop each policy after this many batches.
+        dry_run: Only count the eligible rows.
+
+    Returns:
+        RetentionResult with rows purged, batches and seconds per policy.
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, "AUTH_RETENTION_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+    if sleep_seconds is None:
+        sleep_seconds = getattr(
+            settings, "AUTH_RETENTION_SLEEP_SECONDS", DEFAULT_SLEEP_SECONDS
+        )
+
+    now = timezone.now()
+    result = RetentionResult(dry_run=dry_run)
+    for policy in get_policies(policies):
+        started = time.monotonic()
+        if dry_run:
+            count = policy.eligible(now).count()
+            outcome = PolicyResult(purged=count, batches=-(-count // batch_size))
+        else:
+            outcome = _purge(policy, now, batch_size, sleep_seconds, max_batches)
+        outcome.seconds = round(time.monotonic() - started, 3)
+        result.policies[policy.name] = outcome
+
+    if not dry_run:
+        _record_metrics(result, now)
+    return result
+
+
+def _record_metrics(result: RetentionResult, finished_at: datetime) -> None:
+    metrics = get_retention_metrics()
+    for name, outcome in result.policies.items():
+        metrics[name] = {**asdict(outcome), "finished_at": finished_at.isoformat()}
+        logger.info(
+            "Retention policy finished",
+            extra={
+                "policy": name,
+                "purged": outcome.purged,
+                "batches": outcome.batches,
+                "seconds": outcome.seconds,
+            },
+        )
+    cache.set(METRICS_CACHE_KEY, metrics, None)
+
+
+def get_retention_metrics() -> dict[str, dict[str, Any]]:
+    """Return the latest run's figures per policy.
+
+    Each entry has ``purged``, ``batches``, ``seconds`` and ``finished_at``.
+    """
+    return cache.get(METRICS_CACHE_KEY) or {}
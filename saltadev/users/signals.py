@@ -0,0 +1,31 @@
+"""Signals for the users app."""
+
+from content.models import StaffProfile
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from home.cache import HOME_CACHE_NAMESPACE
+from saltadev.cache import invalidate
+
+from .models import User
+
+# Fields rendered on cached pages (staff cards on the homepage)
+DISPLAYED_FIELDS = frozenset({"first_name", "last_name"})
+
+
+@receiver(post_save, sender=User)
+def invalidate_staff_cards(
+    sender: type[User],
+    instance: User,
+    update_fields: frozenset[str] | None = None,
+    **kwargs: object,
+) -> None:
+    """Invalidate the homepage when a staff member's name may have changed.
+
+    Saves limited to other fields (``last_login`` on every login, password
+    changes) are skipped without a query.
+    """
+    if update_fields is not None and not DISPLAYED_FIELDS & update_fields:
+        return
+    if StaffProfile.objects.filter(user_id=instance.pk).exists():
+        transaction.on_commit(lambda: invalidate(HOME_CACHE_NAMESPACE))
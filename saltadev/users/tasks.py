@@ -113,3 +113,43 @@ def send_password_reset_email_task(
         html_message=html_message,
     )
     logger.info("Password reset email sent (async)", extra={"user_id": user_id})
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    max_retries=3,
+)
+def flush_axes_audit_task(self) -> int:
+    """Write queued django-axes audit entries in batches.
+
+    Args:
+        self: Task instance (for retries).
+
+    Returns:
+        Number of entries written.
+    """
+    from .audit import flush_audit_queue
+
+    return flush_audit_queue()
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    max_retries=3,
+)
+def purge_auth_data_task(self) -> int:
+    """Run the authentication retention policies from Celery beat.
+
+    Args:
+        self: Task instance (for retries).
+
+    Returns:
+        Number of rows purged across all policies.
+    """
+    from .retention import run_retention
+
+    return run_retention().purged
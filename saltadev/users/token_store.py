@@ -0,0 +1,303 @@
+"""Pluggable storage for email verification codes and password reset tokens.
+
+Both secrets are short-lived. On Redis they live as TTL keys, so issuing is
+a single write and expiry needs no cleanup job; other cache backends fall
+back to the ``EmailVerificationCode`` / ``PasswordResetToken`` tables.
+Choose explicitly with ``settings.TOKEN_STORE`` (dotted class path).
+
+The Redis keys share the cache instance, and under an ``allkeys-lru``
+policy (as on Render) Redis may evict a pending code or token under memory
+pressure. The member then has to request a new one. Where that matters,
+run Redis with ``volatile-lru``/``noeviction`` or set ``TOKEN_STORE`` to
+the database store.
+
+Redeeming happens before the caller's own writes, so callers that fail
+afterwards hand the secret back with ``restore_*``. A restored secret keeps
+its original expiry. The database store needs no restore when the
+redemption ran inside the failed transaction.
+"""
+
+from datetime import timedelta
+from functools import lru_cache
+from typing import Any, Protocol
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Exists, Subquery
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from saltadev.cache import redis_client as _redis_client
+
+from .models import EmailVerificationCode
+
+VERIFY_KEY_PREFIX = "tok:verify:"
+# The {reset} hash tag keeps a token and its user pointer in one Redis
+# Cluster slot, so RESET_TOKEN_SCRIPT can touch both
+RESET_KEY_PREFIX = "tok:{reset}:"
+RESET_USER_KEY_PREFIX = "tok:{reset}:user:"
+
+
+class TokenStore(Protocol):
+    """Issue and redeem one-time secrets for a user.
+
+    Issuing a secret invalidates the user's previous one of the same kind.
+    """
+
+    def issue_verification_code(self, user_id: int, code: str, ttl: timedelta) -> None:
+        """Store ``code`` as the user's only valid verification code."""
+        ...
+
+    def consume_verification_code(
+        self, user_id: int, code: str, ttl: timedelta
+    ) -> bool:
+        """Redeem ``code`` once; True if it was the user's current code."""
+        ...
+
+    def issue_reset_token(self, user_id: int, token_hash: str, ttl: timedelta) -> None:
+        """Store ``token_hash`` as the user's only valid reset token."""
+        ...
+
+    def get_reset_token_user_id(self, token_hash: str) -> int | None:
+        """Return the owner of a still-valid reset token, without redeeming it."""
+        ...
+
+    def consume_reset_token(self, token_hash: str) -> int | None:
+        """Redeem a reset token once; return its owner or None."""
+        ...
+
+    def restore_verification_code(self, user_id: int, code: str) -> None:
+        """Make a redeemed code valid again, unless it expired or was replaced."""
+        ...
+
+    def restore_reset_token(self, user_id: int, token_hash: str) -> None:
+        """Make a redeemed token valid again, unless it expired or was replaced."""
+        ...
+
+
+class DatabaseTokenStore:
+    """Secrets stored as ``EmailVerificationCode`` / ``PasswordResetToken`` rows."""
+
+    def issue_verification_code(self, user_id: int, code: str, ttl: timedelta) -> None:
+        """Invalidate pending codes and insert the new one."""
+        EmailVerificationCode.objects.filter(user_id=user_id, used=False).update(
+            used=True
+        )
+        EmailVerificationCode.objects.create(user_id=user_id, code=code)
+
+    def consume_verification_code(
+        self, user_id: int, code: str, ttl: timedelta
+    ) -> bool:
+        """Check and consume in one conditional UPDATE.
+
+        Only matches when ``code`` is the user's newest unused code and is
+        younger than ``ttl``, so two concurrent submits cannot both succeed.
+        """
+        newest = (
+            EmailVerificationCode.objects.filter(user_id=user_id, used=False)
+            .order_by("-created_at", "-pk")
+            .values("pk")[:1]
+        )
+        matches = EmailVerificationCode.objects.filter(
+            pk=Subquery(newest), code=code, created_at__gte=timezone.now() - ttl
+        )
+        return bool(
+            EmailVerificationCode.objects.filter(user_id=user_id, used=False)
+            .filter(Exists(matches))
+            .update(used=True)
+        )
+
+    def issue_reset_token(self, user_id: int, token_hash: str, ttl: timedelta) -> None:
+        """Invalidate pending tokens and insert the new one."""
+        from password_reset.models import PasswordResetToken
+
+        PasswordResetToken.objects.filter(user_id=user_id, used=False).update(used=True)
+        PasswordResetToken.objects.create(
+            user_id=user_id, token_hash=token_hash, expires_at=timezone.now() + ttl
+        )
+
+    def _active_tokens(self, token_hash: str) -> Any:
+        from password_reset.models import PasswordResetToken
+
+        return PasswordResetToken.objects.filter(
+            token_hash=token_hash, used=False, expires_at__gte=timezone.now()
+        )
+
+    def get_reset_token_user_id(self, token_hash: str) -> int | None:
+        """Return the owner of the newest active token with this hash."""
+        return (
+            self._active_tokens(token_hash)
+            .order_by("-created_at")
+            .values_list("user_id", flat=True)
+            .first()
+        )
+
+    def consume_reset_token(self, token_hash: str) -> int | None:
+        """Mark the token used and return its owner.
+
+        The UPDATE only matches unused, unexpired rows, so of two concurrent
+        redemptions only one succeeds.
+        """
+        with transaction.atomic():
+            user_id = self.get_reset_token_user_id(token_hash)
+            if user_id is None or not self._active_tokens(token_hash).update(used=True):
+                return None
+        return user_id
+
+    def restore_verification_code(self, user_id: int, code: str) -> None:
+        """No-op: the consuming UPDATE rolls back with the caller's transaction."""
+
+    def restore_reset_token(self, user_id: int, token_hash: str) -> None:
+        """No-op: the consuming UPDATE rolls back with the caller's transaction."""
+
+
+# Redeemed secrets are not deleted but overwritten with a "redeemed:"
+# marker that keeps the key's TTL (KEEPTTL, Redis 6+), so RESTORE_SCRIPT
+# can hand a secret back without extending its life.
+
+# Compare-and-redeem, so a wrong guess never burns the valid code. Issued
+# codes never carry the marker, so a submitted marker cannot match.
+CONSUME_CODE_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if value ~= ARGV[1] or string.find(value, 'redeemed:', 1, true) == 1 then
+  return 0
+end
+redis.call('SET', KEYS[1], 'redeemed:' .. value, 'KEEPTTL')
+return 1
+"""
+
+# KEYS: token key, user pointer key; ARGV: token hash, owner id, consume
+# flag. A token is valid only while its user still points at it, so
+# issuing a new token invalidates the old one without deleting it, and
+# redeeming only has to mark the pointer.
+RESET_TOKEN_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[2] then
+  return false
+end
+if redis.call('GET', KEYS[2]) ~= ARGV[1] then
+  return false
+end
+if ARGV[3] == '1' then
+  redis.call('SET', KEYS[2], 'redeemed:' .. ARGV[1], 'KEEPTTL')
+end
+return ARGV[2]
+"""
+
+# Undo a redemption while the marker is still there: gone means the secret
+# expired, any other value means a newer one was issued since
+RESTORE_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= 'redeemed:' .. ARGV[1] then
+  return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'KEEPTTL')
+return 1
+"""
+
+
+class RedisTokenStore:
+    """Secrets stored as Redis keys that expire on their own.
+
+    Verification codes live at ``tok:verify:<user_id>``; reset tokens at
+    ``tok:{reset}:<hash>`` (owner id) plus ``tok:{reset}:user:<user_id>``
+    (current hash). Redeeming runs as a Lua script over declared keys, so
+    it is atomic and Redis Cluster safe.
+    """
+
+    def __init__(self) -> None:
+        self._scripts: dict[str, Any] = {}
+
+    def _client(self) -> Any:
+        client = _redis_client()
+        if client is None:
+            raise ImproperlyConfigured(
+                "RedisTokenStore requires the Redis cache backend"
+            )
+        return client
+
+    def _run(self, source: str, keys: list[str], args: list[Any]) -> Any:
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = self._client().register_script(source)
+        return script(keys=keys, args=args)
+
+    def issue_verification_code(self, user_id: int, code: str, ttl: timedelta) -> None:
+        """Overwrite the user's code; the previous one is gone with it."""
+        self._client().set(self._verify_key(user_id), code, ex=int(ttl.total_seconds()))
+
+    def consume_verification_code(
+        self, user_id: int, code: str, ttl: timedelta
+    ) -> bool:
+        """Redeem the code only if it matches."""
+        return bool(self._run(CONSUME_CODE_SCRIPT, [self._verify_key(user_id)], [code]))
+
+    def issue_reset_token(self, user_id: int, token_hash: str, ttl: timedelta) -> None:
+        """Write the token and repoint the user at it in one transaction."""
+        seconds = int(ttl.total_seconds())
+        with self._client().pipeline() as pipe:
+            pipe.set(self._token_key(token_hash), user_id, ex=seconds)
+            pipe.set(self._user_key(user_id), token_hash, ex=seconds)
+            pipe.execute()
+
+    def get_reset_token_user_id(self, token_hash: str) -> int | None:
+        """Return the owner while the token is current and unexpired."""
+        return self._reset(token_hash, consume=False)
+
+    def consume_reset_token(self, token_hash: str) -> int | None:
+        """Mark the user's pointer redeemed; return the owner."""
+        return self._reset(token_hash, consume=True)
+
+    def restore_verification_code(self, user_id: int, code: str) -> None:
+        """Put the code back with its remaining TTL, if it is still redeemed."""
+        self._run(RESTORE_SCRIPT, [self._verify_key(user_id)], [code])
+
+    def restore_reset_token(self, user_id: int, token_hash: str) -> None:
+        """Repoint the user at the token, if it is still the redeemed one.
+
+        The token key itself is left in place by redeeming and keeps its TTL.
+        """
+        self._run(RESTORE_SCRIPT, [self._user_key(user_id)], [token_hash])
+
+    def _reset(self, token_hash: str, *, consume: bool) -> int | None:
+        """Resolve the owner, then check (and redeem) with both keys declared."""
+        token_key = self._token_key(token_hash)
+        owner = self._client().get(token_key)
+        if owner is None:
+            return None
+        user_id = self._run(
+            RESET_TOKEN_SCRIPT,
+            [token_key, self._user_key(int(owner))],
+            [token_hash, owner, "1" if consume else "0"],
+        )
+        return int(user_id) if user_id else None
+
+    @staticmethod
+    def _verify_key(user_id: int) -> str:
+        return cache.make_and_validate_key(f"{VERIFY_KEY_PREFIX}{user_id}")
+
+    @staticmethod
+    def _token_key(token_hash: str) -> str:
+        return cache.make_and_validate_key(f"{RESET_KEY_PREFIX}{token_hash}")
+
+    @staticmethod
+    def _user_key(user_id: int) -> str:
+        return cache.make_and_validate_key(f"{RESET_USER_KEY_PREFIX}{user_id}")
+
+
+@lru_cache(maxsize=4)
+def _load_store(path: str | None, redis_backend: bool) -> TokenStore:
+    if path:
+        return import_string(path)()
+    return RedisTokenStore() if redis_backend else DatabaseTokenStore()
+
+
+def get_token_store() -> TokenStore:
+    """Return the configured store (``settings.TOKEN_STORE``).
+
+    Defaults to Redis when the cache is Redis and to the database otherwise.
+    """
+    return _load_store(
+        getattr(settings, "TOKEN_STORE", None),
+        isinstance(caches["default"], RedisCache),
+    )
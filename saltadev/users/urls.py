@@ -5,4 +5,5 @@ from . import views
 urlpatterns = [
     path("", views.verify_email, name="verify_email"),
     path("clear-rate-limits/", views.clear_rate_limits_view, name="clear_rate_limits"),
+    path("bloqueos/", views.rate_limit_blocks_view, name="rate_limit_blocks"),
 ]
@@ -5,17 +5,20 @@ from urllib.parse import urlencode
 
 from django.conf import settings
 from django.core.mail import send_mail
+from django.db import transaction
 from django.template.loader import render_to_string
-from django.utils import timezone
 from django.utils.html import strip_tags
 from saltadev.logging import get_logger
 
-from .models import EmailVerificationCode, User
+from .models import User
 from .tasks import send_password_reset_email_task, send_verification_email_task
+from .token_store import get_token_store
 
 logger = get_logger()
 
 DEFAULT_LOCKOUT_MESSAGE = "Demasiados intentos fallidos. Intentá nuevamente más tarde."
+VERIFICATION_CODE_TTL = timedelta(hours=24)
+PASSWORD_RESET_TOKEN_MINUTES = 10
 
 
 def get_lockout_message() -> str:
@@ -69,9 +72,8 @@ def send_verification_code(user: User, sync: bool = False) -> None:
         user: The user to send the verification code to.
         sync: If True, send email synchronously (useful for tests/debugging).
     """
-    EmailVerificationCode.objects.filter(user=user, used=False).update(used=True)
     code = generate_verification_code()
-    EmailVerificationCode.objects.create(user=user, code=code)
+    get_token_store().issue_verification_code(user.pk, code, VERIFICATION_CODE_TTL)
 
     verify_url = f"{settings.SITE_URL}/verificar/?{urlencode({'email': user.email})}"
 
@@ -91,40 +93,23 @@ def send_verification_code(user: User, sync: bool = False) -> None:
 def verify_code(user: User, code: str) -> bool:
     """Validate a verification code and mark the user's email as confirmed.
 
-    The code must:
-    1. Exist and not be used
-    2. Be the newest code for this user (prevents using old codes)
-    3. Not be expired (24 hour limit)
+    The code must be the user's newest one and less than 24 hours old. The
+    token store checks and consumes it atomically, so two concurrent
+    submits cannot both succeed. If saving the user fails, the code is
+    handed back so the member can retry it.
     """
-    # Find the code that matches
-    code_record = (
-        EmailVerificationCode.objects.filter(user=user, code=code, used=False)
-        .order_by("-created_at")
-        .first()
-    )
-
-    if code_record is None:
-        return False
-
-    # Check if expired (24 hours)
-    if timezone.now() - code_record.created_at > timedelta(hours=24):
-        return False
-
-    # Check if this is the newest code for this user
-    newest_code = (
-        EmailVerificationCode.objects.filter(user=user, used=False)
-        .order_by("-created_at")
-        .first()
-    )
-
-    if newest_code is None or newest_code.pk != code_record.pk:
-        return False
-
-    # All checks passed - mark ALL codes as used and confirm email
-    EmailVerificationCode.objects.filter(user=user, used=False).update(used=True)
-
-    user.email_confirmed = True
-    user.save()
+    store = get_token_store()
+    try:
+        with transaction.atomic():
+            if not store.consume_verification_code(
+                user.pk, code, VERIFICATION_CODE_TTL
+            ):
+                return False
+            user.email_confirmed = True
+            user.save(update_fields=["email_confirmed"])
+    except Exception:
+        store.restore_verification_code(user.pk, code)
+        raise
     logger.info("Email verified in utils", extra={"user_id": user.pk})
 
     return True
@@ -140,22 +125,60 @@ def hash_token(token: str) -> str:
     return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
 
-def create_password_reset_token(user: User, expires_minutes: int = 10) -> str:
+def create_password_reset_token(
+    user: User, expires_minutes: int = PASSWORD_RESET_TOKEN_MINUTES
+) -> str:
     """Create a new password reset token, invalidating any existing ones."""
-    from password_reset.models import PasswordResetToken
-
-    PasswordResetToken.objects.filter(user=user, used=False).update(used=True)
-
     token = generate_reset_token()
-    PasswordResetToken.objects.create(
-        user=user,
-        token_hash=hash_token(token),
-        expires_at=timezone.now() + timedelta(minutes=expires_minutes),
+    get_token_store().issue_reset_token(
+        user.pk, hash_token(token), timedelta(minutes=expires_minutes)
     )
     logger.info("Password reset token created", extra={"user_id": user.pk})
     return token
 
 
+def get_password_reset_user(token: str) -> User | None:
+    """Return the user a still-valid reset token belongs to, or None."""
+    if not token:
+        return None
+    user_id = get_token_store().get_reset_token_user_id(hash_token(token))
+    return User.objects.filter(pk=user_id).first() if user_id else None
+
+
+def consume_password_reset_token(token: str) -> bool:
+    """Redeem a reset token once; False if it was invalid, used or expired."""
+    return (
+        bool(token)
+        and get_token_store().consume_reset_token(hash_token(token)) is not None
+    )
+
+
+def reset_password_with_token(user: User, token: str, new_password: str) -> bool:
+    """Redeem ``token`` and set the user's new password in one transaction.
+
+    The token is redeemed first, so two concurrent submits cannot both
+    reset. If saving the password fails, the token is handed back so the
+    member can retry with the same link.
+
+    Returns:
+        False if the token was invalid, used or expired.
+    """
+    if not token:
+        return False
+    store = get_token_store()
+    token_hash = hash_token(token)
+    try:
+        with transaction.atomic():
+            if store.consume_reset_token(token_hash) is None:
+                return False
+            user.set_password(new_password)
+            user.save()
+    except Exception:
+        store.restore_reset_token(user.pk, token_hash)
+        raise
+    return True
+
+
 def _send_password_reset_sync(user: User, reset_link: str) -> None:
     """Send password reset email synchronously (internal helper)."""
     html_message = render_to_string(
@@ -14,21 +14,23 @@ from .fingerprint import attach_fingerprint_cookie
 from .models import User
 from .ratelimit import (
     SCOPES,
-    VERIFY_LIMIT,
-    build_keys,
+    RateLimitState,
     clear_limits,
-    get_client_ip,
-    get_fingerprint,
+    find_blocks,
+    get_rate_limit_state,
     increment,
-    is_blocked,
+    list_blocks,
+    rate_limited,
     reset,
+    unblock,
 )
-from .utils import get_lockout_message, send_verification_code, verify_code
+from .utils import send_verification_code, verify_code
 
 logger = get_logger()
 
 # Template constant to avoid duplication
 TEMPLATE_VERIFY = "users/verificar.html"
+TEMPLATE_BLOCKS = "users/rate_limit_blocks.html"
 
 
 def _render_verify_page(
@@ -36,33 +38,12 @@ def _render_verify_page(
     email: str,
     fingerprint: str,
     should_set_cookie: bool,
-    blocked_message: str | None = None,
 ) -> HttpResponse:
     """Render verification page."""
-    context: dict[str, str] = {"email": email}
-    if blocked_message:
-        context["blocked_message"] = blocked_message
-    response = render(request, TEMPLATE_VERIFY, context)
+    response = render(request, TEMPLATE_VERIFY, {"email": email})
     return attach_fingerprint_cookie(response, fingerprint, should_set_cookie)
 
 
-def _handle_resend_blocked(
-    request: HttpRequest,
-    email: str,
-    ip_address: str,
-    fingerprint: str,
-    should_set_cookie: bool,
-) -> HttpResponse:
-    """Handle blocked resend request."""
-    logger.warning(
-        "Verification resend blocked by rate limit",
-        extra={"ip": ip_address, "email": email},
-    )
-    return _render_verify_page(
-        request, email, fingerprint, should_set_cookie, get_lockout_message()
-    )
-
-
 def _handle_resend_request(
     request: HttpRequest,
     email: str,
@@ -89,23 +70,6 @@ def _handle_resend_request(
     return attach_fingerprint_cookie(response, fingerprint, should_set_cookie)
 
 
-def _handle_verify_blocked(
-    request: HttpRequest,
-    email: str,
-    ip_address: str,
-    fingerprint: str,
-    should_set_cookie: bool,
-) -> HttpResponse:
-    """Handle blocked verification request."""
-    logger.warning(
-        "Verification blocked by rate limit",
-        extra={"ip": ip_address, "email": email},
-    )
-    return _render_verify_page(
-        request, email, fingerprint, should_set_cookie, get_lockout_message()
-    )
-
-
 def _handle_missing_fields(
     request: HttpRequest,
     email: str,
@@ -153,7 +117,7 @@ def _handle_successful_verification(
     """Handle successful email verification."""
     messages.success(request, "Email verificado correctamente!")
     reset(keys)
-    login(request, user, backend="django.contrib.auth.backends.ModelBackend")
+    login(request, user, backend="users.backends.EmailBackend")
     logger.info(
         "Email verified",
         extra={"ip": ip_address, "user_id": user.pk},
@@ -180,18 +144,12 @@ def _handle_invalid_code(
     return _render_verify_page(request, email, fingerprint, should_set_cookie)
 
 
-def _handle_verify_post(
-    request: HttpRequest, ip_address: str, fingerprint: str, should_set_cookie: bool
-) -> HttpResponse:
+def _handle_verify_post(request: HttpRequest, state: RateLimitState) -> HttpResponse:
     """Process POST request for verification (verify code or resend)."""
+    ip_address, keys = state.ip_address, state.keys
+    fingerprint, should_set_cookie = state.fingerprint, state.should_set_cookie
     email = request.POST.get("email", "")
     action = request.POST.get("action", "verify")
-    keys = build_keys("verify", ip_address, email, fingerprint)
-
-    if is_blocked(keys, VERIFY_LIMIT):
-        return _handle_verify_blocked(
-            request, email, ip_address, fingerprint, should_set_cookie
-        )
 
     if action == "resend":
         if not email:
@@ -246,6 +204,7 @@ def _handle_verify_get(request: HttpRequest) -> HttpResponse | None:
 
 
 @require_http_methods(["GET", "POST"])
+@rate_limited("verify", field="email")
 def verify_email(request: HttpRequest) -> HttpResponse:
     """Handle email verification via 6-digit code submission or code resend.
 
@@ -255,11 +214,11 @@ def verify_email(request: HttpRequest) -> HttpResponse:
     - Resend uses POST for CSRF protection
     - Rate limited to prevent abuse
     """
-    ip_address = get_client_ip(request)
-    fingerprint, should_set_cookie = get_fingerprint(request)
+    state = get_rate_limit_state(request)
+    fingerprint, should_set_cookie = state.fingerprint, state.should_set_cookie
 
     if request.method == "POST":
-        return _handle_verify_post(request, ip_address, fingerprint, should_set_cookie)
+        return _handle_verify_post(request, state)
 
     redirect_response = _handle_verify_get(request)
     if redirect_response:
@@ -283,3 +242,40 @@ def clear_rate_limits_view(request: HttpRequest) -> HttpResponse:
     )
     messages.success(request, f"Se limpiaron {len(cleared)} bloqueos.")
     return redirect("home")
+
+
+@require_http_methods(["GET", "POST"])
+def rate_limit_blocks_view(request: HttpRequest) -> HttpResponse:
+    """Staff-only list of currently blocked keys per scope, with bulk unblock.
+
+    ``ip``, ``email`` and ``fp`` query params look up the blocks of one
+    client across every scope.
+    """
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return redirect("home")
+
+    if request.method == "POST":
+        cleared = unblock(request.POST.getlist("keys"))
+        logger.info(
+            "Rate limit blocks cleared by staff",
+            extra={"user_id": request.user.pk, "keys": cleared},
+        )
+        messages.success(request, f"Se limpiaron {len(cleared)} bloqueos.")
+        return redirect("rate_limit_blocks")
+
+    scopes = []
+    for scope in SCOPES:
+        entries, total = list_blocks(scope)
+        scopes.append({"name": scope, "entries": entries, "total": total})
+
+    search = {name: request.GET.get(name, "").strip() for name in ("ip", "email", "fp")}
+    results = None
+    if any(search.values()):
+        results = find_blocks(
+            ip_address=search["ip"], email=search["email"], fingerprint=search["fp"]
+        )
+    return render(
+        request,
+        TEMPLATE_BLOCKS,
+        {"scopes": scopes, "search": search, "results": results},
+    )
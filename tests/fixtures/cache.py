@@ -2,14 +2,20 @@
 
 import pytest
 from django.core.cache import cache
+from saltadev.cache import local_cache
+from users.ratelimit import deny_cache
 
 
 @pytest.fixture(autouse=True)
 def clear_cache():
-    """Clear cache before and after each test."""
+    """Clear the cache and the per-worker caches before and after each test."""
     cache.clear()
+    deny_cache.clear()
+    local_cache.clear()
     yield
     cache.clear()
+    deny_cache.clear()
+    local_cache.clear()
 
 
 @pytest.fixture
@@ -0,0 +1,152 @@
+"""Tests for the authentication retention engine."""
+
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from axes.models import AccessFailureLog, AccessLog
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.utils import timezone
+from password_reset.models import PasswordResetToken
+from users.models import EmailVerificationCode, User
+from users.retention import get_policies, get_retention_metrics, run_retention
+from users.tasks import purge_auth_data_task
+
+
+@pytest.fixture
+def stale_auth_data(verified_user, unverified_user_factory):
+    """Create one purgeable and one live row for every policy."""
+    now = timezone.now()
+    old = now - timedelta(days=365)
+
+    PasswordResetToken.objects.create(
+        user=verified_user, token_hash="expired", expires_at=old
+    )
+    PasswordResetToken.objects.create(
+        user=verified_user, token_hash="used", expires_at=now, used=True
+    )
+    PasswordResetToken.objects.create(
+        user=verified_user, token_hash="live", expires_at=now + timedelta(hours=1)
+    )
+
+    EmailVerificationCode.objects.create(user=verified_user, code="111111", used=True)
+    stale = EmailVerificationCode.objects.create(user=verified_user, code="222222")
+    EmailVerificationCode.objects.filter(pk=stale.pk).update(created_at=old)
+    EmailVerificationCode.objects.create(user=verified_user, code="333333")
+
+    unverified_user_factory("abandoned@example.com", registered_at=old)
+    unverified_user_factory("recent@example.com", registered_at=now)
+
+    for model in (AccessLog, AccessFailureLog):
+        for attempt_time in (old, now):
+            row = model.objects.create(username="a@b.com", ip_address="127.0.0.1")
+            model.objects.filter(pk=row.pk).update(attempt_time=attempt_time)
+
+    Session.objects.create(session_key="old", session_data="", expire_date=old)
+    Session.objects.create(
+        session_key="live", session_data="", expire_date=now + timedelta(days=1)
+    )
+
+
+@pytest.fixture
+def unverified_user_factory(db, user_data):
+    """Return a callable creating unconfirmed users."""
+
+    def create(email, registered_at):
+        return User.objects.create_user(
+            **{**user_data, "email": email}, registered_at=registered_at
+        )
+
+    return create
+
+
+@pytest.mark.django_db
+class TestRunRetention:
+    """Tests for run_retention."""
+
+    def test_purges_only_eligible_rows(self, stale_auth_data, settings):
+        """Should delete stale rows of every policy and keep live ones."""
+        settings.AUTH_RETENTION_UNVERIFIED_USER_DAYS = 30
+        result = run_retention(sleep_seconds=0)
+        assert {name: r.purged for name, r in result.policies.items()} == {
+            "password_reset_tokens": 2,
+            "verification_codes": 2,
+            "unverified_users": 1,
+            "axes_access_logs": 1,
+            "axes_failure_logs": 1,
+            "sessions": 1,
+        }
+        assert PasswordResetToken.objects.get().token_hash == "live"
+        assert EmailVerificationCode.objects.get().code == "333333"
+        assert not User.objects.filter(email="abandoned@example.com").exists()
+        assert User.objects.filter(email="recent@example.com").exists()
+        assert Session.objects.get().session_key == "live"
+
+    def test_deletes_in_bounded_batches(self, stale_auth_data):
+        """Should split a policy into batches of batch_size primary keys."""
+        result = run_retention(
+            policies=["password_reset_tokens"], batch_size=1, sleep_seconds=0
+        )
+        assert result.policies["password_reset_tokens"].batches == 2
+
+    def test_max_batches_stops_early(self, stale_auth_data):
+        """Should leave the remaining rows for the next run."""
+        run_retention(
+            policies=["password_reset_tokens"],
+            batch_size=1,
+            sleep_seconds=0,
+            max_batches=1,
+        )
+        assert PasswordResetToken.objects.count() == 2
+
+    def test_dry_run_changes_nothing(self, stale_auth_data):
+        """Should only count eligible rows and record no metrics."""
+        result = run_retention(dry_run=True)
+        assert result.purged == 7
+        assert PasswordResetToken.objects.count() == 3
+        assert get_retention_metrics() == {}
+
+    def test_records_metrics(self, stale_auth_data):
+        """Should keep rows purged and time taken per policy."""
+        run_retention(policies=["sessions"], sleep_seconds=0)
+        metrics = get_retention_metrics()
+        assert metrics["sessions"]["purged"] == 1
+        assert metrics["sessions"]["seconds"] >= 0
+        assert "finished_at" in metrics["sessions"]
+
+    def test_unverified_users_are_opt_in(self, stale_auth_data):
+        """Should keep never-confirmed accounts unless a cutoff is configured."""
+        result = run_retention(sleep_seconds=0)
+        assert "unverified_users" not in result.policies
+        assert run_retention(policies=["unverified_users"]).policies == {}
+        assert User.objects.filter(email="abandoned@example.com").exists()
+
+    def test_skips_sessions_outside_database(self, stale_auth_data, settings):
+        """Should not report sessions when they are not stored in the database."""
+        settings.SESSION_ENGINE = "django.contrib.sessions.backends.cache"
+        result = run_retention(sleep_seconds=0)
+        assert "sessions" not in result.policies
+        assert Session.objects.count() == 2
+
+    def test_unknown_policy(self):
+        """Should reject policy names that do not exist."""
+        with pytest.raises(ValueError, match="nope"):
+            get_policies(["nope"])
+
+    def test_command_output(self, stale_auth_data):
+        """Should report each policy of a dry run."""
+        out = StringIO()
+        call_command("purge_auth_data", "--policy=sessions", "--dry-run", stdout=out)
+        assert "sessions: 1 rows would be deleted" in out.getvalue()
+
+    def test_cleanup_expired_tokens_uses_engine(self, stale_auth_data):
+        """Should keep the old command working on top of the engine."""
+        out = StringIO()
+        call_command("cleanup_expired_tokens", stdout=out)
+        assert "deleted: 2" in out.getvalue()
+
+    def test_task(self, stale_auth_data, settings):
+        """Should run every policy from the periodic task."""
+        settings.AUTH_RETENTION_SLEEP_SECONDS = 0
+        assert purge_auth_data_task.delay().get() == 7
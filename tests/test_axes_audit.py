@@ -0,0 +1,200 @@
+"""Tests for the rate-limit backed axes handler and batched audit writer."""
+
+import json
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from axes.handlers.proxy import AxesProxyHandler
+from axes.models import AccessAttempt, AccessFailureLog, AccessLog
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import Client
+from django.urls import reverse
+from users.audit import (
+    AUDIT_FLUSH_THRESHOLD,
+    AUDIT_QUEUE_MAX_LENGTH,
+    AUDIT_QUEUE_TTL,
+    FAILURE,
+    LOGIN,
+    LOGOUT,
+    enqueue,
+    flush_audit_queue,
+    write_entries,
+)
+from users.ratelimit import is_blocked
+
+LOGIN_IP_KEY = "rl:login:ip:127.0.0.1"
+
+
+def _entry(kind, username="a@b.com", **overrides):
+    return {
+        "kind": kind,
+        "username": username,
+        "ip_address": "127.0.0.1",
+        "user_agent": "pytest",
+        "http_accept": "*/*",
+        "path_info": "/login/",
+        "attempt_time": "2026-01-01T10:00:00+00:00",
+        "session_hash": "hash",
+        "locked_out": False,
+        **overrides,
+    }
+
+
+@pytest.mark.django_db
+class TestRateLimitAxesHandler:
+    """Tests for RateLimitAxesHandler."""
+
+    def _fail_login(self, client, email="test@example.com"):
+        return client.post(
+            reverse("login"), {"username": email, "password": "wrongpassword"}
+        )
+
+    def test_failure_counted_once_on_login_keys(self, verified_user):
+        """Should count a failed login once, on the shared rl:login keys."""
+        self._fail_login(Client())
+        assert cache.get(LOGIN_IP_KEY) == 1
+        assert not AccessAttempt.objects.exists()
+
+    def test_locks_out_at_limit(self, verified_user, settings):
+        """Should block the client once the login limit is reached."""
+        settings.RATE_LIMITS = {"login": {"limit": 2, "window": 60}}
+        client = Client()
+        self._fail_login(client)
+        self._fail_login(client)
+        assert is_blocked([LOGIN_IP_KEY])
+        assert AccessFailureLog.objects.filter(locked_out=True).count() == 1
+
+    def test_success_resets_keys_and_logs_access(self, verified_user, user_data):
+        """Should clear the login keys and write an access log row."""
+        client = Client()
+        self._fail_login(client)
+        client.post(
+            reverse("login"),
+            {"username": user_data["email"], "password": user_data["password"]},
+        )
+        assert cache.get(LOGIN_IP_KEY) is None
+        assert AccessLog.objects.filter(username=user_data["email"]).exists()
+
+    def test_reset_attempts_clears_limits(self):
+        """Should clear the login keys for the given IP."""
+        cache.set(LOGIN_IP_KEY, 5, 60)
+        assert AxesProxyHandler.reset_attempts(ip_address="127.0.0.1") == 1
+        assert cache.get(LOGIN_IP_KEY) is None
+
+
+@pytest.mark.django_db
+class TestWriteEntries:
+    """Tests for the batched audit writer."""
+
+    def test_one_insert_per_model(self, django_assert_num_queries):
+        """Should bulk insert a whole batch per log table, in one transaction."""
+        entries = [_entry(FAILURE) for _ in range(3)] + [_entry(LOGIN)]
+        # savepoint + (insert, attempt_time fix-up) per table + release
+        with django_assert_num_queries(6):
+            assert write_entries(entries) == 4
+        assert AccessFailureLog.objects.count() == 3
+        assert AccessLog.objects.count() == 1
+
+    def test_keeps_original_attempt_time(self):
+        """Should store when the attempt happened, not when it was flushed."""
+        write_entries([_entry(FAILURE)])
+        row = AccessFailureLog.objects.get()
+        assert row.attempt_time == datetime(2026, 1, 1, 10, tzinfo=UTC)
+
+    def test_failed_batch_writes_nothing(self):
+        """Should roll back earlier tables when a later insert fails."""
+        entries = [_entry(LOGIN), _entry(FAILURE)]
+        with (
+            patch.object(
+                AccessFailureLog.objects, "bulk_create", side_effect=DatabaseError
+            ),
+            pytest.raises(DatabaseError),
+        ):
+            write_entries(entries)
+        assert not AccessLog.objects.exists()
+
+    def test_logout_closes_login_of_same_batch(self):
+        """Should set logout_time on the session's access log row."""
+        logout_at = (
+            datetime(2026, 1, 1, 10, tzinfo=UTC) + timedelta(hours=1)
+        ).isoformat()
+        write_entries([_entry(LOGIN), _entry(LOGOUT, attempt_time=logout_at)])
+        assert AccessLog.objects.get().logout_time.isoformat() == logout_at
+
+    def test_flush_drains_queue_in_batches(self):
+        """Should pop batches until the Redis queue is empty."""
+        client = MagicMock()
+        client.lpop.side_effect = [
+            [json.dumps(_entry(FAILURE)), json.dumps(_entry(FAILURE))],
+            [json.dumps(_entry(LOGIN))],
+            None,
+        ]
+        with patch("users.audit._redis_client", return_value=client):
+            assert flush_audit_queue(batch_size=2) == 3
+        assert client.lpop.call_count == 3
+        assert AccessFailureLog.objects.count() == 2
+
+    def test_flush_requeues_failed_batch(self):
+        """Should push a batch back, in order, when writing it fails."""
+        client = MagicMock()
+        batch = [json.dumps(_entry(FAILURE)), json.dumps(_entry(LOGIN))]
+        client.lpop.return_value = batch
+        with (
+            patch("users.audit._redis_client", return_value=client),
+            patch("users.audit.write_entries", side_effect=RuntimeError),
+            pytest.raises(RuntimeError),
+        ):
+            flush_audit_queue()
+        client.lpush.assert_called_once_with(
+            cache.make_and_validate_key("axes:audit"), batch[1], batch[0]
+        )
+
+
+class TestEnqueue:
+    """Tests for queueing audit entries."""
+
+    def _enqueue(self, length):
+        client = MagicMock()
+        pipe = client.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [length, True, True]
+        with (
+            patch("users.audit._redis_client", return_value=client),
+            patch("users.audit.flush_axes_audit_task") as task,
+        ):
+            enqueue(_entry(FAILURE))
+        return pipe, task
+
+    def test_caps_and_expires_queue(self):
+        """Should trim the list to its cap and refresh its TTL on each push."""
+        pipe, _ = self._enqueue(1)
+        key = cache.make_and_validate_key("axes:audit")
+        pipe.ltrim.assert_called_once_with(key, -AUDIT_QUEUE_MAX_LENGTH, -1)
+        pipe.expire.assert_called_once_with(key, AUDIT_QUEUE_TTL)
+
+    def test_flushes_at_threshold(self):
+        """Should schedule a flush once the queue holds the threshold."""
+        cache.add("axes:audit:flushed", 1, 60)
+        _, task = self._enqueue(AUDIT_FLUSH_THRESHOLD - 1)
+        task.delay.assert_not_called()
+        _, task = self._enqueue(AUDIT_FLUSH_THRESHOLD + 1)
+        task.delay.assert_called_once_with()
+
+    def test_flushes_at_cap_with_debounce(self):
+        """Should keep flushing a capped queue, at most once per debounce."""
+        cache.add("axes:audit:flushed", 1, 60)
+        _, task = self._enqueue(AUDIT_QUEUE_MAX_LENGTH + 1)
+        task.delay.assert_called_once_with()
+        _, task = self._enqueue(AUDIT_QUEUE_MAX_LENGTH + 1)
+        task.delay.assert_not_called()
+        cache.delete("axes:audit:pending")
+        _, task = self._enqueue(AUDIT_QUEUE_MAX_LENGTH + 1)
+        task.delay.assert_called_once_with()
+
+    def test_flushes_once_per_interval(self):
+        """Should drain a small queue when no flush ran recently."""
+        _, task = self._enqueue(1)
+        task.delay.assert_called_once_with()
+        _, task = self._enqueue(2)
+        task.delay.assert_not_called()
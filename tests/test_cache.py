@@ -0,0 +1,259 @@
+"""Tests for saltadev/cache.py module."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import redis
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+from locations.models import Province
+from saltadev.cache import (
+    INVALIDATION_CHANNEL,
+    LocalCache,
+    _listen,
+    _restart_listener_after_fork,
+    apply_invalidation,
+    bump_version,
+    get_or_build,
+    get_two_tier,
+    get_version,
+    invalidate,
+    local_cache,
+    on_invalidate,
+    start_invalidation_listener,
+)
+
+
+def _store(key, value, expires_in, delta=0.0):
+    cache.set(key, (value, time.time() + expires_in, delta), 300)
+
+
+class TestGetOrBuild:
+    """Tests for get_or_build."""
+
+    def test_builds_once_and_caches(self):
+        """Should build on a miss and serve the cached value afterwards."""
+        build = MagicMock(return_value="fresh")
+        assert get_or_build("k", build, 60) == "fresh"
+        assert get_or_build("k", build, 60) == "fresh"
+        build.assert_called_once()
+        assert cache.get("k:lock") is None
+
+    def test_stale_value_served_while_locked(self):
+        """Should not rebuild while another caller holds the lock."""
+        _store("k", "stale", expires_in=-1)
+        cache.add("k:lock", 1, 10)
+        build = MagicMock(return_value="fresh")
+        assert get_or_build("k", build, 60) == "stale"
+        build.assert_not_called()
+
+    def test_stale_value_rebuilt_by_lock_holder(self):
+        """Should rebuild an expired entry when the lock is free."""
+        _store("k", "stale", expires_in=-1)
+        assert get_or_build("k", lambda: "fresh", 60) == "fresh"
+        assert cache.get("k")[0] == "fresh"
+
+    def test_miss_waits_for_lock_holder(self):
+        """Should wait for the winner's value instead of rebuilding."""
+        cache.add("k:lock", 1, 10)
+        build = MagicMock(return_value="mine")
+        with patch(
+            "saltadev.cache.time.sleep", side_effect=lambda _: _store("k", "theirs", 60)
+        ):
+            assert get_or_build("k", build, 60) == "theirs"
+        build.assert_not_called()
+
+    def test_miss_builds_when_lock_holder_is_gone(self):
+        """Should give up waiting and build after WAIT_TIMEOUT."""
+        cache.add("k:lock", 1, 10)
+        with patch("saltadev.cache.WAIT_TIMEOUT", 0):
+            assert get_or_build("k", lambda: "mine", 60) == "mine"
+
+    @pytest.mark.parametrize(("roll", "refreshed"), [(0.0, False), (0.999999, True)])
+    def test_probabilistic_early_refresh(self, roll, refreshed):
+        """Should refresh early more often the slower the last rebuild was."""
+        _store("k", "cached", expires_in=5, delta=1.0)
+        with patch("saltadev.cache.random.random", return_value=roll):
+            value = get_or_build("k", lambda: "fresh", 60)
+        assert value == ("fresh" if refreshed else "cached")
+
+
+class TestVersions:
+    """Tests for namespace versions."""
+
+    def test_bump_moves_to_next_version(self):
+        """Should increment the namespace version."""
+        version = get_version("ns")
+        bump_version("ns")
+        assert get_version("ns") == version + 1
+
+    def test_version_survives_eviction(self):
+        """Should restart from a clock-seeded version, never from 1."""
+        bump_version("ns")
+        assert get_version("ns") > 1
+
+
+class TestLocalCache:
+    """Tests for the per-process LRU."""
+
+    def test_evicts_least_recently_used(self):
+        """Should keep at most maxsize entries, dropping the oldest."""
+        local = LocalCache(maxsize=2)
+        local.set("a", 1, 60)
+        local.set("b", 2, 60)
+        local.get("a")
+        local.set("c", 3, 60)
+        assert local.get("b") == (False, None)
+        assert local.get("a") == (True, 1)
+        assert len(local) == 2
+
+    def test_entries_expire(self):
+        """Should drop entries past their TTL."""
+        local = LocalCache(maxsize=2)
+        local.set("a", 1, 0)
+        assert local.get("a") == (False, None)
+        assert len(local) == 0
+
+
+class TestTwoTier:
+    """Tests for get_two_tier and invalidate."""
+
+    def test_local_hit_skips_shared_cache(self):
+        """Should serve repeated reads from the process without Redis."""
+        get_two_tier("ns", "k", lambda: "value", 60)
+        with patch("saltadev.cache.cache") as shared:
+            assert get_two_tier("ns", "k", lambda: "other", 60) == "value"
+        assert not shared.method_calls
+
+    def test_local_miss_reads_shared_tier(self):
+        """Should fall back to the shared value another process built."""
+        get_two_tier("ns", "k", lambda: "shared", 60)
+        local_cache.clear()
+        assert get_two_tier("ns", "k", lambda: "rebuilt", 60) == "shared"
+
+    def test_invalidate_drops_both_tiers(self):
+        """Should rebuild after the namespace is invalidated."""
+        get_two_tier("ns", "k", lambda: "old", 60)
+        get_two_tier("other", "k", lambda: "kept", 60)
+        invalidate("ns")
+        assert get_two_tier("ns", "k", lambda: "new", 60) == "new"
+        assert local_cache.get("other:k") == (True, "kept")
+
+
+class TestInvalidationBus:
+    """Tests for cross-process invalidation over pub/sub."""
+
+    def test_invalidate_publishes_namespace(self):
+        """Should announce the namespace on the shared channel."""
+        client = MagicMock()
+        with patch("saltadev.cache.redis_client", return_value=client):
+            invalidate("ns")
+        client.publish.assert_called_once_with(
+            cache.make_and_validate_key(INVALIDATION_CHANNEL), "ns"
+        )
+
+    def test_apply_runs_registered_handlers(self):
+        """Should drop local entries and run in-process handlers."""
+        handler = MagicMock()
+        local_cache.set("ns:k", 1, 60)
+        with patch.dict("saltadev.cache._handlers", {}, clear=False):
+            on_invalidate("ns", handler)
+            apply_invalidation("ns")
+        handler.assert_called_once()
+        assert local_cache.get("ns:k") == (False, None)
+
+    def test_listener_applies_messages(self):
+        """Should apply every message received on the channel."""
+        client = MagicMock()
+        client.pubsub.return_value.listen.return_value = iter(
+            [{"data": b"ns"}, {"data": b"other"}]
+        )
+        with (
+            patch(
+                "saltadev.cache.apply_invalidation", side_effect=[None, StopIteration]
+            ) as apply,
+            pytest.raises(StopIteration),
+        ):
+            _listen(client)
+        assert [call.args[0] for call in apply.call_args_list] == ["ns", "other"]
+        client.pubsub.return_value.subscribe.assert_called_once()
+
+    def test_listener_closes_dead_subscription(self):
+        """Should close a failed subscription before subscribing again."""
+        client = MagicMock()
+        first, second = MagicMock(), MagicMock()
+        client.pubsub.side_effect = [first, second]
+        first.listen.side_effect = redis.ConnectionError("gone")
+        second.listen.side_effect = StopIteration
+        with (
+            patch("saltadev.cache.time.sleep") as sleep,
+            pytest.raises(StopIteration),
+        ):
+            _listen(client)
+        first.close.assert_called_once()
+        sleep.assert_called_once_with(1)
+        second.close.assert_called_once()
+
+    def test_listener_restarts_after_fork(self):
+        """Should start a fresh listener in a forked child."""
+        with (
+            patch("saltadev.cache._listener", MagicMock()),
+            patch("saltadev.cache.start_invalidation_listener") as start,
+        ):
+            _restart_listener_after_fork()
+        start.assert_called_once_with()
+
+    def test_listener_needs_redis(self):
+        """Should not start without a Redis cache."""
+        assert start_invalidation_listener() is None
+
+
+@pytest.mark.django_db
+class TestCachedViews:
+    """Tests for the views built on get_or_build."""
+
+    def test_health_check_runs_checks_once(self):
+        """Should reuse the cached health result."""
+        client = Client()
+        result = {"data": {"status": "healthy"}, "status_code": 200}
+        with patch("saltadev.views._run_checks", return_value=result) as run_checks:
+            client.get(reverse("health_check"))
+            response = client.get(reverse("health_check"))
+        run_checks.assert_called_once()
+        assert response.json() == {"status": "healthy"}
+
+    def test_events_list_refreshes_on_change(
+        self, event, django_capture_on_commit_callbacks
+    ):
+        """Should cache the events list until an event changes."""
+        client = Client()
+        client.get(reverse("events"))
+        with django_capture_on_commit_callbacks(execute=True):
+            event.title = "Titulo nuevo"
+            event.save()
+        assert "Titulo nuevo" in client.get(reverse("events")).content.decode()
+
+    def test_provinces_refresh_on_change(self, django_capture_on_commit_callbacks):
+        """Should cache provinces per country until a province changes."""
+        client = Client()
+        url = reverse("provinces_by_country", args=["ar"])
+        assert client.get(url).json()[0]["name"] == "Salta"
+        province = Province.objects.get(pk=1)
+        with django_capture_on_commit_callbacks(execute=True):
+            province.name = "Salta la Linda"
+            province.save()
+        assert client.get(url).json()[0]["name"] == "Salta la Linda"
+
+    def test_staff_rename_refreshes_home(
+        self, staff_profile, django_capture_on_commit_callbacks
+    ):
+        """Should invalidate the homepage when a staff member is renamed."""
+        client = Client()
+        client.get(reverse("home"))
+        user = staff_profile.user
+        with django_capture_on_commit_callbacks(execute=True):
+            user.first_name = "Renombrada"
+            user.save(update_fields=["first_name"])
+        assert "Renombrada" in client.get(reverse("home")).content.decode()
@@ -1,8 +1,13 @@
 """Tests for the home view."""
 
+from unittest.mock import patch
+
 import pytest
+from django.core.cache import cache
 from django.test import Client
 from django.urls import reverse
+from home.cache import HOME_CACHE_NAMESPACE, get_home_lists
+from saltadev.cache import get_version, local_cache
 
 
 @pytest.mark.django_db
@@ -55,3 +60,42 @@ class TestHomeViewQueryOptimization:
         # This test ensures we don't have N+1 problems
         with django_assert_max_num_queries(5):
             client.get(reverse("home"))
+
+
+@pytest.mark.django_db
+class TestHomeCache:
+    """Tests for the versioned homepage cache."""
+
+    def test_cached_lists_skip_database(self, django_assert_num_queries, collaborator):
+        """Should serve a warm cache without touching the database."""
+        get_home_lists()
+        with django_assert_num_queries(0):
+            lists = get_home_lists()
+        assert lists["collaborators"] == [collaborator]
+
+    def test_lists_read_with_one_get_many(self, collaborator):
+        """Should fetch all three lists in a single cache call."""
+        get_home_lists()
+        local_cache.clear()
+        with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            get_home_lists()
+        get_many.assert_called_once()
+
+    def test_save_bumps_version(self, collaborator, django_capture_on_commit_callbacks):
+        """Should show an edit right away, without waiting for the TTL."""
+        get_home_lists()
+        version = get_version(HOME_CACHE_NAMESPACE)
+        with django_capture_on_commit_callbacks(execute=True):
+            collaborator.name = "Renombrado"
+            collaborator.save()
+        assert get_version(HOME_CACHE_NAMESPACE) == version + 1
+        assert get_home_lists()["collaborators"][0].name == "Renombrado"
+
+    def test_delete_bumps_version(
+        self, staff_profile, django_capture_on_commit_callbacks
+    ):
+        """Should drop deleted staff members from the cached lists."""
+        assert get_home_lists()["staff_members"] == [staff_profile]
+        with django_capture_on_commit_callbacks(execute=True):
+            staff_profile.delete()
+        assert get_home_lists()["staff_members"] == []
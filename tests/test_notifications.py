@@ -1,7 +1,48 @@
 """Tests for user notifications."""
 
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
+from asgiref.sync import async_to_sync
+from content.models import Event
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.db import connection, transaction
 from django.urls import reverse
+from django.utils import timezone
+from locations.models import Province
+from notifications.models import Notification
+from user_notifications.audience import resolve_audience
+from user_notifications.context_processors import unread_notifications_count
+from user_notifications.counters import get_badge_state, get_unread_count
+from user_notifications.digest import build_digest_context
+from user_notifications.fanout import fan_out, stream_recipient_ids
+from user_notifications.inbox import INBOX_PAGE_SIZE, InboxCursor, get_inbox_page
+from user_notifications.live import BROADCAST_CHANNEL, _publish, user_channel
+from user_notifications.models import (
+    ArchivedNotification,
+    Broadcast,
+    BroadcastReadMark,
+    DigestDelivery,
+    NotificationPreference,
+)
+from user_notifications.retention import (
+    HIGH_WATER_MARK_KEY,
+    purge_read_notifications,
+)
+from user_notifications.tasks import (
+    purge_read_notifications_task,
+    send_digest_chunk_task,
+    send_weekly_digest_task,
+)
+from user_notifications.utils import publish_broadcast
+from user_notifications.views import _badge_event, _badge_events
+from users.models import Profile, User
 
 
 @pytest.mark.django_db
@@ -110,3 +151,892 @@ class TestNotificationModel:
         assert notification.unread is True
         notification.mark_as_read()
         assert notification.unread is False
+
+
+@pytest.mark.django_db
+class TestFanOut:
+    """Tests for the bulk notification fan-out engine."""
+
+    def test_writes_one_row_per_recipient(
+        self, collaborator_user, member_user, admin_user
+    ):
+        """Test fan_out creates a notification for each recipient id."""
+        written = fan_out(
+            [member_user.pk, admin_user.pk],
+            actor=collaborator_user,
+            verb="Nuevo evento",
+            description="Meetup",
+            data={"url": "/eventos/"},
+        )
+        assert written == 2
+        notification = Notification.objects.get(recipient=member_user)
+        assert notification.actor == collaborator_user
+        assert notification.data == {"url": "/eventos/"}
+        assert notification.unread is True
+
+    def test_writes_in_chunks(
+        self, collaborator_user, member_user, admin_user, moderator_user
+    ):
+        """Test fan_out issues one INSERT per chunk."""
+        ids = [member_user.pk, admin_user.pk, moderator_user.pk]
+        with patch.object(
+            Notification.objects, "bulk_create", wraps=Notification.objects.bulk_create
+        ) as mock_bulk:
+            written = fan_out(ids, actor=collaborator_user, verb="Test", chunk_size=2)
+        assert written == 3
+        assert mock_bulk.call_count == 2
+
+    def test_empty_recipients_writes_nothing(self, collaborator_user):
+        """Test fan_out with no recipients returns zero."""
+        assert fan_out(iter([]), actor=collaborator_user, verb="Test") == 0
+        assert Notification.objects.count() == 0
+
+    @pytest.fixture
+    def pending_events(self, collaborator_user):
+        """Create three pending events (no announcement signals fire)."""
+        return [
+            Event.objects.create(
+                title=f"Evento {i}",
+                slug=f"burst-{i}",
+                creator=collaborator_user,
+                status=Event.Status.PENDING,
+            )
+            for i in range(3)
+        ]
+
+    def _announce(self, event, recipients, **kwargs):
+        return fan_out(
+            recipients,
+            actor=event,
+            verb="Nuevo evento",
+            action_object=event,
+            description=event.title,
+            data={"url": f"/eventos/{event.slug}/"},
+            **kwargs,
+        )
+
+    def test_bursts_coalesce_into_digest(self, pending_events, member_user):
+        """Test same-verb notifications in the window merge into one row."""
+        for event in pending_events:
+            self._announce(event, [member_user.pk])
+
+        notification = Notification.objects.get(recipient=member_user)
+        assert notification.description == "3 nuevos eventos"
+        assert notification.data["count"] == 3
+        assert [item["description"] for item in notification.data["digest"]] == [
+            "Evento 0",
+            "Evento 1",
+            "Evento 2",
+        ]
+        assert notification.data["url"] == "/eventos/burst-2/"
+        # The digest keeps its first object and position in the inbox
+        assert notification.action_object_object_id == str(pending_events[0].pk)
+
+    def test_digest_does_not_bump_counter(self, pending_events, member_user):
+        """Test merged notifications leave the unread count at one."""
+        self._announce(pending_events[0], [member_user.pk])
+        assert get_unread_count(member_user) == 1
+        self._announce(pending_events[1], [member_user.pk])
+        assert get_unread_count(member_user) == 1
+
+    def test_merge_is_idempotent(self, pending_events, member_user):
+        """Test re-announcing the same object does not grow the digest."""
+        self._announce(pending_events[0], [member_user.pk])
+        self._announce(pending_events[1], [member_user.pk])
+        self._announce(pending_events[1], [member_user.pk])
+        assert Notification.objects.get(recipient=member_user).data["count"] == 2
+
+    def test_read_or_old_rows_are_not_merged(
+        self, pending_events, member_user, admin_user
+    ):
+        """Test only recent unread rows absorb new notifications."""
+        self._announce(pending_events[0], [member_user.pk, admin_user.pk])
+        Notification.objects.filter(recipient=member_user).update(unread=False)
+        Notification.objects.filter(recipient=admin_user).update(
+            timestamp=timezone.now() - timedelta(hours=1)
+        )
+        self._announce(pending_events[1], [member_user.pk, admin_user.pk])
+        assert Notification.objects.count() == 4
+
+    def test_coalescing_can_be_disabled(self, pending_events, member_user):
+        """Test a zero window writes one row per notification."""
+        for event in pending_events:
+            self._announce(event, [member_user.pk], coalesce_minutes=0)
+        assert Notification.objects.filter(recipient=member_user).count() == 3
+
+    def test_merge_costs_constant_queries(
+        self,
+        pending_events,
+        member_user,
+        admin_user,
+        moderator_user,
+        django_assert_num_queries,
+    ):
+        """Test merging a chunk is one SELECT plus one UPDATE, not per row."""
+        ids = [member_user.pk, admin_user.pk, moderator_user.pk]
+        self._announce(pending_events[0], ids)
+        with django_assert_num_queries(2):
+            assert self._announce(pending_events[1], ids) == 3
+
+    def test_stream_recipient_ids(self, member_user, admin_user):
+        """Test recipient ids are streamed in primary key order."""
+        ids = list(
+            stream_recipient_ids(
+                User.objects.filter(pk__in=[admin_user.pk, member_user.pk])
+            )
+        )
+        assert ids == sorted([member_user.pk, admin_user.pk])
+
+
+@pytest.mark.django_db
+class TestEventApprovedNotifications:
+    """Tests for the event approval broadcast signal."""
+
+    def test_approved_event_publishes_single_broadcast(
+        self, collaborator_user, member_user, admin_user
+    ):
+        """Test approving an event writes one broadcast and no per-member rows."""
+        Event.objects.create(
+            title="Meetup",
+            slug="meetup-broadcast",
+            creator=collaborator_user,
+            status=Event.Status.APPROVED,
+        )
+        assert Broadcast.objects.filter(verb="Nuevo evento").count() == 1
+        assert not Notification.objects.filter(verb="Nuevo evento").exists()
+
+    def test_broadcast_visible_to_members_except_creator(
+        self, collaborator_user, member_user, unverified_user
+    ):
+        """Test the broadcast audience matches verified members minus the creator."""
+        Event.objects.create(
+            title="Meetup",
+            slug="meetup-audience",
+            creator=collaborator_user,
+            status=Event.Status.APPROVED,
+        )
+        assert Broadcast.objects.visible_to(member_user).count() == 1
+        assert Broadcast.objects.visible_to(collaborator_user).count() == 0
+        assert Broadcast.objects.visible_to(unverified_user).count() == 0
+
+    def test_pending_event_does_not_notify(self, collaborator_user, member_user):
+        """Test pending events do not notify anyone."""
+        Event.objects.create(
+            title="Pending",
+            slug="pending-broadcast",
+            creator=collaborator_user,
+            status=Event.Status.PENDING,
+        )
+        assert not Broadcast.objects.exists()
+
+
+@pytest.mark.django_db
+class TestAudienceTargeting:
+    """Tests for targeted event announcements and preferences."""
+
+    @pytest.fixture
+    def jujuy_member(self, argentina):
+        """Create a verified backend developer from another province."""
+        jujuy = Province.objects.create(country=argentina, code="AR-Y", name="Jujuy")
+        user = User.objects.create_user(
+            email="jujuy@example.com",
+            first_name="Jujuy",
+            last_name="User",
+            password="SecurePass123$",
+            province=jujuy,
+            email_confirmed=True,
+        )
+        Profile.objects.create(user=user, technical_role="backend")
+        return user
+
+    def _approve(self, creator, slug, **audience):
+        return Event.objects.create(
+            title="Meetup",
+            slug=slug,
+            creator=creator,
+            status=Event.Status.APPROVED,
+            **audience,
+        )
+
+    def test_province_targets_members_of_that_province(
+        self, collaborator_user, member_user, jujuy_member
+    ):
+        """Test province-targeted events notify only local members."""
+        self._approve(collaborator_user, "salta-only", audience_province_id=1)
+        recipients = set(
+            Notification.objects.filter(verb="Nuevo evento").values_list(
+                "recipient_id", flat=True
+            )
+        )
+        assert recipients == {member_user.pk}
+        assert not Broadcast.objects.exists()
+
+    def test_technical_role_filter(self, collaborator_user, member_user, jujuy_member):
+        """Test role-targeted events notify members with that role."""
+        self._approve(collaborator_user, "backend", audience_technical_role="backend")
+        assert list(Notification.objects.values_list("recipient_id", flat=True)) == [
+            jujuy_member.pk
+        ]
+
+    def test_opted_in_only_requires_explicit_preference(
+        self, collaborator_user, member_user, jujuy_member
+    ):
+        """Test opt-in announcements skip members without a saved preference."""
+        NotificationPreference.objects.create(user=jujuy_member, events=True)
+        self._approve(collaborator_user, "opt-in", audience_opted_in_only=True)
+        assert list(Notification.objects.values_list("recipient_id", flat=True)) == [
+            jujuy_member.pk
+        ]
+
+    def test_muted_members_are_skipped(
+        self, collaborator_user, member_user, jujuy_member
+    ):
+        """Test members who muted events get neither targeted rows nor broadcasts."""
+        NotificationPreference.objects.create(user=member_user, events=False)
+        self._approve(collaborator_user, "targeted", audience_province_id=1)
+        self._approve(collaborator_user, "everyone")
+        assert not Notification.objects.filter(recipient=member_user).exists()
+        assert not Broadcast.objects.visible_to(member_user).exists()
+        assert Broadcast.objects.visible_to(jujuy_member).count() == 1
+
+    def test_targeted_announcement_is_idempotent(self, collaborator_user, member_user):
+        """Test re-saving an approved targeted event does not notify twice."""
+        event = self._approve(collaborator_user, "twice", audience_province_id=1)
+        event.status = Event.Status.PENDING
+        event.save()
+        event.status = Event.Status.APPROVED
+        event.save()
+        assert Notification.objects.filter(recipient=member_user).count() == 1
+
+    def test_merged_announcement_is_not_resent(self, collaborator_user, member_user):
+        """Test objects folded into a digest are still known as announced."""
+        first = self._approve(collaborator_user, "first", audience_province_id=1)
+        self._approve(collaborator_user, "second", audience_province_id=1)
+        Notification.objects.update(unread=False)
+        first.status = Event.Status.PENDING
+        first.save()
+        first.status = Event.Status.APPROVED
+        first.save()
+        assert Notification.objects.filter(recipient=member_user).count() == 1
+
+    def test_audience_is_one_query(
+        self, collaborator_user, member_user, jujuy_member, django_assert_num_queries
+    ):
+        """Test every filter resolves in a single query."""
+        event = Event(
+            creator=collaborator_user,
+            audience_province_id=1,
+            audience_technical_role="backend",
+            audience_opted_in_only=True,
+        )
+        with django_assert_num_queries(1):
+            assert list(resolve_audience(event)) == []
+
+    def test_update_preferences_view(self, client, member_user):
+        """Test members can mute benefit announcements."""
+        client.force_login(member_user)
+        response = client.post(
+            reverse("user_notifications:update_preferences"), {"events": "on"}
+        )
+        assert response.status_code == 302
+        preference = NotificationPreference.objects.get(user=member_user)
+        assert preference.events is True
+        assert preference.benefits is False
+
+
+@pytest.mark.django_db
+class TestBroadcasts:
+    """Tests for broadcast read watermarks and inbox merging."""
+
+    def test_publish_is_idempotent(self, event):
+        """Test publishing the same announcement twice writes one row."""
+        publish_broadcast(verb="Nuevo evento", action_object=event)
+        publish_broadcast(verb="Nuevo evento", action_object=event)
+        assert Broadcast.objects.filter(verb="Nuevo evento").count() == 1
+
+    def test_broadcast_counts_as_unread(self, member_user, event):
+        """Test a new broadcast increases the unread count."""
+        assert get_unread_count(member_user) == 1
+
+    def test_broadcasts_before_registration_are_hidden(self, event):
+        """Test members do not inherit announcements from before they joined."""
+        newcomer = User.objects.create_user(
+            email="newcomer@example.com",
+            password="SecurePass123$",
+            email_confirmed=True,
+        )
+        assert get_unread_count(newcomer) == 0
+
+    def test_mark_broadcast_as_read(self, client, member_user, event):
+        """Test marking a broadcast as read advances the watermark."""
+        broadcast = Broadcast.objects.get()
+        client.force_login(member_user)
+        response = client.post(
+            reverse(
+                "user_notifications:mark_broadcast_as_read",
+                kwargs={"broadcast_id": broadcast.pk},
+            )
+        )
+        assert response.status_code == 302
+        assert BroadcastReadMark.last_read_id_for(member_user) == broadcast.pk
+        assert get_unread_count(member_user) == 0
+
+    def test_watermark_never_moves_back(self, member_user):
+        """Test the read watermark only advances."""
+        BroadcastReadMark.mark_read(member_user, 10)
+        BroadcastReadMark.mark_read(member_user, 5)
+        assert BroadcastReadMark.last_read_id_for(member_user) == 10
+
+    def test_mark_all_as_read_includes_broadcasts(self, client, member_user, event):
+        """Test mark all as read also clears broadcasts."""
+        client.force_login(member_user)
+        client.post(reverse("user_notifications:mark_all_as_read"))
+        assert get_unread_count(member_user) == 0
+
+    def test_list_merges_broadcasts_and_personal(
+        self, client, verified_user, notification, event
+    ):
+        """Test the inbox shows personal notifications and broadcasts together."""
+        client.force_login(verified_user)
+        response = client.get(reverse("user_notifications:list"))
+        content = response.content.decode()
+        assert notification.verb in content
+        assert "Nuevo evento" in content
+        assert response.context["unread_count"] == 2
+
+    def test_list_marks_broadcasts_read_with_post(self, client, member_user, event):
+        """Test the per-broadcast read action is a POST form, not a link."""
+        broadcast = Broadcast.objects.get()
+        url = reverse(
+            "user_notifications:mark_broadcast_as_read",
+            kwargs={"broadcast_id": broadcast.pk},
+        )
+        client.force_login(member_user)
+        content = client.get(reverse("user_notifications:list")).content.decode()
+        assert f'<form method="post" action="{url}">' in content
+        assert f'href="{url}"' not in content
+
+
+@pytest.mark.django_db
+class TestUnreadCounter:
+    """Tests for the cached unread notification counter."""
+
+    def test_second_read_hits_cache(
+        self, verified_user, unread_notifications, django_assert_num_queries
+    ):
+        """Test the count is served from cache after the first read."""
+        assert get_unread_count(verified_user) == 5
+        with django_assert_num_queries(0):
+            assert get_unread_count(verified_user) == 5
+
+    def test_new_notification_increments_cached_count(
+        self, verified_user, collaborator_user, unread_notifications
+    ):
+        """Test creating a notification bumps the cached count."""
+        assert get_unread_count(verified_user) == 5
+        Notification.objects.create(
+            recipient=verified_user, actor=collaborator_user, verb="new"
+        )
+        assert get_unread_count(verified_user) == 6
+
+    def test_mark_as_read_refreshes_count(self, verified_user, unread_notifications):
+        """Test marking a notification as read updates the cached count."""
+        assert get_unread_count(verified_user) == 5
+        unread_notifications[0].mark_as_read()
+        assert get_unread_count(verified_user) == 4
+
+    def test_mark_all_as_read_refreshes_count(
+        self, client, verified_user, unread_notifications
+    ):
+        """Test mark all as read (a bulk UPDATE) resets the cached count."""
+        assert get_unread_count(verified_user) == 5
+        client.force_login(verified_user)
+        client.post(reverse("user_notifications:mark_all_as_read"))
+        assert get_unread_count(verified_user) == 0
+
+    def test_library_bulk_routes_not_mounted(self, client, verified_user):
+        """Test django-notifications' signal-less mark-all URLs are unreachable."""
+        client.force_login(verified_user)
+        response = client.get("/inbox/notifications/mark-all-as-read/")
+        assert response.status_code == 404
+
+    def test_refill_keeps_newer_value(self, verified_user, unread_notifications):
+        """Test a refill never overwrites a count stored in the meantime."""
+        cache.set(f"notif:unread:{verified_user.pk}", 7)
+        with patch("user_notifications.counters.cache.get_many", return_value={}):
+            get_unread_count(verified_user)
+        assert cache.get(f"notif:unread:{verified_user.pk}") == 7
+
+    def test_new_broadcast_refreshes_count(self, member_user, event, collaborator_user):
+        """Test a new broadcast is reflected without touching per-user keys."""
+        assert get_unread_count(member_user) == 1
+        second = Event.objects.create(
+            title="Second", slug="second-counter", status=Event.Status.APPROVED
+        )
+        assert second.pk
+        assert get_unread_count(member_user) == 2
+
+    def test_fan_out_refreshes_count(self, member_user, collaborator_user):
+        """Test bulk fan-out invalidates the recipients' cached counts."""
+        assert get_unread_count(member_user) == 0
+        fan_out([member_user.pk], actor=collaborator_user, verb="Test")
+        assert get_unread_count(member_user) == 1
+
+    def test_context_processor_is_lazy(
+        self, rf, verified_user, unread_notifications, django_assert_num_queries
+    ):
+        """Test the context processor does no work until the value is used."""
+        request = rf.get("/")
+        request.user = verified_user
+        with django_assert_num_queries(0):
+            context = unread_notifications_count(request)
+        assert context["unread_notifications_count"] > 0
+
+    def test_context_processor_anonymous(self, rf):
+        """Test anonymous users get a zero count."""
+        from django.contrib.auth.models import AnonymousUser
+
+        request = rf.get("/")
+        request.user = AnonymousUser()
+        assert unread_notifications_count(request) == {
+            "unread_notifications_count": 0,
+            "live_notifications": False,
+        }
+
+
+@pytest.mark.django_db
+class TestInboxPagination:
+    """Tests for the keyset-paginated inbox."""
+
+    @pytest.fixture
+    def many_notifications(self, verified_user, collaborator_user):
+        """Create more notifications than fit in one page."""
+        return [
+            Notification.objects.create(
+                recipient=verified_user,
+                actor=collaborator_user,
+                verb=f"notification {i}",
+            )
+            for i in range(INBOX_PAGE_SIZE + 5)
+        ]
+
+    def test_pages_cover_every_item_once(
+        self, verified_user, many_notifications, event
+    ):
+        """Test walking the cursor returns every item exactly once, newest first."""
+        seen = []
+        cursor = None
+        while True:
+            page = get_inbox_page(verified_user, cursor)
+            seen.extend((item.inbox_kind, item.pk) for item in page.items)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+        assert len(seen) == len(many_notifications) + 1
+        assert len(set(seen)) == len(seen)
+
+    def test_first_page_has_next_cursor(self, verified_user, many_notifications):
+        """Test a full first page exposes a cursor for the next one."""
+        page = get_inbox_page(verified_user)
+        assert len(page.items) == INBOX_PAGE_SIZE
+        assert page.next_cursor is not None
+
+    def test_page_costs_one_query_per_stream(
+        self, verified_user, many_notifications, django_assert_num_queries
+    ):
+        """Test no unused generic relation is prefetched."""
+        get_inbox_page(verified_user)  # warm the content type cache
+        # Personal rows, the broadcast read watermark and broadcast rows
+        with django_assert_num_queries(3):
+            page = get_inbox_page(verified_user)
+        assert len(page.items) == INBOX_PAGE_SIZE
+
+    @pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite plan format")
+    def test_personal_stream_uses_keyset_index(self, verified_user):
+        """Test the personal stream reads in index order without a sort."""
+        queryset = Notification.objects.filter(recipient=verified_user).order_by(
+            "-timestamp", "-pk"
+        )
+        plan = queryset.explain()
+        assert "notif_recipient_ts_id_idx" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_cursor_round_trip(self, notification):
+        """Test cursors survive encoding and decoding."""
+        cursor = InboxCursor(notification.timestamp, 1, notification.pk)
+        assert InboxCursor.decode(cursor.encode()) == cursor
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "",
+            "garbage",
+            "1.2",
+            "1.5.3",
+            "99999999999999999999.1.1",
+            "-" + "9" * 20 + ".1.1",
+            None,
+        ],
+    )
+    def test_invalid_cursor_starts_from_top(self, value):
+        """Test malformed cursors are ignored."""
+        assert InboxCursor.decode(value) is None
+
+    def test_list_view_paginates(self, client, verified_user, many_notifications):
+        """Test the list view follows the cursor query parameter."""
+        client.force_login(verified_user)
+        first = client.get(reverse("user_notifications:list"))
+        cursor = first.context["next_cursor"]
+        second = client.get(reverse("user_notifications:list"), {"cursor": cursor})
+        assert len(second.context["notifications"]) == 5
+        assert second.context["next_cursor"] is None
+
+    def test_list_view_ignores_out_of_range_cursor(self, client, verified_user):
+        """Test a cursor beyond the datetime range shows the first page."""
+        client.force_login(verified_user)
+        response = client.get(
+            reverse("user_notifications:list"), {"cursor": "99999999999999999999.1.1"}
+        )
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestNotificationRetention:
+    """Tests for the batched retention job."""
+
+    @pytest.fixture
+    def aged_notifications(self, verified_user):
+        """Create old read, old unread and recent read notifications."""
+        fan_out([verified_user.pk] * 7, actor=verified_user, verb="Viejo")
+        old = timezone.now() - timedelta(days=365)
+        Notification.objects.update(timestamp=old, unread=False)
+        Notification.objects.filter(
+            pk=Notification.objects.order_by("pk").values("pk")[:1]
+        ).update(unread=True)
+        fan_out([verified_user.pk] * 2, actor=verified_user, verb="Nuevo")
+        Notification.objects.filter(verb="Nuevo").update(unread=False)
+        return Notification.objects.all()
+
+    def test_deletes_only_old_read_rows(self, aged_notifications):
+        """Test unread and recent notifications are kept."""
+        result = purge_read_notifications(
+            older_than_days=30, batch_size=4, sleep_seconds=0
+        )
+        assert result.processed == 6
+        assert result.batches == 2
+        assert Notification.objects.count() == 3
+        assert cache.get(HIGH_WATER_MARK_KEY) is None
+
+    def test_read_rows_skip_count_invalidation(self, aged_notifications):
+        """Test purging read rows sends no counter invalidations."""
+        with patch("user_notifications.signals.invalidate_unread_counts") as invalidate:
+            purge_read_notifications(older_than_days=30, batch_size=4, sleep_seconds=0)
+        invalidate.assert_not_called()
+
+    def test_keeps_rows_marked_unread_during_run(self, aged_notifications):
+        """Test a row marked unread after the id scan is not deleted."""
+        target = Notification.objects.filter(verb="Viejo", unread=False).first()
+        atomic = transaction.atomic
+        pending = [target.pk]
+
+        def mark_unread_then_atomic(*args, **kwargs):
+            # Runs between the id scan and the batch's locked re-check
+            while pending:
+                Notification.objects.filter(pk=pending.pop()).update(unread=True)
+            return atomic(*args, **kwargs)
+
+        with patch(
+            "user_notifications.retention.transaction.atomic",
+            side_effect=mark_unread_then_atomic,
+        ):
+            result = purge_read_notifications(
+                older_than_days=30, batch_size=10, sleep_seconds=0
+            )
+        assert result.processed == 5
+        assert Notification.objects.filter(pk=target.pk).exists()
+
+    def test_dry_run_changes_nothing(self, aged_notifications):
+        """Test dry runs only count eligible rows."""
+        result = purge_read_notifications(
+            older_than_days=30, batch_size=4, dry_run=True
+        )
+        assert (result.processed, result.batches) == (6, 2)
+        assert Notification.objects.count() == 9
+
+    def test_resumes_from_high_water_mark(self, aged_notifications):
+        """Test an interrupted run continues after the last processed id."""
+        purge_read_notifications(
+            older_than_days=30, batch_size=4, sleep_seconds=0, max_batches=1
+        )
+        assert cache.get(HIGH_WATER_MARK_KEY) is not None
+        assert Notification.objects.count() == 5
+
+        result = purge_read_notifications(
+            older_than_days=30, batch_size=4, sleep_seconds=0
+        )
+        assert result.processed == 2
+        assert cache.get(HIGH_WATER_MARK_KEY) is None
+
+    def test_archive_copies_rows(self, aged_notifications):
+        """Test archived rows keep their original ids and payload."""
+        purge_read_notifications(older_than_days=30, sleep_seconds=0, archive=True)
+        assert ArchivedNotification.objects.count() == 6
+        assert set(ArchivedNotification.objects.values_list("verb", flat=True)) == {
+            "Viejo"
+        }
+
+    def test_command_output(self, aged_notifications):
+        """Test the management command reports a dry run."""
+        out = StringIO()
+        call_command("purge_notifications", "--days=30", "--dry-run", stdout=out)
+        assert "6 notifications would be processed" in out.getvalue()
+        assert Notification.objects.count() == 9
+
+    def test_task_uses_settings(self, aged_notifications, settings):
+        """Test the periodic task applies the configured retention."""
+        settings.NOTIFICATION_RETENTION_DAYS = 30
+        settings.NOTIFICATION_RETENTION_SLEEP_SECONDS = 0
+        assert purge_read_notifications_task.delay().get() == 6
+
+
+@pytest.mark.django_db
+class TestLiveBadges:
+    """Tests for live badge publishing and the SSE endpoint."""
+
+    @pytest.fixture
+    def live_enabled(self, settings):
+        """Enable live updates and capture published channels."""
+        settings.NOTIFICATIONS_LIVE_REDIS_URL = "redis://localhost:6379/0"
+        with patch("user_notifications.live._publish") as publish:
+            yield publish
+
+    def test_new_notification_publishes_after_commit(
+        self, live_enabled, notification, django_capture_on_commit_callbacks
+    ):
+        """Test creating a notification pings the recipient's channel."""
+        live_enabled.reset_mock()
+        with django_capture_on_commit_callbacks(execute=True):
+            Notification.objects.create(
+                recipient=notification.recipient,
+                actor=notification.recipient,
+                verb="Otro",
+            )
+        live_enabled.assert_called_once_with([user_channel(notification.recipient_id)])
+
+    def test_broadcast_publishes_on_shared_channel(
+        self, live_enabled, event, django_capture_on_commit_callbacks
+    ):
+        """Test new broadcasts are described to every open stream at once."""
+        with django_capture_on_commit_callbacks(execute=True):
+            broadcast = publish_broadcast(verb="Anuncio", action_object=event)
+        channels, message = live_enabled.call_args.args
+        assert channels == [BROADCAST_CHANNEL]
+        assert json.loads(message)["id"] == broadcast.pk
+        assert json.loads(message)["delta"] == 1
+
+    def test_broadcast_applied_without_queries(
+        self,
+        live_enabled,
+        member_user,
+        event,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        """Test streams update their count in memory for new broadcasts."""
+        state = get_badge_state(member_user)
+        assert state.unread == 1
+        with django_capture_on_commit_callbacks(execute=True):
+            broadcast = publish_broadcast(verb="Anuncio", action_object=event)
+        message = live_enabled.call_args.args[1]
+        with django_assert_num_queries(0):
+            assert state.apply_broadcast(message) is True
+            # Replayed or already counted broadcasts change nothing
+            assert state.apply_broadcast(message) is False
+        assert state.unread == 2 == get_unread_count(member_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            broadcast.delete()
+        assert state.apply_broadcast(live_enabled.call_args.args[1]) is True
+        assert state.unread == 1
+
+    def test_broadcast_ignored_by_muted_members(
+        self, live_enabled, member_user, event, django_capture_on_commit_callbacks
+    ):
+        """Test a stream skips broadcasts of kinds its member switched off."""
+        NotificationPreference.objects.create(user=member_user, events=False)
+        state = get_badge_state(member_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            publish_broadcast(verb="Anuncio", action_object=event)
+        assert state.apply_broadcast(live_enabled.call_args.args[1]) is False
+        assert state.unread == get_unread_count(member_user)
+
+    def test_disabled_without_redis_url(
+        self, settings, notification, django_capture_on_commit_callbacks
+    ):
+        """Test nothing is published when live updates are off."""
+        settings.NOTIFICATIONS_LIVE_REDIS_URL = None
+        with (
+            patch("user_notifications.live._publish") as publish,
+            django_capture_on_commit_callbacks(execute=True),
+        ):
+            notification.mark_as_read()
+        publish.assert_not_called()
+
+    def test_publish_survives_redis_outage(self, settings):
+        """Test an unreachable Redis never breaks the write path."""
+        settings.NOTIFICATIONS_LIVE_REDIS_URL = "redis://127.0.0.1:1/0"
+        _publish([BROADCAST_CHANNEL])
+
+    def test_stream_is_skipped_under_wsgi(self, client, verified_user, settings):
+        """Test WSGI requests get 204 so EventSource stops reconnecting."""
+        settings.NOTIFICATIONS_LIVE_REDIS_URL = "redis://localhost:6379/0"
+        client.force_login(verified_user)
+        response = client.get(reverse("user_notifications:stream"))
+        assert response.status_code == 204
+
+    def test_stream_applies_broadcasts_in_memory(self, member_user, event):
+        """Test a stream relays broadcasts and reloads only on its own channel."""
+        announced = {
+            "id": Broadcast.objects.get().pk + 1,
+            "delta": 1,
+            "kind": "content.event",
+            "creator": None,
+            "timestamp": timezone.now().isoformat(),
+        }
+        pubsub = AsyncMock()
+        pubsub.get_message.side_effect = [
+            {"channel": BROADCAST_CHANNEL.encode(), "data": json.dumps(announced)},
+            None,
+            {"channel": user_channel(member_user.pk).encode(), "data": b"1"},
+            None,
+        ]
+        client = MagicMock(aclose=AsyncMock())
+        client.pubsub.return_value = pubsub
+
+        async def first_frames(count):
+            stream = _badge_events(member_user, "redis://localhost:6379/0")
+            frames = [await anext(stream) for _ in range(count)]
+            await stream.aclose()
+            return frames
+
+        with (
+            patch("redis.asyncio.Redis.from_url", return_value=client),
+            patch(
+                "user_notifications.views.get_badge_state", wraps=get_badge_state
+            ) as load_state,
+        ):
+            frames = async_to_sync(first_frames)(4)
+        # The reload recounts from the database, which never saw the broadcast
+        assert frames[1:] == [_badge_event(1), _badge_event(2), _badge_event(1)]
+        assert load_state.call_count == 2
+
+    def test_badge_script_off_without_live_updates(
+        self, client, verified_user, settings
+    ):
+        """Test WSGI deployments never load the EventSource script."""
+        settings.NOTIFICATIONS_LIVE_REDIS_URL = None
+        client.force_login(verified_user)
+        content = client.get(reverse("user_notifications:list")).content.decode()
+        assert "notifications.js" not in content
+        assert "data-stream-url" not in content
+
+    def test_stream_requires_login(self, async_client, settings):
+        """Test anonymous ASGI requests never open a stream."""
+        settings.NOTIFICATIONS_LIVE_REDIS_URL = "redis://localhost:6379/0"
+        response = async_to_sync(async_client.get)(reverse("user_notifications:stream"))
+        assert response.status_code == 204
+
+
+@pytest.mark.django_db
+class TestWeeklyDigest:
+    """Tests for the weekly email digest."""
+
+    def test_nothing_new_sends_nothing(self, member_user):
+        """Test an empty week skips the digest entirely."""
+        assert send_weekly_digest_task.delay().get() == 0
+        assert mail.outbox == []
+
+    def test_context_lists_published_content(self, event, benefit, collaborator_user):
+        """Test only approved events and active benefits are included."""
+        Event.objects.create(
+            title="Pendiente",
+            slug="digest-pending",
+            creator=collaborator_user,
+            status=Event.Status.PENDING,
+        )
+        now = timezone.now()
+        context = build_digest_context(
+            now - timedelta(days=7), now + timedelta(minutes=1)
+        )
+        assert [item["title"] for item in context["events"]] == [event.title]
+        assert [item["title"] for item in context["benefits"]] == [benefit.title]
+        assert context["benefits"][0]["url"].endswith(f"/beneficios/{benefit.pk}/")
+
+    def test_sends_to_subscribed_members(
+        self, event, member_user, admin_user, unverified_user
+    ):
+        """Test each verified, subscribed member gets one rendered email."""
+        NotificationPreference.objects.create(user=admin_user, weekly_digest=False)
+        send_weekly_digest_task.delay()
+
+        assert [message.to for message in mail.outbox] == [[member_user.email]]
+        html, mimetype = mail.outbox[0].alternatives[0]
+        assert mimetype == "text/html"
+        assert event.title in html
+        assert member_user.first_name in mail.outbox[0].body
+
+    def test_one_connection_per_chunk(
+        self, event, member_user, admin_user, moderator_user, collaborator_user
+    ):
+        """Test every chunk reuses a single backend connection."""
+        with (
+            patch("user_notifications.tasks.DIGEST_CHUNK_SIZE", 2),
+            patch(
+                "user_notifications.digest.get_connection", wraps=get_connection
+            ) as connection,
+        ):
+            chunks = send_weekly_digest_task.delay().get()
+
+        assert chunks == 2
+        assert connection.call_count == 2
+        assert len(mail.outbox) == 4
+
+    def test_rerun_skips_members_already_sent(self, event, member_user, admin_user):
+        """Test running the digest twice in a week emails nobody twice."""
+        send_weekly_digest_task.delay()
+        send_weekly_digest_task.delay()
+        assert len(mail.outbox) == 2
+        assert DigestDelivery.objects.count() == 2
+
+    def test_retry_resends_only_failed_recipients(self, event, member_user, admin_user):
+        """Test a failed email is retried without resending the others."""
+        failing = admin_user.email
+        send_messages = mail.backends.locmem.EmailBackend.send_messages
+        attempts = []
+
+        def flaky(backend, messages):
+            attempts.append(messages[0].to[0])
+            if messages[0].to == [failing] and attempts.count(failing) == 1:
+                raise ConnectionError("SMTP dropped")
+            return send_messages(backend, messages)
+
+        now = timezone.now()
+        context = build_digest_context(now - timedelta(days=7), now)
+        with patch.object(mail.backends.locmem.EmailBackend, "send_messages", flaky):
+            # throw=False: let eager mode run the retry like a worker would
+            send_digest_chunk_task.apply(
+                args=[[member_user.pk, admin_user.pk], context, "2026-W01"],
+                throw=False,
+            )
+
+        assert sorted(attempts) == sorted([member_user.email, failing, failing])
+        assert sorted(message.to[0] for message in mail.outbox) == sorted(
+            [member_user.email, failing]
+        )
+
+    def test_command_sends_digest(self, event, member_user):
+        """Test the command runs the digest in-process for cron hosts."""
+        out = StringIO()
+        call_command("send_weekly_digest", stdout=out)
+        assert "1 chunks" in out.getvalue()
+        assert [message.to for message in mail.outbox] == [[member_user.email]]
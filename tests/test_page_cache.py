@@ -0,0 +1,137 @@
+"""Tests for saltadev/page_cache.py module."""
+
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from django.urls import reverse
+from saltadev.page_cache import _is_storable, _page_key, _page_url, _vary_key
+
+
+@pytest.mark.django_db
+class TestPageCacheMiddleware:
+    """Tests for PageCacheMiddleware."""
+
+    @pytest.mark.parametrize(
+        "url_name", ["home", "events", "code_of_conduct", "sitemap"]
+    )
+    def test_anonymous_hit_skips_view(self, url_name, django_assert_num_queries):
+        """Should serve the second anonymous GET without running the stack."""
+        client = Client()
+        first = client.get(reverse(url_name))
+        with django_assert_num_queries(0):
+            second = client.get(reverse(url_name))
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert second.context is None
+
+    def test_logged_in_users_bypass(self, client, verified_user):
+        """Should always render for members with a session."""
+        client.force_login(verified_user)
+        client.get(reverse("home"))
+        assert client.get(reverse("home")).context is not None
+
+    def test_messages_cookie_bypasses(self):
+        """Should render pages that may show flash messages."""
+        client = Client()
+        client.get(reverse("home"))
+        client.cookies["messages"] = "pending"
+        assert client.get(reverse("home")).context is not None
+
+    def test_unmarked_pages_not_cached(self):
+        """Should leave views without anonymous_page alone."""
+        client = Client()
+        client.get(reverse("login"))
+        assert client.get(reverse("login")).context is not None
+
+    def test_hosts_get_their_own_og_url(self, settings):
+        """Should render og:url for each host instead of reusing another's."""
+        settings.ALLOWED_HOSTS = ["salta.dev", ".onrender.com"]
+        client = Client()
+        client.get(reverse("home"), HTTP_HOST="a.onrender.com")
+        page = client.get(reverse("home"), HTTP_HOST="salta.dev").content.decode()
+        assert 'og:url" content="http://salta.dev/"' in page
+
+    def test_unknown_query_params_bypass(self):
+        """Should not cache pages requested with undeclared query parameters."""
+        client = Client()
+        client.get(reverse("home"), {"utm_source": "x"})
+        assert client.get(reverse("home"), {"utm_source": "x"}).context is not None
+        assert cache.get(_vary_key(RequestFactory().get("/"))) is None
+
+    def test_declared_params_are_keyed(self, django_assert_num_queries):
+        """Should cache each value of a declared parameter separately."""
+        client = Client()
+        first = client.get(reverse("sitemap"), {"p": "1"})
+        with django_assert_num_queries(0):
+            assert client.get(reverse("sitemap"), {"p": "1"}).content == first.content
+        assert client.get(reverse("sitemap"), {"p": "2"}).status_code == 404
+
+    def test_purged_when_content_changes(
+        self, collaborator, django_capture_on_commit_callbacks
+    ):
+        """Should drop the homepage once a collaborator is edited."""
+        client = Client()
+        client.get(reverse("home"))
+        with django_capture_on_commit_callbacks(execute=True):
+            collaborator.name = "Nuevo Colaborador"
+            collaborator.save()
+        assert "Nuevo Colaborador" in client.get(reverse("home")).content.decode()
+
+
+class TestCacheKeys:
+    """Tests for key building and storage rules."""
+
+    def test_key_respects_vary_headers(self):
+        """Should separate entries by the headers named in Vary."""
+        factory = RequestFactory()
+        spanish = factory.get("/", HTTP_ACCEPT_LANGUAGE="es")
+        english = factory.get("/", HTTP_ACCEPT_LANGUAGE="en")
+        with patch("saltadev.page_cache.get_versions", return_value=[1]):
+            assert _page_key(spanish, ("home",), ["Accept-Language"]) != _page_key(
+                english, ("home",), ["Accept-Language"]
+            )
+            assert _page_key(spanish, ("home",), ["Cookie"]) == _page_key(
+                english, ("home",), ["Cookie"]
+            )
+
+    def test_key_orders_declared_params(self):
+        """Should key on the declared parameters only, in a stable order."""
+        request = RequestFactory().get("/eventos/?b=2&a=1&utm=x")
+        assert _page_url(request, ("b", "a")) == "http://testserver/eventos/?a=1&b=2"
+        assert _page_url(request) == "http://testserver/eventos/"
+
+    def test_key_separates_hosts_and_schemes(self, settings):
+        """Should not serve one host's absolute URLs (og:url) on another."""
+        settings.ALLOWED_HOSTS = ["salta.dev", ".onrender.com"]
+        factory = RequestFactory()
+        salta = factory.get("/", HTTP_HOST="salta.dev")
+        render = factory.get("/", HTTP_HOST="a.onrender.com")
+        secure = factory.get("/", HTTP_HOST="salta.dev", secure=True)
+        with patch("saltadev.page_cache.get_versions", return_value=[1]):
+            keys = {_page_key(r, ("home",), []) for r in (salta, render, secure)}
+        assert len(keys) == 3
+
+    def test_key_changes_with_tag_version(self):
+        """Should move to a new key when a tag is invalidated."""
+        request = RequestFactory().get("/")
+        with patch("saltadev.page_cache.get_versions", side_effect=[[1], [2]]):
+            assert _page_key(request, ("home",), []) != _page_key(
+                request, ("home",), []
+            )
+
+    def test_csrf_pages_not_stored(self):
+        """Should never store a page that embeds a CSRF token."""
+        request = RequestFactory().get("/")
+        request.META["CSRF_COOKIE_NEEDS_UPDATE"] = True
+        assert not _is_storable(request, HttpResponse("form"))
+
+    def test_cookie_setting_responses_not_stored(self):
+        """Should never store a response that sets a cookie."""
+        request = RequestFactory().get("/")
+        response = HttpResponse("page")
+        response.set_cookie("sd_fp", "abc")
+        assert not _is_storable(request, response)
+        assert _is_storable(request, HttpResponse("page"))
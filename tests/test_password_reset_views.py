@@ -115,6 +115,19 @@ class TestPasswordResetConfirmView:
         assert response.status_code == 200
         assert "form" in response.context
 
+    def test_confirm_blocked_skips_token_lookup(
+        self, client, password_reset_token, block_rate_limit
+    ):
+        """Test blocked clients get the lockout page before any token query."""
+        _, raw_token = password_reset_token
+        block_rate_limit("password_reset_confirm", email=raw_token)
+        with patch("password_reset.views.get_password_reset_user") as lookup:
+            response = client.get(
+                reverse("password_reset_confirm") + f"?token={raw_token}"
+            )
+        assert response.status_code == 429
+        lookup.assert_not_called()
+
     def test_confirm_sets_new_password(self, client, password_reset_token):
         """Test confirming sets new password."""
         token_record, raw_token = password_reset_token
@@ -1,8 +1,12 @@
 """Tests for users/ratelimit.py module."""
 
+import time
+from unittest.mock import MagicMock, call, patch
+
 import pytest
 from django.core.cache import cache
 
+from django.core.exceptions import ImproperlyConfigured
 from users.ratelimit import (
     COOLDOWN_SECONDS,
     FINGERPRINT_COOKIE,
@@ -11,13 +15,27 @@ from users.ratelimit import (
     REGISTER_LIMIT,
     SCOPES,
     VERIFY_LIMIT,
+    CounterEngine,
+    DenyCache,
+    GCRAEngine,
+    _render_lockout,
     build_keys,
     clear_limits,
+    deny_cache,
+    find_blocks,
     get_client_ip,
+    get_engine,
     get_fingerprint,
+    get_rate_limit,
     increment,
     is_blocked,
+    list_blocks,
+    lockout_response,
+    prune_blocks,
+    rate_limited,
+    record_blocks,
     reset,
+    unblock,
 )
 
 
@@ -159,6 +177,13 @@ class TestIsBlocked:
         cache.set(keys[1], 5, 60)
         assert is_blocked(keys, 5) is True
 
+    def test_reads_all_keys_in_one_call(self):
+        """Should check every key with a single get_many."""
+        keys = ["rl:login:ip:127.0.0.1", "rl:login:fp:abc", "rl:login:ip_email:x"]
+        with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            is_blocked(keys, 5)
+        get_many.assert_called_once_with(keys)
+
 
 class TestIncrement:
     """Tests for increment function."""
@@ -183,6 +208,288 @@ class TestIncrement:
         assert cache.get(keys[0]) == 1
         assert cache.get(keys[1]) == 1
 
+    def test_redis_uses_one_pipeline(self):
+        """Should send SET NX EX + INCR for every key in one round trip."""
+        client = MagicMock()
+        pipe = client.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [True, 1, None, 2]
+        keys = ["rl:test:ip:127.0.0.1", "rl:test:fp:abc"]
+        with patch("users.ratelimit._redis_client", return_value=client):
+            increment(keys)
+
+        client.pipeline.assert_called_once()
+        pipe.execute.assert_called_once()
+        assert pipe.incr.call_count == 2
+        first_key = cache.make_and_validate_key(keys[0])
+        pipe.set.assert_any_call(first_key, 0, ex=COOLDOWN_SECONDS, nx=True)
+
+
+class TestRateLimitConfig:
+    """Tests for per-scope settings and engine selection."""
+
+    def test_limits_come_from_settings(self, settings):
+        """Should read limit and window per scope from settings."""
+        settings.RATE_LIMITS = {"login": {"limit": 2, "window": 60}}
+        assert get_rate_limit("login") == (2, 60)
+        assert get_rate_limit("register") == (REGISTER_LIMIT, COOLDOWN_SECONDS)
+
+    def test_configured_limit_applies(self, settings):
+        """Should block once the configured limit is reached."""
+        settings.RATE_LIMITS = {"login": {"limit": 2, "window": 60}}
+        keys = ["rl:login:ip:127.0.0.1"]
+        assert increment(keys) == 0
+        assert is_blocked(keys) is False
+        assert increment(keys) == 60
+        assert is_blocked(keys) is True
+
+    def test_counter_engine_without_redis(self):
+        """Should fall back to counters on non-Redis cache backends."""
+        assert isinstance(get_engine(), CounterEngine)
+
+    def test_engine_is_pluggable(self, settings):
+        """Should load the engine named in settings."""
+        settings.RATE_LIMIT_ENGINE = "users.ratelimit.GCRAEngine"
+        assert isinstance(get_engine(), GCRAEngine)
+
+    def test_gcra_requires_redis(self):
+        """Should refuse to run GCRA without a Redis cache."""
+        with pytest.raises(ImproperlyConfigured):
+            GCRAEngine().blocked_for(["rl:login:ip:127.0.0.1"], 5, 60)
+
+    def test_gcra_runs_one_script_per_call(self):
+        """Should evaluate all keys in a single Lua script call."""
+        client = MagicMock()
+        script = client.register_script.return_value
+        script.return_value = [720_000, 0]
+        keys = ["rl:login:ip:127.0.0.1", "rl:login:fp:abc"]
+        with patch("users.ratelimit._redis_client", return_value=client):
+            assert GCRAEngine().hit(keys, 5, 3600) == [720, 0]
+
+        script.assert_called_once()
+        _, kwargs = script.call_args
+        assert kwargs["keys"] == [cache.make_and_validate_key(key) for key in keys]
+        # One attempt regained every 12 minutes, burst of 5 within the hour
+        assert kwargs["args"] == [720_000, 2_880_000]
+
+
+class TestDenyCache:
+    """Tests for the per-worker deny cache."""
+
+    def test_blocked_key_skips_cache_backend(self):
+        """Should answer from memory once a key is known to be blocked."""
+        keys = ["rl:login:ip:127.0.0.1"]
+        cache.set(keys[0], 5, 60)
+        assert is_blocked(keys, 5) is True
+        with patch.object(cache, "get_many") as get_many:
+            assert is_blocked(keys, 5) is True
+        get_many.assert_not_called()
+
+    def test_only_blocked_keys_are_remembered(self):
+        """Should not deny keys that still have attempts left."""
+        keys = ["rl:login:ip:127.0.0.1", "rl:login:fp:abc"]
+        cache.set(keys[1], 5, 60)
+        assert is_blocked(keys, 5) is True
+        assert deny_cache.is_denied(keys[:1]) is False
+        assert deny_cache.is_denied(keys[1:]) is True
+
+    def test_increment_remembers_crossing_the_limit(self, settings):
+        """Should deny in memory as soon as a hit reaches the limit."""
+        settings.RATE_LIMITS = {"login": {"limit": 1, "window": 60}}
+        keys = ["rl:login:ip:127.0.0.1"]
+        increment(keys)
+        assert deny_cache.is_denied(keys) is True
+
+    def test_reset_forgets_denied_keys(self):
+        """Should let the key through again after a reset."""
+        keys = ["rl:login:ip:127.0.0.1"]
+        cache.set(keys[0], 5, 60)
+        assert is_blocked(keys, 5) is True
+        reset(keys)
+        assert is_blocked(keys, 5) is False
+
+    def test_clear_limits_forgets_denied_keys(self):
+        """Should drop the staff-cleared keys from memory."""
+        key = "rl:login:ip:192.168.1.1"
+        cache.set(key, 5, 60)
+        assert is_blocked([key], 5) is True
+        clear_limits(["login"], ip_address="192.168.1.1")
+        assert is_blocked([key], 5) is False
+
+    def test_entries_expire(self):
+        """Should drop entries once their TTL has passed."""
+        denied = DenyCache(maxsize=10, max_ttl=60)
+        with patch("users.ratelimit.time.monotonic", return_value=100.0):
+            denied.deny(["a"], 5)
+        with patch("users.ratelimit.time.monotonic", return_value=104.0):
+            assert denied.is_denied(["a"]) is True
+        with patch("users.ratelimit.time.monotonic", return_value=105.0):
+            assert denied.is_denied(["a"]) is False
+        assert len(denied) == 0
+
+    def test_ttl_is_capped(self):
+        """Should never trust a denial longer than max_ttl."""
+        denied = DenyCache(maxsize=10, max_ttl=60)
+        with patch("users.ratelimit.time.monotonic", return_value=0.0):
+            denied.deny(["a"], 3600)
+        with patch("users.ratelimit.time.monotonic", return_value=61.0):
+            assert denied.is_denied(["a"]) is False
+
+    def test_evicts_least_recently_used(self):
+        """Should keep at most maxsize keys, evicting the oldest first."""
+        denied = DenyCache(maxsize=2, max_ttl=60)
+        denied.deny(["a"], 30)
+        denied.deny(["b"], 30)
+        assert denied.is_denied(["a"]) is True
+        denied.deny(["c"], 30)
+        assert len(denied) == 2
+        assert denied.is_denied(["b"]) is False
+        assert denied.is_denied(["a", "c"]) is True
+
+
+class TestBlockRegistry:
+    """Tests for the per-scope block registry."""
+
+    def test_records_only_blocked_keys(self):
+        """Should score blocked keys by expiry and count their offences."""
+        client = MagicMock()
+        pipe = client.pipeline.return_value.__enter__.return_value
+        keys = ["rl:login:ip:127.0.0.1", "rl:login:fp:abc"]
+        with patch("users.ratelimit._redis_client", return_value=client):
+            record_blocks(keys, [720, 0])
+
+        pipe.zadd.assert_called_once()
+        args, kwargs = pipe.zadd.call_args
+        assert args[0] == cache.make_and_validate_key("rl:blocked:login")
+        assert list(args[1]) == [keys[0]]
+        assert kwargs == {"gt": True}
+        pipe.zincrby.assert_called_once_with(
+            cache.make_and_validate_key("rl:blocked:login:offences"), 1, keys[0]
+        )
+        pipe.execute.assert_called_once()
+
+    def test_no_op_without_redis(self):
+        """Should list nothing when the cache is not Redis."""
+        assert list_blocks("login") == ([], 0)
+
+    def test_lists_top_offenders(self):
+        """Should read one ranked page plus its expiries, after pruning."""
+        client = MagicMock()
+        client.zrangebyscore.return_value = []
+        pipe = client.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [[(b"rl:login:ip_email:1.2.3.4:a@b.com", 7.0)], 3]
+        client.zmscore.return_value = [1_800_000_000.0]
+        with patch("users.ratelimit._redis_client", return_value=client):
+            entries, total = list_blocks("login", limit=1)
+
+        assert total == 3
+        pipe.zrevrange.assert_called_once_with(
+            cache.make_and_validate_key("rl:blocked:login:offences"),
+            0,
+            0,
+            withscores=True,
+        )
+        [entry] = entries
+        assert entry.kind == "ip_email"
+        assert entry.identifier == "1.2.3.4:a@b.com"
+        assert entry.offences == 7
+        assert entry.expires_at.timestamp() == 1_800_000_000
+
+    def test_prunes_expired_entries(self):
+        """Should remove exactly the batch of expired keys read from both sets."""
+        client = MagicMock()
+        members = [b"rl:login:ip:1.1.1.1", b"rl:login:ip:2.2.2.2"]
+        client.zrangebyscore.return_value = members
+        pipe = client.pipeline.return_value.__enter__.return_value
+        with patch("users.ratelimit._redis_client", return_value=client):
+            assert prune_blocks("login", batch=2) == 2
+
+        expiry_set = cache.make_and_validate_key("rl:blocked:login")
+        offences_set = cache.make_and_validate_key("rl:blocked:login:offences")
+        assert client.zrangebyscore.call_args.kwargs == {"start": 0, "num": 2}
+        assert pipe.zrem.call_args_list == [
+            call(expiry_set, *members),
+            call(offences_set, *members),
+        ]
+        pipe.zremrangebyscore.assert_not_called()
+
+    def test_finds_blocks_of_one_client(self):
+        """Should look up the client's keys in each scope without scanning."""
+        client = MagicMock()
+        pipe = client.pipeline.return_value.__enter__.return_value
+        expires_at = time.time() + 600
+        pipe.execute.return_value = [
+            [expires_at, None],
+            [4.0, None],
+        ] + [[None, None], [None, None]] * (len(SCOPES) - 1)
+        with patch("users.ratelimit._redis_client", return_value=client):
+            [entry] = find_blocks(ip_address="1.2.3.4", fingerprint="abc")
+
+        assert pipe.zmscore.call_args_list[0].args == (
+            cache.make_and_validate_key(f"rl:blocked:{SCOPES[0]}"),
+            [f"rl:{SCOPES[0]}:ip:1.2.3.4", f"rl:{SCOPES[0]}:fp:abc"],
+        )
+        assert entry.key == f"rl:{SCOPES[0]}:ip:1.2.3.4"
+        assert entry.offences == 4
+        client.zscan.assert_not_called()
+
+    def test_find_blocks_needs_an_identifier(self):
+        """Should not query Redis without an IP or fingerprint."""
+        client = MagicMock()
+        with patch("users.ratelimit._redis_client", return_value=client):
+            assert find_blocks(email="a@b.com") == []
+        client.pipeline.assert_not_called()
+
+    def test_unblock_ignores_foreign_keys(self):
+        """Should only reset keys of known rate-limit scopes."""
+        cache.set("rl:login:ip:1.1.1.1", 5, 60)
+        cache.set("other:key:a:b", 1, 60)
+        cleared = unblock(["rl:login:ip:1.1.1.1", "other:key:a:b", "rl:x:ip:1"])
+        assert cleared == ["rl:login:ip:1.1.1.1"]
+        assert cache.get("rl:login:ip:1.1.1.1") is None
+        assert cache.get("other:key:a:b") == 1
+
+
+class TestRateLimitedDecorator:
+    """Tests for the rate_limited view decorator."""
+
+    def test_blocked_request_skips_view(self, rf, block_rate_limit):
+        """Should answer 429 without running the view."""
+        block_rate_limit("login")
+        view = MagicMock()
+        request = rf.post("/", {"username": "a@b.com"})
+        request.COOKIES["sd_fp"] = "test-fp"
+        response = rate_limited("login", field="username")(view)(request)
+        assert response.status_code == 429
+        view.assert_not_called()
+
+    def test_allowed_request_gets_state(self, rf):
+        """Should pass the resolved keys to the view."""
+        view = MagicMock(return_value="ok")
+        request = rf.post("/", {"email": "A@b.com"}, REMOTE_ADDR="10.0.0.1")
+        request.COOKIES["sd_fp"] = "abc"
+        assert rate_limited("register", field="email")(view)(request) == "ok"
+        assert request.rate_limit.keys == build_keys(
+            "register", "10.0.0.1", "A@b.com", "abc"
+        )
+        assert request.rate_limit.should_set_cookie is False
+
+    def test_lockout_page_is_rendered_once(self):
+        """Should reuse the pre-rendered page for every blocked request."""
+        with patch(
+            "users.ratelimit.render_to_string", return_value="bloqueado"
+        ) as render:
+            _render_lockout.cache_clear()
+            first = lockout_response()
+            second = lockout_response()
+            _render_lockout.cache_clear()
+        render.assert_called_once()
+        assert first is not second
+        assert first.content == second.content == b"bloqueado"
+
+    def test_lockout_page_has_no_csrf_token(self):
+        """Should be safe to share between clients."""
+        assert b"csrfmiddlewaretoken" not in lockout_response().content
+
 
 class TestReset:
     """Tests for reset function."""
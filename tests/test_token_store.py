@@ -0,0 +1,216 @@
+"""Tests for users/token_store.py module."""
+
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError
+from password_reset.models import PasswordResetToken
+from users.token_store import (
+    CONSUME_CODE_SCRIPT,
+    RESET_TOKEN_SCRIPT,
+    RESTORE_SCRIPT,
+    DatabaseTokenStore,
+    RedisTokenStore,
+    get_token_store,
+)
+from users.utils import (
+    consume_password_reset_token,
+    create_password_reset_token,
+    get_password_reset_user,
+    hash_token,
+    reset_password_with_token,
+    verify_code,
+)
+
+TTL = timedelta(minutes=10)
+
+
+class TestGetTokenStore:
+    """Tests for store selection."""
+
+    def test_database_store_without_redis(self):
+        """Should fall back to the database on non-Redis caches."""
+        assert isinstance(get_token_store(), DatabaseTokenStore)
+
+    def test_store_is_pluggable(self, settings):
+        """Should load the store named in settings."""
+        settings.TOKEN_STORE = "users.token_store.RedisTokenStore"
+        assert isinstance(get_token_store(), RedisTokenStore)
+
+    def test_redis_store_requires_redis(self):
+        """Should refuse to run without a Redis cache."""
+        with pytest.raises(ImproperlyConfigured):
+            RedisTokenStore().issue_verification_code(1, "123456", TTL)
+
+
+@pytest.mark.django_db
+class TestDatabaseResetTokens:
+    """Tests for reset tokens in the database store."""
+
+    def test_token_resolves_to_user(self, user):
+        """Should return the owner of a fresh token."""
+        token = create_password_reset_token(user)
+        assert get_password_reset_user(token) == user
+
+    def test_new_token_invalidates_previous(self, user):
+        """Should only accept the latest token."""
+        first = create_password_reset_token(user)
+        second = create_password_reset_token(user)
+        assert get_password_reset_user(first) is None
+        assert get_password_reset_user(second) == user
+
+    def test_token_redeems_once(self, user):
+        """Should let only one redemption through."""
+        token = create_password_reset_token(user)
+        assert consume_password_reset_token(token) is True
+        assert consume_password_reset_token(token) is False
+        assert get_password_reset_user(token) is None
+
+    def test_expired_token_is_rejected(self, user):
+        """Should ignore tokens past their expiry."""
+        token = create_password_reset_token(user)
+        PasswordResetToken.objects.update(expires_at="2000-01-01T00:00:00Z")
+        assert get_password_reset_user(token) is None
+        assert consume_password_reset_token(token) is False
+
+    def test_empty_token(self):
+        """Should reject empty tokens without touching the store."""
+        assert get_password_reset_user("") is None
+        assert consume_password_reset_token("") is False
+
+
+class TestRedisTokenStore:
+    """Tests for the Redis store (client mocked)."""
+
+    @pytest.fixture
+    def client(self):
+        client = MagicMock()
+        with patch("users.token_store._redis_client", return_value=client):
+            yield client
+
+    def test_issue_code_is_one_write(self, client):
+        """Should store the code with a TTL in a single SET."""
+        RedisTokenStore().issue_verification_code(5, "123456", timedelta(hours=24))
+        client.set.assert_called_once_with(
+            cache.make_and_validate_key("tok:verify:5"), "123456", ex=86400
+        )
+
+    def test_consume_code_runs_compare_and_redeem(self, client):
+        """Should redeem through the atomic compare-and-redeem script."""
+        client.register_script.return_value.return_value = 1
+        assert RedisTokenStore().consume_verification_code(5, "123456", TTL) is True
+        client.register_script.assert_called_once_with(CONSUME_CODE_SCRIPT)
+        client.register_script.return_value.assert_called_once_with(
+            keys=[cache.make_and_validate_key("tok:verify:5")], args=["123456"]
+        )
+
+    def test_issue_reset_token_repoints_user(self, client):
+        """Should write the token and the user's pointer in one pipeline."""
+        RedisTokenStore().issue_reset_token(5, "abc", TTL)
+        pipe = client.pipeline.return_value.__enter__.return_value
+        pipe.set.assert_any_call(
+            cache.make_and_validate_key("tok:{reset}:abc"), 5, ex=600
+        )
+        pipe.set.assert_any_call(
+            cache.make_and_validate_key("tok:{reset}:user:5"), "abc", ex=600
+        )
+        pipe.execute.assert_called_once()
+
+    def test_consume_reset_token(self, client):
+        """Should pass both full keys to the redeeming script."""
+        client.get.return_value = b"5"
+        script = client.register_script.return_value
+        script.return_value = b"5"
+        assert RedisTokenStore().consume_reset_token("abc") == 5
+        client.register_script.assert_called_once_with(RESET_TOKEN_SCRIPT)
+        script.assert_called_once_with(
+            keys=[
+                cache.make_and_validate_key("tok:{reset}:abc"),
+                cache.make_and_validate_key("tok:{reset}:user:5"),
+            ],
+            args=["abc", b"5", "1"],
+        )
+
+    def test_unknown_reset_token(self, client):
+        """Should return None without running the script for unknown tokens."""
+        client.get.return_value = None
+        assert RedisTokenStore().get_reset_token_user_id("abc") is None
+        client.register_script.assert_not_called()
+
+    def test_stale_reset_token(self, client):
+        """Should return None when the script finds no current token."""
+        client.get.return_value = b"5"
+        client.register_script.return_value.return_value = None
+        assert RedisTokenStore().get_reset_token_user_id("abc") is None
+
+    def test_redeeming_keeps_ttl(self):
+        """Should mark redeemed secrets in place instead of deleting them."""
+        for script in (CONSUME_CODE_SCRIPT, RESET_TOKEN_SCRIPT, RESTORE_SCRIPT):
+            assert "'KEEPTTL'" in script
+            assert "DEL" not in script
+
+    def test_restore_code_keeps_expiry(self, client):
+        """Should put a code back through the marker, without a new TTL."""
+        RedisTokenStore().restore_verification_code(5, "123456")
+        client.register_script.assert_called_once_with(RESTORE_SCRIPT)
+        client.register_script.return_value.assert_called_once_with(
+            keys=[cache.make_and_validate_key("tok:verify:5")], args=["123456"]
+        )
+        client.set.assert_not_called()
+
+    def test_restore_reset_token_repoints_user(self, client):
+        """Should only touch the user's pointer; the token key kept its TTL."""
+        RedisTokenStore().restore_reset_token(5, "abc")
+        client.register_script.return_value.assert_called_once_with(
+            keys=[cache.make_and_validate_key("tok:{reset}:user:5")], args=["abc"]
+        )
+
+
+@pytest.mark.django_db
+class TestRedeemRollback:
+    """Tests for handing secrets back when the caller's writes fail."""
+
+    def test_reset_password_with_token(self, user):
+        """Should redeem the token and set the password."""
+        token = create_password_reset_token(user)
+        assert reset_password_with_token(user, token, "N3w-passw0rd!") is True
+        user.refresh_from_db()
+        assert user.check_password("N3w-passw0rd!")
+        assert reset_password_with_token(user, token, "0ther-passw0rd!") is False
+
+    def test_failed_save_keeps_token(self, user):
+        """Should leave the token usable when saving the password fails."""
+        token = create_password_reset_token(user)
+        with (
+            patch.object(type(user), "save", side_effect=DatabaseError),
+            pytest.raises(DatabaseError),
+        ):
+            reset_password_with_token(user, token, "N3w-passw0rd!")
+        assert get_password_reset_user(token) == user
+
+    def test_failed_save_restores_redis_token(self, user):
+        """Should hand the token back to a Redis store."""
+        store = MagicMock()
+        store.consume_reset_token.return_value = user.pk
+        with (
+            patch("users.utils.get_token_store", return_value=store),
+            patch.object(type(user), "save", side_effect=DatabaseError),
+            pytest.raises(DatabaseError),
+        ):
+            reset_password_with_token(user, "tok", "N3w-passw0rd!")
+        store.restore_reset_token.assert_called_once_with(user.pk, hash_token("tok"))
+
+    def test_failed_save_restores_code(self, user):
+        """Should hand the verification code back when confirming fails."""
+        store = MagicMock()
+        store.consume_verification_code.return_value = True
+        with (
+            patch("users.utils.get_token_store", return_value=store),
+            patch.object(type(user), "save", side_effect=DatabaseError),
+            pytest.raises(DatabaseError),
+        ):
+            verify_code(user, "123456")
+        store.restore_verification_code.assert_called_once_with(user.pk, "123456")
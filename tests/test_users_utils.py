@@ -130,6 +130,33 @@ class TestVerifyCode:
         result = verify_code(user, "123456")
         assert result is False
 
+    @pytest.mark.django_db
+    def test_code_cannot_be_used_twice(self, user, verification_code):
+        """Should let only the first of two submits of the same code through."""
+        assert verify_code(user, verification_code.code) is True
+        assert verify_code(user, verification_code.code) is False
+
+    @pytest.mark.django_db
+    def test_consumes_all_unused_codes(self, user):
+        """Should mark every pending code of the user as used."""
+        EmailVerificationCode.objects.create(user=user, code="111111")
+        new_code = EmailVerificationCode.objects.create(user=user, code="222222")
+        assert verify_code(user, new_code.code) is True
+        assert not EmailVerificationCode.objects.filter(user=user, used=False).exists()
+
+    @pytest.mark.django_db
+    def test_single_update_per_table(
+        self, user, verification_code, django_assert_num_queries
+    ):
+        """Should check and consume the code in one UPDATE, then save one field."""
+        # SAVEPOINT, code UPDATE, user UPDATE, RELEASE SAVEPOINT
+        with django_assert_num_queries(4) as captured:
+            verify_code(user, verification_code.code)
+        statements = [query["sql"] for query in captured.captured_queries]
+        assert statements[1].startswith('UPDATE "users_emailverificationcode"')
+        assert statements[2].startswith('UPDATE "users_user" SET "email_confirmed"')
+        assert '"password"' not in statements[2]
+
 
 class TestSendVerificationCode:
     """Tests for send_verification_code function."""
@@ -3,8 +3,12 @@
 from unittest.mock import patch
 
 import pytest
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from users.ratelimit import SCOPES
 
 
 @pytest.fixture
@@ -78,8 +82,82 @@ class TestLoginView:
                 "password": user_data["password"],
             },
         )
-        assert response.status_code == 200
-        assert "blocked_message" in response.context
+        assert response.status_code == 429
+        assert "Demasiados intentos" in response.content.decode()
+
+    @pytest.mark.django_db
+    def test_login_blocked_before_hashing(self, client, block_rate_limit, user_data):
+        """Should reject blocked clients without hashing the password."""
+        block_rate_limit("login", limit=5)
+        with patch("django.contrib.auth.hashers.PBKDF2PasswordHasher.encode") as encode:
+            client.post(
+                reverse("login"),
+                {"username": user_data["email"], "password": user_data["password"]},
+            )
+        encode.assert_not_called()
+
+    @pytest.mark.django_db
+    def test_login_unknown_email_runs_dummy_hash(self, client):
+        """Should spend one password check on unknown emails."""
+        with patch(
+            "users.backends.check_password", return_value=False
+        ) as check_password:
+            client.post(
+                reverse("login"),
+                {"username": "nobody@example.com", "password": "wrongpassword"},
+            )
+        check_password.assert_called_once()
+
+    @pytest.mark.django_db
+    def test_login_checks_block_once(self, client, verified_user):
+        """Should not ask the engine again in AxesBackend after the view gate."""
+        with patch("users.ratelimit.get_engine") as get_engine:
+            get_engine.return_value.blocked_for.return_value = [0, 0, 0]
+            get_engine.return_value.hit.return_value = [0, 0, 0]
+            client.post(
+                reverse("login"),
+                {"username": verified_user.email, "password": "wrongpassword"},
+            )
+        get_engine.return_value.blocked_for.assert_called_once()
+
+    @pytest.mark.django_db
+    def test_login_failure_looks_user_up_once(self, client, verified_user):
+        """Should resolve the user and hash the password only once."""
+        with (
+            CaptureQueriesContext(connection) as queries,
+            patch(
+                "users.models.User.check_password", return_value=False
+            ) as check_password,
+        ):
+            client.post(
+                reverse("login"),
+                {"username": verified_user.email, "password": "wrongpassword"},
+            )
+        user_lookups = [
+            q for q in queries if 'FROM "users_user"' in q["sql"].replace("`", '"')
+        ]
+        assert len(user_lookups) == 1
+        check_password.assert_called_once()
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("pad", ["  {}  ", "{}\t"])
+    def test_login_padded_email_looks_user_up_once(self, client, verified_user, pad):
+        """Should share the lookup with the form when the email needs cleaning."""
+        with (
+            CaptureQueriesContext(connection) as queries,
+            patch(
+                "users.models.User.check_password", return_value=False
+            ) as check_password,
+        ):
+            client.post(
+                reverse("login"),
+                {"username": pad.format(verified_user.email), "password": "wrong"},
+            )
+        user_lookups = [
+            q for q in queries if 'FROM "users_user"' in q["sql"].replace("`", '"')
+        ]
+        assert len(user_lookups) == 1
+        check_password.assert_called_once()
 
     @pytest.mark.django_db
     def test_login_sets_fingerprint_cookie(self, client, verified_user, user_data):
@@ -154,11 +232,12 @@ class TestRegisterView:
 
     @pytest.mark.django_db
     def test_register_blocked_when_rate_limited(self, client, block_rate_limit):
-        """Should show blocked message when rate limited."""
+        """Should answer with the lockout page without building the form."""
         block_rate_limit("register", limit=3)
-        response = client.get(reverse("register"))
-        # Rate limiting is checked on POST, so GET should work
-        assert response.status_code == 200
+        with patch("auth_register.views.RegisterForm") as form_class:
+            response = client.get(reverse("register"))
+        assert response.status_code == 429
+        form_class.assert_not_called()
 
     @pytest.mark.django_db
     def test_register_sets_fingerprint_cookie(self, client):
@@ -270,8 +349,8 @@ class TestVerifyEmailView:
                 "code": "123456",
             },
         )
-        assert response.status_code == 200
-        assert "blocked_message" in response.context
+        assert response.status_code == 429
+        assert "Demasiados intentos" in response.content.decode()
 
 
 class TestClearRateLimitsView:
@@ -301,6 +380,59 @@ class TestClearRateLimitsView:
         assert response.url == reverse("home")
 
 
+class TestRateLimitBlocksView:
+    """Tests for rate_limit_blocks_view."""
+
+    @pytest.mark.django_db
+    def test_requires_staff(self, client, verified_user):
+        """Should redirect non-staff users."""
+        client.force_login(verified_user)
+        response = client.get(reverse("rate_limit_blocks"))
+        assert response.status_code == 302
+        assert response.url == reverse("home")
+
+    @pytest.mark.django_db
+    def test_lists_every_scope(self, client, staff_user):
+        """Should render one section per rate-limit scope."""
+        client.force_login(staff_user)
+        response = client.get(reverse("rate_limit_blocks"))
+        assert response.status_code == 200
+        assert [scope["name"] for scope in response.context["scopes"]] == list(SCOPES)
+
+    @pytest.mark.django_db
+    def test_bulk_unblock(self, client, staff_user, block_rate_limit):
+        """Should reset the selected keys and ignore unknown ones."""
+        block_rate_limit("login", ip="192.168.1.1")
+        client.force_login(staff_user)
+        response = client.post(
+            reverse("rate_limit_blocks"),
+            {"keys": ["rl:login:ip:192.168.1.1", "session:abc"]},
+        )
+        assert response.status_code == 302
+        assert response.url == reverse("rate_limit_blocks")
+        assert cache.get("rl:login:ip:192.168.1.1") is None
+        assert cache.get("rl:login:fp:test-fp") == 5
+
+    @pytest.mark.django_db
+    def test_searches_one_client(self, client, staff_user):
+        """Should look up the blocks of the searched IP and fingerprint."""
+        client.force_login(staff_user)
+        with patch("users.views.find_blocks", return_value=[]) as find:
+            response = client.get(
+                reverse("rate_limit_blocks"), {"ip": " 10.0.0.1 ", "fp": "abc"}
+            )
+        find.assert_called_once_with(ip_address="10.0.0.1", email="", fingerprint="abc")
+        assert response.context["results"] == []
+        assert "No hay bloqueos activos" in response.content.decode()
+
+    @pytest.mark.django_db
+    def test_no_search_without_params(self, client, staff_user):
+        """Should only list the scopes when nothing is searched."""
+        client.force_login(staff_user)
+        response = client.get(reverse("rate_limit_blocks"))
+        assert response.context["results"] is None
+
+
 class TestLogoutView:
     """Tests for logout view."""
 